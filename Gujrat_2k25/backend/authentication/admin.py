@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, CountryCode
+from .models import User, CountryCode, OutboundEmail
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
@@ -34,3 +34,11 @@ class CountryCodeAdmin(admin.ModelAdmin):
     fieldsets = (
         (None, {'fields': ('code', 'country', 'flag', 'phone_length', 'is_active')}),
     )
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to_email', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('to_email', 'subject')
+    ordering = ('-created_at',)
+    readonly_fields = ('created_at', 'sent_at', 'claimed_at', 'last_error')
@@ -0,0 +1,88 @@
+"""
+JWT authentication with a cached request principal.
+
+simplejwt's JWTAuthentication loads the full users row on every request.
+CachedJWTAuthentication keeps the profile fields views read in the Django
+cache for AUTH_USER_CACHE_TIMEOUT seconds and rebuilds the User from them;
+``password`` stays deferred and is only loaded if something asks for it.
+Entries are dropped whenever a User is saved or deleted (see
+``authentication.signals``). Writes that bypass save(), such as
+``User.objects.update()``, must call ``invalidate_user()`` themselves.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+CACHE_TIMEOUT = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60)
+
+# Everything UserProfileSerializer and the permission checks read; never the password
+CACHED_FIELDS = (
+    'id', 'username', 'email', 'first_name', 'last_name', 'user_type',
+    'is_active', 'is_staff', 'is_superuser', 'phone_number', 'country_code',
+    'is_phone_verified', 'is_email_verified', 'profile_picture',
+    'last_login', 'date_joined', 'created_at', 'updated_at',
+)
+
+# Bump whenever CACHED_FIELDS changes so entries written by older code are ignored
+CACHE_VERSION = 1
+
+
+def _cached_attnames(user_model):
+    # Model.from_db() expects values in concrete field order
+    return [field.attname for field in user_model._meta.concrete_fields if field.attname in CACHED_FIELDS]
+
+
+def _cache_key(user_id):
+    return f'auth:user:v{CACHE_VERSION}:{user_id}'
+
+
+def invalidate_user(user_id):
+    """Forget the cached principal for a user"""
+    cache.delete(_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that serves the user from a short-lived cache"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = _cache_key(user_id)
+        field_names = _cached_attnames(self.user_model)
+        entry = cache.get(key)
+        if entry is None:
+            row = (
+                self.user_model.objects
+                .filter(**{api_settings.USER_ID_FIELD: user_id})
+                .values_list(*field_names, 'password')
+                .first()
+            )
+            if row is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            # Keep only a digest of the password hash, for CHECK_REVOKE_TOKEN
+            entry = (row[:-1], get_md5_hash_password(row[-1]))
+            cache.set(key, entry, CACHE_TIMEOUT)
+
+        values, password_digest = entry
+        user = self.user_model.from_db(
+            router.db_for_read(self.user_model), field_names, values
+        )
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_digest:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
@@ -1,11 +1,8 @@
-import random
+import secrets
 import string
-from django.core.mail import send_mail
 from django.conf import settings
 from django.template.loader import render_to_string
-from django.utils import timezone
-from datetime import timedelta
-from .models import EmailOTP
+from . import mailer, otp_store, outbox
 
 class EmailService:
     """Service class for handling email operations"""
@@ -13,45 +10,33 @@ class EmailService:
     @staticmethod
     def generate_otp(length=6):
         """Generate a random OTP"""
-        return ''.join(random.choices(string.digits, k=length))
+        return ''.join(secrets.choice(string.digits) for _ in range(length))
     
     @staticmethod
     def create_otp(user, email, expires_in_minutes=10):
-        """Create and save an OTP for email verification"""
-        # Invalidate any existing OTPs for this user
-        EmailOTP.objects.filter(user=user, is_used=False).update(is_used=True)
-        
-        # Generate new OTP
-        otp = EmailService.generate_otp()
-        expires_at = timezone.now() + timedelta(minutes=expires_in_minutes)
-        
-        # Save OTP to database
-        email_otp = EmailOTP.objects.create(
-            user=user,
-            email=email,
-            otp=otp,
-            expires_at=expires_at
-        )
-        
-        return email_otp
+        """Issue a new OTP for email verification, replacing any pending one"""
+        return otp_store.issue(user, email, EmailService.generate_otp(), expires_in_minutes)
     
     @staticmethod
-    def send_email(subject: str, to_email: str, template: str, context: dict, text_fallback: str = "") -> bool:
-        html_message = render_to_string(template, context)
+    def deliver(subject: str, to_email: str, text_message: str, html_message: str = "") -> bool:
+        """Queue an email in the outbox, or send it right away when EMAIL_USE_OUTBOX is off"""
         try:
-            send_mail(
-                subject=subject,
-                message=text_fallback or html_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[to_email],
-                html_message=html_message,
-                fail_silently=False,
-            )
+            if getattr(settings, 'EMAIL_USE_OUTBOX', True):
+                outbox.enqueue(subject, to_email, text_body=text_message, html_body=html_message)
+            else:
+                error = mailer.send_batch([mailer.build_message(subject, to_email, text_message, html_message)])[0]
+                if error is not None:
+                    raise error
             return True
         except Exception as e:
             print(f"Error sending email: {e}")
             return False
     
+    @staticmethod
+    def send_email(subject: str, to_email: str, template: str, context: dict, text_fallback: str = "") -> bool:
+        html_message = render_to_string(template, context)
+        return EmailService.deliver(subject, to_email, text_fallback or html_message, html_message)
+    
     @staticmethod
     def send_booking_confirmation(player_user, booking):
         """Email player when booking is confirmed by owner"""
@@ -98,19 +83,7 @@ class EmailService:
         QuickCourt Team
         """
         
-        try:
-            send_mail(
-                subject=subject,
-                message=text_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[user.email],
-                html_message=html_message,
-                fail_silently=False,
-            )
-            return True
-        except Exception as e:
-            print(f"Error sending email: {e}")
-            return False
+        return EmailService.deliver(subject, user.email, text_message, html_message)
     
     @staticmethod
     def send_welcome_email(user):
@@ -137,19 +110,7 @@ class EmailService:
         QuickCourt Team
         """
         
-        try:
-            send_mail(
-                subject=subject,
-                message=text_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[user.email],
-                html_message=html_message,
-                fail_silently=False,
-            )
-            return True
-        except Exception as e:
-            print(f"Error sending welcome email: {e}")
-            return False
+        return EmailService.deliver(subject, user.email, text_message, html_message)
     
     @staticmethod
     def send_password_reset_email(user, reset_token):
@@ -178,49 +139,21 @@ class EmailService:
         QuickCourt Team
         """
         
-        try:
-            send_mail(
-                subject=subject,
-                message=text_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[user.email],
-                html_message=html_message,
-                fail_silently=False,
-            )
-            return True
-        except Exception as e:
-            print(f"Error sending password reset email: {e}")
-            return False
+        return EmailService.deliver(subject, user.email, text_message, html_message)
     
     @staticmethod
     def verify_otp(user, otp):
         """Verify OTP and mark email as verified"""
-        try:
-            email_otp = EmailOTP.objects.get(
-                user=user,
-                otp=otp,
-                is_used=False
-            )
-            
-            if email_otp.is_valid():
-                # Mark OTP as used
-                email_otp.is_used = True
-                email_otp.save()
-                
-                # Mark user email as verified and activate account
-                user.is_email_verified = True
-                user.is_active = True  # Activate the user account
-                user.save()
-                
-                return True, "Email verified successfully. Your account is now active!"
-            else:
-                if email_otp.is_expired():
-                    return False, "OTP has expired"
-                else:
-                    return False, "Invalid OTP"
-                    
-        except EmailOTP.DoesNotExist:
-            return False, "Invalid OTP"
+        success, message = otp_store.verify(user, otp)
+        if not success:
+            return False, message
+        
+        # Mark user email as verified and activate account
+        user.is_email_verified = True
+        user.is_active = True  # Activate the user account
+        user.save()
+        
+        return True, "Email verified successfully. Your account is now active!"
     
     @staticmethod
     def resend_otp(user):
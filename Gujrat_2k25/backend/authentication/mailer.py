@@ -0,0 +1,96 @@
+"""
+Connection-reusing email delivery.
+
+``send_batch()`` opens one backend connection (one SMTP handshake, STARTTLS
+and login) and sends several messages over it, moving to a fresh connection
+after EMAIL_MAX_MESSAGES_PER_CONNECTION messages or after a failure. Every
+EmailService helper and the outbox worker send through it. ``metrics()``
+reports how many messages each connection carried.
+"""
+import threading
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+MAX_MESSAGES_PER_CONNECTION = getattr(settings, 'EMAIL_MAX_MESSAGES_PER_CONNECTION', 50)
+
+_lock = threading.Lock()
+_counters = {'connections': 0, 'messages': 0, 'failures': 0}
+
+
+def _record(**deltas):
+    with _lock:
+        for key, value in deltas.items():
+            _counters[key] += value
+
+
+def metrics():
+    """Connections opened, messages sent and failed, and messages per connection since startup"""
+    with _lock:
+        counters = dict(_counters)
+    connections = counters['connections']
+    counters['messages_per_connection'] = (
+        round(counters['messages'] / connections, 2) if connections else 0.0
+    )
+    return counters
+
+
+def reset_metrics():
+    with _lock:
+        for key in _counters:
+            _counters[key] = 0
+
+
+def build_message(subject, to_email, text_message, html_message='', from_email=None):
+    """Plain text email with an optional HTML alternative"""
+    message = EmailMultiAlternatives(
+        subject=subject,
+        body=text_message or html_message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=[to_email],
+    )
+    if html_message:
+        message.attach_alternative(html_message, 'text/html')
+    return message
+
+
+def _close(connection):
+    if connection is None:
+        return
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def send_batch(messages, max_per_connection=None):
+    """Send EmailMessages over shared connections; returns one error (or None) per message"""
+    limit = max_per_connection or MAX_MESSAGES_PER_CONNECTION
+    errors = []
+    connection = None
+    used = 0
+    try:
+        for message in messages:
+            try:
+                if connection is None or used >= limit:
+                    _close(connection)
+                    connection = None
+                    connection = get_connection(fail_silently=False)
+                    connection.open()
+                    _record(connections=1)
+                    used = 0
+                message.connection = connection
+                connection.send_messages([message])
+            except Exception as e:
+                # The session may be unusable after an error; start a fresh one
+                _record(failures=1)
+                errors.append(e)
+                _close(connection)
+                connection = None
+            else:
+                _record(messages=1)
+                errors.append(None)
+                used += 1
+    finally:
+        _close(connection)
+    return errors
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+class Command(BaseCommand):
+    help = "Delete expired outstanding (and therefore blacklisted) refresh tokens in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per statement')
+        parser.add_argument('--loop', action='store_true', help='Keep running, pruning every --interval seconds')
+        parser.add_argument('--interval', type=float, default=3600.0, help='Seconds between runs with --loop')
+
+    def prune(self, batch_size):
+        deleted = 0
+        while True:
+            ids = list(
+                OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return deleted
+            # Cascades to the matching BlacklistedToken rows
+            OutstandingToken.objects.filter(id__in=ids).delete()
+            deleted += len(ids)
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = self.prune(options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} expired refresh tokens."))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
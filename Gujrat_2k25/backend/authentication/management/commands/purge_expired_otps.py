@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from authentication import otp_store
+
+class Command(BaseCommand):
+    help = "Delete expired email verification codes from the OTP store."
+
+    def handle(self, *args, **options):
+        purged = otp_store.purge_expired()
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} expired OTPs."))
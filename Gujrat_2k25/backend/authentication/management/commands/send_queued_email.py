@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from authentication import mailer, outbox
+
+class Command(BaseCommand):
+    help = "Deliver emails queued in the outbox, retrying failures with exponential backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the currently due emails and exit')
+        parser.add_argument('--batch-size', type=int, default=50, help='Emails claimed per batch')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when the queue is empty')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total_sent = total_failed = 0
+
+        while True:
+            sent, failed = outbox.process_batch(batch_size)
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}")
+
+            if sent + failed < batch_size:
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+
+        stats = mailer.metrics()
+        self.stdout.write(self.style.SUCCESS(
+            f"Outbox drained: {total_sent} sent, {total_failed} failed "
+            f"over {stats['connections']} connections "
+            f"({stats['messages_per_connection']} messages per connection)."
+        ))
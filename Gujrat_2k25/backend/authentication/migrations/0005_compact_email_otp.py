@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+import hashlib
+import hmac
+
+
+def compact_otps(apps, schema_editor):
+    """Keep only each user's newest live code, stored as a hash"""
+    EmailOTP = apps.get_model('authentication', 'EmailOTP')
+
+    EmailOTP.objects.filter(models.Q(is_used=True) | models.Q(expires_at__lte=timezone.now())).delete()
+
+    seen_users = set()
+    for otp in EmailOTP.objects.order_by('-created_at', '-id'):
+        if otp.user_id in seen_users:
+            otp.delete()
+            continue
+        seen_users.add(otp.user_id)
+        otp.code_hash = hmac.new(
+            settings.SECRET_KEY.encode(), f'{otp.user_id}:{otp.otp}'.encode(), hashlib.sha256
+        ).hexdigest()
+        otp.save(update_fields=['code_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailotp',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='emailotp',
+            name='code_hash',
+            field=models.CharField(default='', max_length=64),
+            preserve_default=False,
+        ),
+        migrations.RunPython(compact_otps, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='emailotp',
+            name='is_used',
+        ),
+        migrations.RemoveField(
+            model_name='emailotp',
+            name='otp',
+        ),
+        migrations.AlterField(
+            model_name='emailotp',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='emailotp',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='email_otp', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
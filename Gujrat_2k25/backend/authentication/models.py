@@ -70,31 +70,9 @@ class User(AbstractUser):
         # Remove country code from phone number for validation
         phone_str = str(self.phone_number)
         
-        # Country code to expected length mapping
-        country_lengths = {
-            '+91': 10,  # India
-            '+1': 10,   # US/Canada
-            '+44': 10,  # UK
-            '+61': 9,   # Australia
-            '+86': 11,  # China
-            '+81': 10,  # Japan
-            '+49': 11,  # Germany
-            '+33': 9,   # France
-            '+39': 10,  # Italy
-            '+34': 9,   # Spain
-            '+7': 10,   # Russia
-            '+55': 11,  # Brazil
-            '+52': 10,  # Mexico
-            '+27': 9,   # South Africa
-            '+971': 9,  # UAE
-            '+966': 9,  # Saudi Arabia
-            '+65': 8,   # Singapore
-            '+60': 9,   # Malaysia
-            '+66': 9,   # Thailand
-            '+84': 9,   # Vietnam
-        }
-        
-        expected_length = country_lengths.get(self.country_code, 10)
+        # Expected lengths come from the CountryCode table
+        from .reference_data import phone_length_for
+        expected_length = phone_length_for(self.country_code)
         
         # Remove any non-digit characters for length check
         digits_only = re.sub(r'\D', '', phone_str)
@@ -124,13 +102,13 @@ class CountryCode(models.Model):
         return cls.objects.filter(is_active=True)
 
 class EmailOTP(models.Model):
-    """Model to store email OTP for verification"""
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='email_otps')
+    """Pending email verification code, at most one per user (see authentication.otp_store)"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='email_otp')
     email = models.EmailField()
-    otp = models.CharField(max_length=6)
-    is_used = models.BooleanField(default=False)
+    code_hash = models.CharField(max_length=64)  # HMAC-SHA256 of the code, never the code itself
+    attempts = models.PositiveSmallIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
-    expires_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
     
     class Meta:
         db_table = 'email_otps'
@@ -138,13 +116,45 @@ class EmailOTP(models.Model):
         verbose_name_plural = 'Email OTPs'
     
     def __str__(self):
-        return f"OTP for {self.email} - {self.otp}"
+        return f"OTP for {self.email}"
     
     def is_expired(self):
         """Check if OTP has expired"""
         from django.utils import timezone
         return timezone.now() > self.expires_at
+
+class OutboundEmail(models.Model):
+    """Email queued by request handlers and delivered by the send_queued_email worker"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
+    subject = models.CharField(max_length=255)
+    to_email = models.EmailField()
+    from_email = models.CharField(max_length=255)
+    text_body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+    
+    # Delivery state
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
     
-    def is_valid(self):
-        """Check if OTP is valid (not used and not expired)"""
-        return not self.is_used and not self.is_expired()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'outbound_emails'
+        verbose_name = 'Outbound email'
+        verbose_name_plural = 'Outbound emails'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} to {self.to_email} ({self.status})"
@@ -0,0 +1,163 @@
+"""
+Pluggable storage for email verification codes.
+
+Each user has at most one pending code, keyed by user id, so issuing,
+verifying and consuming a code are all single-key operations. Codes are kept
+only as an HMAC of (user id, code), and each record counts attempts; after
+OTP_MAX_ATTEMPTS failures the code is burnt. An attempt is counted with an
+atomic write before the code is compared, so a burst of parallel guesses
+cannot get past the limit.
+
+``DatabaseOTPStore`` (the default) keeps one EmailOTP row per user; rows are
+deleted when consumed and ``purge_expired_otps`` removes abandoned ones.
+``CacheOTPStore`` keeps the same record in the Django cache with a TTL, so
+expiry needs no cleanup at all. Select one with the OTP_STORE setting.
+"""
+import hashlib
+import hmac
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import EmailOTP
+
+MAX_ATTEMPTS = getattr(settings, 'OTP_MAX_ATTEMPTS', 5)
+
+INVALID_MESSAGE = "Invalid OTP"
+EXPIRED_MESSAGE = "OTP has expired"
+LOCKED_MESSAGE = "Too many incorrect attempts. Please request a new OTP"
+
+
+@dataclass
+class IssuedOTP:
+    """A freshly issued code; the only place the plain code exists after sending"""
+    user_id: int
+    email: str
+    otp: str
+    expires_at: datetime
+
+
+def hash_code(user_id, code):
+    return hmac.new(settings.SECRET_KEY.encode(), f'{user_id}:{code}'.encode(), hashlib.sha256).hexdigest()
+
+
+def _matches(code_hash, user_id, code):
+    return hmac.compare_digest(code_hash, hash_code(user_id, code))
+
+
+class DatabaseOTPStore:
+    """One EmailOTP row per user, looked up by its unique user_id"""
+
+    def issue(self, user, email, code, ttl):
+        expires_at = timezone.now() + ttl
+        EmailOTP.objects.update_or_create(
+            user=user,
+            defaults={
+                'email': email,
+                'code_hash': hash_code(user.pk, code),
+                'attempts': 0,
+                'created_at': timezone.now(),
+                'expires_at': expires_at,
+            },
+        )
+        return IssuedOTP(user.pk, email, code, expires_at)
+
+    def verify(self, user, code):
+        """Consume the code if it matches; returns (success, message)"""
+        record = EmailOTP.objects.filter(user_id=user.pk).first()
+        if record is None:
+            return False, INVALID_MESSAGE
+        if record.is_expired():
+            record.delete()
+            return False, EXPIRED_MESSAGE
+        # The limit is checked by the UPDATE itself: parallel guesses cannot all pass it
+        if not EmailOTP.objects.filter(pk=record.pk, attempts__lt=MAX_ATTEMPTS).update(attempts=F('attempts') + 1):
+            return False, LOCKED_MESSAGE
+        if not _matches(record.code_hash, user.pk, code):
+            return False, INVALID_MESSAGE
+        # Only one request may consume a code
+        if not EmailOTP.objects.filter(pk=record.pk).delete()[0]:
+            return False, INVALID_MESSAGE
+        return True, None
+
+    def purge_expired(self):
+        return EmailOTP.objects.filter(expires_at__lte=timezone.now()).delete()[0]
+
+
+class CacheOTPStore:
+    """Codes kept in the default cache, expiring with the cache entry"""
+
+    def _key(self, user_id):
+        return f'otp:email:{user_id}'
+
+    def _attempts_key(self, user_id):
+        # A counter of its own, so cache.incr() can count attempts atomically
+        return f'otp:email:{user_id}:attempts'
+
+    def issue(self, user, email, code, ttl):
+        expires_at = timezone.now() + ttl
+        timeout = int(ttl.total_seconds())
+        cache.set(self._key(user.pk), {
+            'email': email,
+            'code_hash': hash_code(user.pk, code),
+            'expires_at': expires_at,
+        }, timeout=timeout)
+        cache.set(self._attempts_key(user.pk), 0, timeout=timeout)
+        return IssuedOTP(user.pk, email, code, expires_at)
+
+    def verify(self, user, code):
+        """Consume the code if it matches; returns (success, message)"""
+        key = self._key(user.pk)
+        record = cache.get(key)
+        if record is None:
+            return False, INVALID_MESSAGE
+        attempts_key = self._attempts_key(user.pk)
+        if timezone.now() > record['expires_at']:
+            cache.delete_many([key, attempts_key])
+            return False, EXPIRED_MESSAGE
+        try:
+            attempts = cache.incr(attempts_key)
+        except ValueError:
+            # Counter evicted: refuse rather than allow unlimited guesses
+            return False, LOCKED_MESSAGE
+        if attempts > MAX_ATTEMPTS:
+            return False, LOCKED_MESSAGE
+        if not _matches(record['code_hash'], user.pk, code):
+            return False, INVALID_MESSAGE
+        # Only one request may consume a code
+        if not cache.delete(key):
+            return False, INVALID_MESSAGE
+        cache.delete(attempts_key)
+        return True, None
+
+    def purge_expired(self):
+        # Cache entries expire on their own
+        return 0
+
+
+_store = None
+
+
+def get_store():
+    """The configured OTP store (OTP_STORE setting), created once per process"""
+    global _store
+    if _store is None:
+        _store = import_string(getattr(settings, 'OTP_STORE', 'authentication.otp_store.DatabaseOTPStore'))()
+    return _store
+
+
+def issue(user, email, code, expires_in_minutes=10):
+    return get_store().issue(user, email, code, timedelta(minutes=expires_in_minutes))
+
+
+def verify(user, code):
+    return get_store().verify(user, code)
+
+
+def purge_expired():
+    return get_store().purge_expired()
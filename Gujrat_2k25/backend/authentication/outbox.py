@@ -0,0 +1,113 @@
+"""
+Durable email outbox.
+
+Request handlers call ``enqueue()``, which only inserts an OutboundEmail row
+(inside the caller's transaction, so a rolled back registration never sends
+mail). The ``send_queued_email`` management command drains the table with
+``process_batch()``: due rows are claimed, sent as one connection-reusing
+batch (see ``mailer``) through the configured EMAIL_BACKEND, and either
+marked sent or rescheduled with exponential backoff until
+EMAIL_OUTBOX_MAX_ATTEMPTS is reached.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import mailer
+from .models import OutboundEmail
+
+# Retry schedule: base * 2 ** (attempts - 1), capped
+MAX_ATTEMPTS = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+BACKOFF_BASE_SECONDS = getattr(settings, 'EMAIL_OUTBOX_BACKOFF_SECONDS', 30)
+BACKOFF_MAX_SECONDS = getattr(settings, 'EMAIL_OUTBOX_BACKOFF_MAX_SECONDS', 3600)
+
+# Rows left in 'sending' longer than this belong to a crashed worker
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def enqueue(subject, to_email, text_body='', html_body='', from_email=None):
+    """Queue one email for the worker; returns the OutboundEmail row"""
+    return OutboundEmail.objects.create(
+        subject=subject,
+        to_email=to_email,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        text_body=text_body,
+        html_body=html_body,
+        next_attempt_at=timezone.now(),
+    )
+
+
+def backoff_seconds(attempts):
+    """Delay before the next attempt after ``attempts`` failures"""
+    return min(BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0), BACKOFF_MAX_SECONDS)
+
+
+def build_message(email):
+    """EmailMultiAlternatives for a queued row"""
+    return mailer.build_message(
+        email.subject, email.to_email, email.text_body, email.html_body, from_email=email.from_email
+    )
+
+
+def release_stale_claims(now=None):
+    """Put rows claimed by a worker that died mid-send back in the queue"""
+    now = now or timezone.now()
+    return OutboundEmail.objects.filter(
+        status='sending', claimed_at__lt=now - CLAIM_TIMEOUT
+    ).update(status='queued', claimed_at=None, next_attempt_at=now)
+
+
+def claim_batch(batch_size, now=None):
+    """Claim up to ``batch_size`` due rows for this worker"""
+    now = now or timezone.now()
+    due_ids = list(
+        OutboundEmail.objects.filter(status='queued', next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    claimed = []
+    for email_id in due_ids:
+        # Conditional update, so concurrent workers never claim the same row
+        if OutboundEmail.objects.filter(id=email_id, status='queued').update(status='sending', claimed_at=now):
+            claimed.append(email_id)
+    return list(OutboundEmail.objects.filter(id__in=claimed).order_by('next_attempt_at', 'id'))
+
+
+def mark_sent(email):
+    email.status = 'sent'
+    email.attempts += 1
+    email.sent_at = timezone.now()
+    email.claimed_at = None
+    email.last_error = ''
+    email.save(update_fields=['status', 'attempts', 'sent_at', 'claimed_at', 'last_error'])
+
+
+def mark_failed(email, error):
+    """Reschedule with backoff, or give up after MAX_ATTEMPTS"""
+    email.attempts += 1
+    email.claimed_at = None
+    email.last_error = str(error)
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = 'failed'
+    else:
+        email.status = 'queued'
+        email.next_attempt_at = timezone.now() + timedelta(seconds=backoff_seconds(email.attempts))
+    email.save(update_fields=['status', 'attempts', 'claimed_at', 'last_error', 'next_attempt_at'])
+
+
+def process_batch(batch_size=50):
+    """Send one batch of due emails; returns (sent, failed)"""
+    release_stale_claims()
+    sent = failed = 0
+    emails = claim_batch(batch_size)
+    errors = mailer.send_batch([build_message(email) for email in emails])
+    for email, error in zip(emails, errors):
+        if error is None:
+            mark_sent(email)
+            sent += 1
+        else:
+            print(f"Error sending queued email {email.id}: {error}")
+            mark_failed(email, error)
+            failed += 1
+    return sent, failed
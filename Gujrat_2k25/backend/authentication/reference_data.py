@@ -0,0 +1,117 @@
+"""
+Process-wide cache of near-static reference tables.
+
+A ReferenceDataset serializes its table once into the JSON body the list
+endpoint returns, together with an ETag, and serves that body (or a 304)
+until the data changes. Each dataset has a change counter in the default
+cache. Saves and deletes bump it after commit (receivers in the apps'
+``signals`` modules, so admin edits and management commands count too), and
+every process rebuilds its copy the next time it sees a new counter value.
+"""
+import hashlib
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
+
+from .models import CountryCode
+from .serializers import CountryCodeSerializer
+
+
+class _Snapshot:
+    def __init__(self, version, rows, body):
+        self.version = version
+        self.rows = rows
+        self.body = body
+        self.etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        self.lookups = {}
+
+
+class ReferenceDataset:
+    """A small table served from a precomputed, versioned JSON body"""
+
+    def __init__(self, name, get_queryset, serializer_class):
+        self.name = name
+        self.get_queryset = get_queryset
+        self.serializer_class = serializer_class
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    @property
+    def version_key(self):
+        return f'refdata:version:{self.name}'
+
+    def current_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            # A fresh starting value, so a counter lost from the cache never repeats
+            cache.add(self.version_key, time.time_ns(), timeout=None)
+            version = cache.get(self.version_key)
+        return version
+
+    def bump(self):
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, time.time_ns(), timeout=None)
+
+    def changed(self, **kwargs):
+        """Signal receiver: bump the counter once the write is committed"""
+        transaction.on_commit(self.bump)
+
+    def snapshot(self):
+        version = self.current_version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version != version:
+                rows = self.serializer_class(self.get_queryset(), many=True).data
+                # Same envelope as the paginated list these endpoints used to return
+                body = JSONRenderer().render({
+                    'count': len(rows),
+                    'next': None,
+                    'previous': None,
+                    'results': rows,
+                })
+                self._snapshot = _Snapshot(version, rows, body)
+            return self._snapshot
+
+    def rows(self):
+        return self.snapshot().rows
+
+    def lookup(self, key_field, value_field):
+        """{key: value} over the cached rows, built once per version"""
+        snapshot = self.snapshot()
+        lookup = snapshot.lookups.get((key_field, value_field))
+        if lookup is None:
+            lookup = {row[key_field]: row[value_field] for row in snapshot.rows}
+            snapshot.lookups[(key_field, value_field)] = lookup
+        return lookup
+
+    def response(self, request):
+        """200 with the cached body, or 304 when the client's ETag is current"""
+        snapshot = self.snapshot()
+        if snapshot.etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponse(status=304)
+        else:
+            response = HttpResponse(snapshot.body, content_type='application/json')
+        response['ETag'] = snapshot.etag
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+
+country_codes = ReferenceDataset(
+    'country_codes', CountryCode.get_active_countries, CountryCodeSerializer
+)
+
+DEFAULT_PHONE_LENGTH = 10
+
+
+def phone_length_for(country_code):
+    """Expected national number length for a country code, from the CountryCode table"""
+    return country_codes.lookup('code', 'phone_length').get(country_code, DEFAULT_PHONE_LENGTH)
@@ -0,0 +1,131 @@
+"""
+In-process membership test for the refresh-token blacklist.
+
+simplejwt checks every refresh token against BlacklistedToken with a query.
+Here each process keeps a bloom filter of blacklisted JTIs plus an exact set
+of the most recently blacklisted ones:
+
+* a JTI in the exact set is rejected without touching the database;
+* a JTI the bloom filter has never seen is accepted without touching it;
+* only a bloom hit outside the exact set is confirmed with a query.
+
+The filter is loaded from the database on first use and then follows new
+BlacklistedToken rows by id at most every TOKEN_BLACKLIST_SYNC_SECONDS, so a
+logout handled by another process takes effect within that interval.
+Tokens blacklisted by this process are added immediately.
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+CAPACITY = getattr(settings, 'TOKEN_BLACKLIST_BLOOM_CAPACITY', 100000)
+ERROR_RATE = getattr(settings, 'TOKEN_BLACKLIST_BLOOM_ERROR_RATE', 0.001)
+RECENT_SIZE = getattr(settings, 'TOKEN_BLACKLIST_RECENT_SIZE', 10000)
+SYNC_SECONDS = getattr(settings, 'TOKEN_BLACKLIST_SYNC_SECONDS', 10)
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings"""
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Double hashing: position_i = h1 + i * h2
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class TokenBlacklistFilter:
+    """Bloom filter plus exact recent set, synced incrementally from BlacklistedToken"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._recent = OrderedDict()
+        self._last_id = 0
+        self._synced_at = 0.0
+
+    def _remember(self, jti):
+        self._bloom.add(jti)
+        self._recent[jti] = True
+        self._recent.move_to_end(jti)
+        while len(self._recent) > RECENT_SIZE:
+            self._recent.popitem(last=False)
+
+    def _rows(self, **filters):
+        return (
+            BlacklistedToken.objects.filter(**filters)
+            .order_by('id')
+            .values_list('id', 'token__jti')
+        )
+
+    def load(self):
+        """(Re)build the filter from unexpired blacklist rows"""
+        with self._lock:
+            self._bloom = BloomFilter(CAPACITY, ERROR_RATE)
+            self._recent.clear()
+            self._last_id = 0
+            for row_id, jti in self._rows(token__expires_at__gt=timezone.now()).iterator():
+                self._remember(jti)
+                self._last_id = row_id
+            self._synced_at = time.monotonic()
+
+    def sync(self, force=False):
+        """Pick up rows blacklisted by other processes since the last sync"""
+        if self._bloom is None:
+            self.load()
+            return
+        if not force and time.monotonic() - self._synced_at < SYNC_SECONDS:
+            return
+        with self._lock:
+            for row_id, jti in self._rows(id__gt=self._last_id):
+                self._remember(jti)
+                self._last_id = row_id
+            self._synced_at = time.monotonic()
+        # Rebuild once the filter holds more entries than it was sized for
+        if self._bloom.count > CAPACITY:
+            self.load()
+
+    def add(self, jti):
+        """Record a JTI blacklisted by this process"""
+        self.sync()
+        with self._lock:
+            self._remember(jti)
+
+    def is_blacklisted(self, jti):
+        self.sync()
+        if jti in self._recent:
+            return True
+        if jti not in self._bloom:
+            return False
+        # Possible false positive; the database has the final say
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    def reset(self):
+        with self._lock:
+            self._bloom = None
+            self._recent.clear()
+            self._last_id = 0
+
+
+blacklist_filter = TokenBlacklistFilter()
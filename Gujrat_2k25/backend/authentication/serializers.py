@@ -1,7 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
 from .models import User, CountryCode
+from .tokens import RefreshToken
 
 class CountryCodeSerializer(serializers.ModelSerializer):
     """Serializer for country codes"""
@@ -57,31 +59,9 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         """Validate phone number length based on country code"""
         import re
         
-        # Country code to expected length mapping
-        country_lengths = {
-            '+91': 10,  # India
-            '+1': 10,   # US/Canada
-            '+44': 10,  # UK
-            '+61': 9,   # Australia
-            '+86': 11,  # China
-            '+81': 10,  # Japan
-            '+49': 11,  # Germany
-            '+33': 9,   # France
-            '+39': 10,  # Italy
-            '+34': 9,   # Spain
-            '+7': 10,   # Russia
-            '+55': 11,  # Brazil
-            '+52': 10,  # Mexico
-            '+27': 9,   # South Africa
-            '+971': 9,  # UAE
-            '+966': 9,  # Saudi Arabia
-            '+65': 8,   # Singapore
-            '+60': 9,   # Malaysia
-            '+66': 9,   # Thailand
-            '+84': 9,   # Vietnam
-        }
-        
-        expected_length = country_lengths.get(country_code, 10)
+        # Expected lengths come from the CountryCode table
+        from .reference_data import phone_length_for
+        expected_length = phone_length_for(country_code)
         phone_str = str(phone_number)
         
         # Remove any non-digit characters for length check
@@ -201,4 +181,8 @@ class ResendOTPSerializer(serializers.Serializer):
         """Validate email exists"""
         if not User.objects.filter(email=value).exists():
             raise serializers.ValidationError("No user found with this email address")
-        return value 
\ No newline at end of file
+        return value 
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """Token refresh serializer checking the blacklist through the in-process filter"""
+    token_class = RefreshToken
@@ -0,0 +1,24 @@
+"""
+Signal handlers for the authentication app.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_user
+from .models import CountryCode, User
+from .reference_data import country_codes
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+    # A request may re-cache the old row before this transaction commits
+    transaction.on_commit(lambda: invalidate_user(instance.pk))
+
+
+@receiver(post_save, sender=CountryCode)
+@receiver(post_delete, sender=CountryCode)
+def country_codes_changed(sender, **kwargs):
+    country_codes.changed()
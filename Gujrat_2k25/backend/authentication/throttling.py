@@ -0,0 +1,149 @@
+"""
+Token-bucket throttles for the unauthenticated probe endpoints.
+
+Each bucket holds up to N tokens and refills continuously at N per period
+for a rate of "N/period" (DRF rate syntax, configured under
+REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] by scope). A request takes one
+token, so short bursts up to N pass while the sustained rate is capped.
+
+Buckets live in the default cache: per process with locmem, shared between
+workers with Redis/Memcached. Throttles run in APIView.initial(), before
+the handler does any ORM work. Every endpoint gets two buckets: one per
+client IP and one per target email/phone (scope + "_target"), so neither a
+single client nor a distributed probe of a single account gets through.
+"""
+import hashlib
+import threading
+import time
+
+from django.core.cache import cache as default_cache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIOD_SECONDS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Base class; subclasses set ``scope`` and implement ``get_ident_key``"""
+    scope = None
+    cache = default_cache
+    timer = time.time
+    _lock = threading.Lock()
+
+    def __init__(self):
+        rate = self.get_rate()
+        self.capacity, self.period = self.parse_rate(rate) if rate else (None, None)
+        self.wait_seconds = None
+
+    def get_rate(self):
+        if not self.scope:
+            raise ImproperlyConfigured(f"{self.__class__.__name__} must set a throttle scope")
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def parse_rate(self, rate):
+        num, period = rate.split('/')
+        return int(num), PERIOD_SECONDS[period[0]]
+
+    def get_ident_key(self, request, view):
+        """Identity the bucket is kept for, or None to skip throttling"""
+        raise NotImplementedError('.get_ident_key() must be overridden')
+
+    def allow_request(self, request, view):
+        if self.capacity is None:
+            return True
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return True
+
+        key = f'throttle:{self.scope}:{ident}'
+        refill_per_second = self.capacity / self.period
+        with self._lock:
+            now = self.timer()
+            tokens, updated_at = self.cache.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated_at) * refill_per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            else:
+                self.wait_seconds = (1 - tokens) / refill_per_second
+            self.cache.set(key, (tokens, now), self.period)
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Bucket per client IP"""
+
+    def get_ident_key(self, request, view):
+        return self.get_ident(request)
+
+
+class TargetTokenBucketThrottle(TokenBucketThrottle):
+    """Bucket per probed email address or phone number, across all clients"""
+
+    def get_ident_key(self, request, view):
+        target = self.get_target(request)
+        if not target:
+            return None
+        return hashlib.sha1(target.strip().lower().encode()).hexdigest()
+
+    def get_target(self, request):
+        raise NotImplementedError('.get_target() must be overridden')
+
+
+def _param(request, name):
+    value = request.query_params.get(name)
+    if value is None and request.method not in ('GET', 'HEAD'):
+        try:
+            value = request.data.get(name)
+        except AttributeError:
+            value = None
+    return value if isinstance(value, str) else None
+
+
+class EmailTargetThrottle(TargetTokenBucketThrottle):
+    def get_target(self, request):
+        return _param(request, 'email')
+
+
+class PhoneTargetThrottle(TargetTokenBucketThrottle):
+    def get_target(self, request):
+        phone = _param(request, 'phone')
+        return f"{_param(request, 'country_code') or '+91'}{phone}" if phone else None
+
+
+# Per-endpoint throttles
+
+class EmailCheckThrottle(IPTokenBucketThrottle):
+    scope = 'email_check'
+
+
+class EmailCheckTargetThrottle(EmailTargetThrottle):
+    scope = 'email_check_target'
+
+
+class PhoneCheckThrottle(IPTokenBucketThrottle):
+    scope = 'phone_check'
+
+
+class PhoneCheckTargetThrottle(PhoneTargetThrottle):
+    scope = 'phone_check_target'
+
+
+class OTPVerifyThrottle(IPTokenBucketThrottle):
+    scope = 'otp_verify'
+
+
+class OTPVerifyTargetThrottle(EmailTargetThrottle):
+    scope = 'otp_verify_target'
+
+
+class OTPResendThrottle(IPTokenBucketThrottle):
+    scope = 'otp_resend'
+
+
+class OTPResendTargetThrottle(EmailTargetThrottle):
+    scope = 'otp_resend_target'
@@ -1,13 +1,18 @@
 from django.shortcuts import render
 from rest_framework import status, generics, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 from django.db import transaction
 from .models import User, CountryCode
 from .email_service import EmailService
+from .tokens import RefreshToken
+from . import reference_data
+from .throttling import (
+    EmailCheckThrottle, EmailCheckTargetThrottle, PhoneCheckThrottle, PhoneCheckTargetThrottle,
+    OTPVerifyThrottle, OTPVerifyTargetThrottle, OTPResendThrottle, OTPResendTargetThrottle
+)
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserProfileSerializer,
     ChangePasswordSerializer, CountryCodeSerializer, LogoutSerializer,
@@ -21,6 +26,10 @@ class CountryCodeListView(generics.ListAPIView):
     queryset = CountryCode.get_active_countries()
     serializer_class = CountryCodeSerializer
     permission_classes = [permissions.AllowAny]
+    
+    def list(self, request, *args, **kwargs):
+        """Serve the cached country code list"""
+        return reference_data.country_codes.response(request)
 
 class UserRegistrationView(APIView):
     """API view for user registration"""
@@ -231,6 +240,7 @@ class LogoutView(APIView):
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([EmailCheckThrottle, EmailCheckTargetThrottle])
 def check_email_exists(request):
     """Check if email already exists"""
     email = request.GET.get('email')
@@ -253,6 +263,7 @@ def check_email_exists(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([PhoneCheckThrottle, PhoneCheckTargetThrottle])
 def check_phone_exists(request):
     """Check if phone number already exists"""
     phone = request.GET.get('phone')
@@ -368,6 +379,7 @@ class VerifyEmailView(APIView):
 class VerifyEmailWithoutAuthView(APIView):
     """API view for email verification without authentication (for new registrations)"""
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [OTPVerifyThrottle, OTPVerifyTargetThrottle]
     
     def post(self, request):
         """Verify email with OTP and email"""
@@ -430,6 +442,7 @@ class VerifyEmailWithoutAuthView(APIView):
 class ResendOTPView(APIView):
     """API view for resending OTP"""
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [OTPResendThrottle, OTPResendTargetThrottle]
     
     def post(self, request):
         """Resend OTP to user's email"""
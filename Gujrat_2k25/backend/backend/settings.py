@@ -91,6 +91,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # On disk rather than in memory, so threaded tests see SQLite's real file locking
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
@@ -135,6 +137,11 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Stream uploads to temporary files instead of memory; storing a photo is then a rename
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -146,7 +153,7 @@ AUTH_USER_MODEL = 'authentication.User'
 # REST Framework Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -156,8 +163,36 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    # Token-bucket rates for the public probe endpoints (authentication.throttling):
+    # "N/period" allows bursts of N and N per period sustained
+    'DEFAULT_THROTTLE_RATES': {
+        'email_check': '60/min',
+        'email_check_target': '20/min',
+        'phone_check': '60/min',
+        'phone_check_target': '20/min',
+        'otp_verify': '20/min',
+        'otp_verify_target': '5/min',
+        'otp_resend': '10/hour',
+        'otp_resend_target': '5/hour',
+    },
 }
 
+# Cache (per process; point this at Redis/Memcached when running several workers)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'quickcourt',
+    }
+}
+
+# Email verification codes: 'authentication.otp_store.DatabaseOTPStore' or
+# 'authentication.otp_store.CacheOTPStore' (needs a cache shared by all workers)
+OTP_STORE = 'authentication.otp_store.DatabaseOTPStore'
+OTP_MAX_ATTEMPTS = 5
+
+# Seconds an authenticated user's profile is served from the cache
+AUTH_USER_CACHE_TIMEOUT = 60
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
@@ -184,8 +219,14 @@ SIMPLE_JWT = {
     
     # Blacklist settings
     'BLACKLIST_TOKEN_CHECKS': ['access', 'refresh'],
+    'TOKEN_REFRESH_SERIALIZER': 'authentication.serializers.TokenRefreshSerializer',
 }
 
+# In-process refresh-token blacklist filter (see authentication.revocation)
+TOKEN_BLACKLIST_BLOOM_CAPACITY = 100000
+TOKEN_BLACKLIST_BLOOM_ERROR_RATE = 0.001
+TOKEN_BLACKLIST_SYNC_SECONDS = 10
+
 # CORS Settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:8080",
@@ -230,9 +271,34 @@ EMAIL_HOST_USER = 'ziyakhanitm@gmail.com'
 EMAIL_HOST_PASSWORD = 'vgew epwa txso dedw'  # Generate this from Google Account settings
 DEFAULT_FROM_EMAIL = 'QuickCourt <ziyakhanitm@gmail.com>'
 
+# Email outbox: request handlers only queue mail; run
+# `python manage.py send_queued_email` to deliver it
+EMAIL_USE_OUTBOX = os.environ.get('EMAIL_USE_OUTBOX', 'true').lower() == 'true'
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_BACKOFF_SECONDS = 30
+# Messages sent over one SMTP session before reconnecting
+EMAIL_MAX_MESSAGES_PER_CONNECTION = 50
+
 # Razorpay test keys (development only)
 RAZORPAY_KEY_ID = os.environ.get('RAZORPAY_KEY_ID', 'rzp_test_v5n8Topc32jGgR')
 RAZORPAY_KEY_SECRET = os.environ.get('RAZORPAY_KEY_SECRET', 'wjFlmjfajhTC2t3aSF5u4J8W')
+# Keep-alive HTTPS connections held by the shared Razorpay client
+RAZORPAY_POOL_SIZE = 10
+# How long a slot stays reserved for a player in checkout
+SLOT_HOLD_SECONDS = 600
+# Retries (with exponential backoff) when a booking commit hits "database is locked"
+BOOKING_COMMIT_RETRIES = 5
+BOOKING_COMMIT_BACKOFF_SECONDS = 0.05
+# Most slots one batch booking request may contain
+BOOKING_BATCH_MAX_ITEMS = 20
+# Most dates one recurring booking series expands to
+BOOKING_SERIES_MAX_OCCURRENCES = 52
+# Background threads building photo derivatives (thumb/card/full, WebP + JPEG)
+IMAGE_DERIVATIVE_WORKERS = 2
+# Threads validating uploaded photos, and the limits they enforce
+PHOTO_UPLOAD_WORKERS = 4
+PHOTO_UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+PHOTO_UPLOAD_MAX_PIXELS = 40_000_000
 
 # Frontend URL for password reset
 FRONTEND_URL = 'http://localhost:8080'
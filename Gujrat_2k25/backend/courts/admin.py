@@ -1,7 +1,9 @@
 from django.contrib import admin
 from .models import (
     Facility, FacilityPhoto, Sport, FacilitySport, Amenity, FacilityAmenity,
-    Court, TimeSlot, Booking, CourtRating, Notification
+    Court, TimeSlot, Booking, CourtRating, Notification, FacilityStats, CourtStats,
+    BookingDailyRollup, PaymentOrder, SlotHold, BookingSeries, CourtSchedule, ScheduleException,
+    StoredBlob
 )
 
 @admin.register(Sport)
@@ -72,4 +74,61 @@ class NotificationAdmin(admin.ModelAdmin):
     list_display = ['user', 'notification_type', 'title', 'is_read', 'created_at']
     list_filter = ['notification_type', 'is_read', 'created_at']
     search_fields = ['user__first_name', 'user__last_name', 'title', 'message']
-    readonly_fields = ['created_at'] 
\ No newline at end of file
+    readonly_fields = ['created_at'] 
+@admin.register(FacilityStats)
+class FacilityStatsAdmin(admin.ModelAdmin):
+    list_display = ['facility', 'total_courts', 'total_bookings', 'total_earnings', 'starting_price', 'review_count', 'updated_at']
+    search_fields = ['facility__name']
+    readonly_fields = ['updated_at']
+
+@admin.register(CourtStats)
+class CourtStatsAdmin(admin.ModelAdmin):
+    list_display = ['court', 'total_bookings', 'total_earnings', 'review_count', 'updated_at']
+    search_fields = ['court__name', 'court__facility__name']
+    readonly_fields = ['updated_at']
+
+@admin.register(BookingDailyRollup)
+class BookingDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['court', 'facility', 'date', 'pending_count', 'confirmed_count', 'cancelled_count', 'earnings']
+    list_filter = ['date']
+    search_fields = ['court__name', 'facility__name']
+
+@admin.register(PaymentOrder)
+class PaymentOrderAdmin(admin.ModelAdmin):
+    list_display = ['razorpay_order_id', 'user', 'amount', 'status', 'booking', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['razorpay_order_id', 'razorpay_payment_id', 'user__email']
+    readonly_fields = ['created_at', 'updated_at']
+
+@admin.register(SlotHold)
+class SlotHoldAdmin(admin.ModelAdmin):
+    list_display = ['court', 'user', 'booking_date', 'start_time', 'end_time', 'expires_at']
+    list_filter = ['booking_date']
+    search_fields = ['court__name', 'user__email']
+    readonly_fields = ['created_at']
+
+@admin.register(BookingSeries)
+class BookingSeriesAdmin(admin.ModelAdmin):
+    list_display = ['court', 'user', 'frequency', 'start_date', 'end_date', 'start_time', 'end_time', 'status']
+    list_filter = ['frequency', 'status']
+    search_fields = ['court__name', 'user__email']
+    readonly_fields = ['created_at', 'cancelled_at']
+
+@admin.register(CourtSchedule)
+class CourtScheduleAdmin(admin.ModelAdmin):
+    list_display = ['court', 'opening_time', 'closing_time', 'slot_minutes', 'buffer_minutes', 'updated_at']
+    search_fields = ['court__name', 'court__facility__name']
+    readonly_fields = ['updated_at']
+
+@admin.register(ScheduleException)
+class ScheduleExceptionAdmin(admin.ModelAdmin):
+    list_display = ['court', 'date', 'is_closed', 'opening_time', 'closing_time', 'reason']
+    list_filter = ['is_closed', 'date']
+    search_fields = ['court__name', 'reason']
+    readonly_fields = ['created_at']
+
+@admin.register(StoredBlob)
+class StoredBlobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'size', 'refcount', 'created_at']
+    search_fields = ['name', 'sha256']
+    readonly_fields = ['name', 'sha256', 'size', 'refcount', 'created_at']
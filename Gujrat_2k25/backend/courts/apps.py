@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class CourtsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'courts' 
\ No newline at end of file
+    name = 'courts'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,121 @@
+"""
+Availability index for courts.
+
+Each (court, date) pair is represented by a minute-of-day bitmap stored in a
+plain Python int: bit ``m`` is set when minute ``m`` of that day is taken by
+an active booking or a live checkout hold (see ``holds``). Building the index
+costs one bookings query and one holds query no matter how many courts or
+slots are checked against it afterwards.
+"""
+from collections import defaultdict
+
+from django.utils import timezone
+
+from .models import Booking, SlotHold
+
+MINUTES_PER_DAY = 24 * 60
+
+# Bookings in these states block the slot for other players
+ACTIVE_BOOKING_STATUSES = ['pending', 'confirmed']
+
+
+def minute_of_day(value):
+    """Convert a time object to minutes since midnight"""
+    return value.hour * 60 + value.minute
+
+
+def interval_mask(start_time, end_time):
+    """Bitmap covering the half-open minute range [start_time, end_time)"""
+    start = minute_of_day(start_time)
+    end = minute_of_day(end_time)
+    if end <= start:
+        return 0
+    return ((1 << end) - 1) ^ ((1 << start) - 1)
+
+
+class AvailabilityIndex:
+    """Minute-of-day booking bitmaps keyed by (court_id, date)"""
+
+    def __init__(self):
+        self._bitmaps = defaultdict(int)
+
+    @classmethod
+    def for_courts(cls, court_ids, dates, viewer=None):
+        """Build the index for the given courts and dates from one bookings query"""
+        court_ids = list(court_ids)
+        dates = list(dates)
+        if not court_ids or not dates:
+            return cls()
+        return cls._from_bookings(court_ids, viewer, booking_date__in=dates)
+
+    @classmethod
+    def for_date_range(cls, court_ids, start_date, end_date, viewer=None):
+        """Build the index for an inclusive date range from one bookings query"""
+        court_ids = list(court_ids)
+        if not court_ids or end_date < start_date:
+            return cls()
+        return cls._from_bookings(court_ids, viewer, booking_date__range=(start_date, end_date))
+
+    @classmethod
+    def _from_bookings(cls, court_ids, viewer, **date_filter):
+        index = cls()
+        bookings = Booking.objects.filter(
+            court_id__in=court_ids,
+            status__in=ACTIVE_BOOKING_STATUSES,
+            **date_filter
+        ).values_list('court_id', 'booking_date', 'start_time', 'end_time')
+
+        for court_id, booking_date, start_time, end_time in bookings:
+            index.mark(court_id, booking_date, start_time, end_time)
+
+        # The viewer's own holds stay free to them, so a restarted checkout can pick the slot again
+        holds = SlotHold.objects.filter(
+            court_id__in=court_ids,
+            expires_at__gt=timezone.now(),
+            **date_filter
+        )
+        if viewer is not None and viewer.is_authenticated:
+            holds = holds.exclude(user=viewer)
+        for court_id, booking_date, start_time, end_time in holds.values_list(
+            'court_id', 'booking_date', 'start_time', 'end_time'
+        ):
+            index.mark(court_id, booking_date, start_time, end_time)
+        return index
+
+    def mark(self, court_id, date, start_time, end_time):
+        """Mark an interval as taken"""
+        self._bitmaps[(court_id, date)] |= interval_mask(start_time, end_time)
+
+    def bitmap(self, court_id, date):
+        """Raw bitmap for a court and date (0 when nothing is booked)"""
+        return self._bitmaps.get((court_id, date), 0)
+
+    def is_free(self, court_id, date, start_time, end_time):
+        """Check whether the interval overlaps no booking"""
+        return not (self.bitmap(court_id, date) & interval_mask(start_time, end_time))
+
+    def free_slots(self, court_id, date, slots):
+        """Filter slot objects (with start_time/end_time) down to the free ones"""
+        taken = self.bitmap(court_id, date)
+        if not taken:
+            return list(slots)
+        return [
+            slot for slot in slots
+            if not (taken & interval_mask(slot.start_time, slot.end_time))
+        ]
+
+    def slot_bitstring(self, court_id, date, slots, open_slots=None):
+        """Encode slot availability as a string with '1' for free and '0' for taken
+
+        When ``open_slots`` is given (the slots actually offered that day),
+        slots missing from it are reported as taken.
+        """
+        taken = self.bitmap(court_id, date)
+        offered = None
+        if open_slots is not None and open_slots is not slots:
+            offered = {(slot.start_time, slot.end_time) for slot in open_slots}
+        return ''.join(
+            '0' if taken & interval_mask(slot.start_time, slot.end_time)
+            or (offered is not None and (slot.start_time, slot.end_time) not in offered) else '1'
+            for slot in slots
+        )
@@ -0,0 +1,247 @@
+"""
+Serialized booking commits.
+
+Checking for an overlapping booking and inserting the new one must happen as
+one step per (court, date), otherwise two requests can both pass the check.
+``commit()`` runs a write function inside a transaction that is serialized
+against every other commit for the same court and date:
+
+* inside one process, a striped lock keyed by (court, date) queues threads
+  without touching the database;
+* on SQLite the transaction opens with ``BEGIN IMMEDIATE``, which takes the
+  database write lock before the overlap check instead of at the first
+  insert (SQLite ignores SELECT ... FOR UPDATE);
+* on PostgreSQL a transaction-scoped advisory lock on (court id, date) is
+  taken, and on other databases the court row is locked FOR UPDATE.
+
+When SQLite's busy timeout runs out ("database is locked") or the database
+reports a deadlock, the whole transaction is rolled back and retried with
+exponential backoff, up to BOOKING_COMMIT_RETRIES times.
+
+``book()`` is the overlap-checked insert used by the booking serializer, the
+payment flow and the ``stress_booking_commit`` harness. ``book_many()`` books
+several ranges all or nothing: one overlap scan covers every court and day in
+the batch, and the rows go in with a single bulk_create.
+"""
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+from . import holds, rollups, stats
+from .availability import AvailabilityIndex
+from .models import Booking, Court
+
+MAX_RETRIES = getattr(settings, 'BOOKING_COMMIT_RETRIES', 5)
+BACKOFF_SECONDS = getattr(settings, 'BOOKING_COMMIT_BACKOFF_SECONDS', 0.05)
+
+RETRYABLE_ERRORS = ('database is locked', 'deadlock')
+
+_LOCK_STRIPES = 64
+# Reentrant, so a commit nested inside another for the same court and day does not block itself
+_stripes = [threading.RLock() for _ in range(_LOCK_STRIPES)]
+
+
+class SlotUnavailable(Exception):
+    """The requested range overlaps a booking or another player's hold"""
+
+
+class BatchUnavailable(SlotUnavailable):
+    """Some ranges of a batch are taken; ``results`` has one entry per requested item"""
+
+    def __init__(self, results):
+        super().__init__("Some of the requested time slots are not available")
+        self.results = results
+
+
+@contextmanager
+def _striped_locks(keys):
+    """Hold the stripe locks for every (court, date) key, always acquired in stripe order"""
+    stripes = sorted({hash(key) % _LOCK_STRIPES for key in keys})
+    for index in stripes:
+        _stripes[index].acquire()
+    try:
+        yield
+    finally:
+        for index in reversed(stripes):
+            _stripes[index].release()
+
+
+def _is_retryable(error):
+    message = str(error).lower()
+    return any(marker in message for marker in RETRYABLE_ERRORS)
+
+
+@contextmanager
+def _immediate_atomic(connection):
+    """Outermost atomic block opened with BEGIN IMMEDIATE instead of a deferred BEGIN"""
+    # Django opens the outermost transaction on SQLite by calling the backend's private
+    # _start_transaction_under_autocommit() (Django 2.0 through 5.x; written against 4.2).
+    # Should a Django upgrade drop that hook, take the write lock with a no-op UPDATE as
+    # the first statement instead, which SQLite treats the same as BEGIN IMMEDIATE.
+    if not hasattr(type(connection), '_start_transaction_under_autocommit'):
+        with transaction.atomic(using=connection.alias):
+            connection.cursor().execute(f'UPDATE {Booking._meta.db_table} SET id = id WHERE 0')
+            yield
+        return
+
+    def begin_immediate():
+        connection.cursor().execute('BEGIN IMMEDIATE')
+
+    # Instance attribute shadows the backend method just for this BEGIN
+    connection._start_transaction_under_autocommit = begin_immediate
+    try:
+        with transaction.atomic(using=connection.alias):
+            del connection._start_transaction_under_autocommit
+            yield
+    finally:
+        connection.__dict__.pop('_start_transaction_under_autocommit', None)
+
+
+def _lock_rows(connection, keys):
+    # Sorted, so two commits over overlapping keys cannot deadlock each other
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            for court_id, booking_date in keys:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s, %s)', [court_id, booking_date.toordinal()])
+    elif connection.vendor != 'sqlite':
+        court_ids = sorted({court_id for court_id, _ in keys})
+        list(
+            Court.objects.using(connection.alias).select_for_update()
+            .filter(pk__in=court_ids).order_by('pk').values_list('pk')
+        )
+
+
+@contextmanager
+def _serialized(connection, keys):
+    if connection.in_atomic_block:
+        # The caller owns the transaction: lock what we can inside a savepoint
+        with transaction.atomic(using=connection.alias):
+            _lock_rows(connection, keys)
+            yield
+    elif connection.vendor == 'sqlite':
+        with _immediate_atomic(connection):
+            yield
+    else:
+        with transaction.atomic(using=connection.alias):
+            _lock_rows(connection, keys)
+            yield
+
+
+def commit(court_id, booking_date, write, using=DEFAULT_DB_ALIAS):
+    """Run ``write()`` in a transaction serialized per (court, date) and return its result"""
+    return commit_many([(court_id, booking_date)], write, using=using)
+
+
+def commit_many(keys, write, using=DEFAULT_DB_ALIAS):
+    """Like commit(), serialized against every (court, date) in ``keys`` at once"""
+    keys = sorted(set(keys))
+    connection = connections[using]
+    nested = connection.in_atomic_block
+    attempt = 0
+    while True:
+        try:
+            with _striped_locks(keys):
+                with _serialized(connection, keys):
+                    return write()
+        except OperationalError as e:
+            # A failed statement inside someone else's transaction cannot be retried from here
+            if nested or attempt >= MAX_RETRIES or not _is_retryable(e):
+                raise
+            time.sleep(BACKOFF_SECONDS * (2 ** attempt) * (0.5 + random.random()))
+            attempt += 1
+
+
+def book(user, court, booking_date, start_time, end_time, **fields):
+    """Create a booking unless the range is taken; raises SlotUnavailable otherwise"""
+    def write():
+        conflict = Booking.objects.filter(
+            court=court,
+            booking_date=booking_date,
+            status__in=['pending', 'confirmed'],
+            start_time__lt=end_time,
+            end_time__gt=start_time
+        ).exists()
+        if conflict:
+            raise SlotUnavailable("Time slot is already booked")
+        if holds.is_held_by_other(court, booking_date, start_time, end_time, user):
+            raise SlotUnavailable(holds.CONFLICT_MESSAGE)
+
+        booking = Booking.objects.create(
+            user=user,
+            facility=court.facility,
+            court=court,
+            booking_date=booking_date,
+            start_time=start_time,
+            end_time=end_time,
+            **fields
+        )
+        # The booking replaces the player's checkout hold
+        holds.release(user, court, booking_date, start_time, end_time)
+        return booking
+
+    return commit(court.pk, booking_date, write)
+
+
+def book_many(user, items):
+    """Create one booking per item, all or nothing; raises BatchUnavailable if any range is taken
+
+    Each item is a dict of Booking fields with at least court, booking_date,
+    start_time, end_time, duration_hours and price_per_hour.
+    """
+    keys = [(item['court'].pk, item['booking_date']) for item in items]
+
+    def write():
+        # One bookings query and one holds query for every court and day in the batch
+        taken = AvailabilityIndex.for_courts({court_id for court_id, _ in keys}, {day for _, day in keys}, viewer=user)
+        requested = AvailabilityIndex()
+        results = []
+        for item in items:
+            court_id = item['court'].pk
+            span = (item['booking_date'], item['start_time'], item['end_time'])
+            if not requested.is_free(court_id, *span):
+                results.append({'success': False, 'message': "Overlaps another slot in this request"})
+            elif not taken.is_free(court_id, *span):
+                results.append({'success': False, 'message': holds.CONFLICT_MESSAGE})
+            else:
+                results.append({'success': True})
+            requested.mark(court_id, *span)
+        if not all(result['success'] for result in results):
+            raise BatchUnavailable(results)
+
+        return insert_bookings(user, [
+            Booking(
+                user=user,
+                facility=item['court'].facility,
+                total_amount=item['price_per_hour'] * item['duration_hours'],
+                **item
+            )
+            for item in items
+        ])
+
+    return commit_many(keys, write)
+
+
+def insert_bookings(user, bookings):
+    """bulk_create already checked bookings and keep the derived tables in step; call inside commit_many()"""
+    bookings = Booking.objects.bulk_create(bookings)
+
+    # bulk_create skips save() and the post_save handlers in signals.py, so apply their deltas here.
+    # Equal stats contributions are applied together: the delta is scaled by the count.
+    contributions = Counter(
+        stats.booking_contribution(booking.court_id, booking.facility_id, booking.payment_status, booking.total_amount)
+        for booking in bookings
+    )
+    for contribution, count in contributions.items():
+        stats.apply_booking_delta(*contribution, sign=count)
+    for booking in bookings:
+        rollups.apply_booking_delta(*rollups.booking_contribution(
+            booking.court_id, booking.facility_id, booking.booking_date,
+            booking.status, booking.total_amount, booking.start_time
+        ), sign=1)
+        holds.release(user, booking.court, booking.booking_date, booking.start_time, booking.end_time)
+    return bookings
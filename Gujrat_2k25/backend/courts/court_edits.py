@@ -0,0 +1,111 @@
+"""
+Diffing updates for a court's time slots and photos.
+
+Court edits submit the full list of slots and, when files are attached, the
+full list of photos. Instead of deleting every row and inserting the list
+again one row at a time, the submitted list is compared with what is stored:
+
+* slots are matched on (start_time, end_time); matched rows keep their id,
+  new ranges go in with one bulk_create and rows no longer listed go out
+  with one DELETE. Blocked rows are never removed by an edit, since the
+  edit form does not show them;
+* photos are matched on the SHA-256 of their bytes, so re-submitting the
+  same images keeps the existing rows and files and only new images are
+  written. The first submitted photo becomes the primary one.
+
+Either way an edit costs a handful of statements whatever the list size.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils.dateparse import parse_time
+
+from . import images
+from .models import CourtPhoto, TimeSlot
+from .storage import content_digest, upload_digest
+
+
+def _as_time(value):
+    if isinstance(value, str):
+        return parse_time(value)
+    return value
+
+
+@transaction.atomic
+def sync_time_slots(court, time_slots_data):
+    """Make the court's unblocked slots match the submitted list; returns (added, removed) counts"""
+    submitted = {}
+    for slot_data in time_slots_data:
+        key = (_as_time(slot_data['start_time']), _as_time(slot_data['end_time']))
+        submitted[key] = slot_data.get('is_available', True)
+
+    existing = {(slot.start_time, slot.end_time): slot for slot in court.time_slots.all()}
+
+    changed = []
+    for key, is_available in submitted.items():
+        slot = existing.get(key)
+        if slot is not None and not slot.is_blocked and slot.is_available != is_available:
+            slot.is_available = is_available
+            changed.append(slot)
+    if changed:
+        TimeSlot.objects.bulk_update(changed, ['is_available'])
+
+    removed_ids = [
+        slot.id for key, slot in existing.items()
+        if key not in submitted and not slot.is_blocked
+    ]
+    removed = TimeSlot.objects.filter(id__in=removed_ids).delete()[0] if removed_ids else 0
+
+    added = TimeSlot.objects.bulk_create([
+        TimeSlot(court=court, start_time=start_time, end_time=end_time, is_available=is_available)
+        for (start_time, end_time), is_available in submitted.items()
+        if (start_time, end_time) not in existing
+    ])
+    return len(added), removed
+
+
+def _stored_digest(photo):
+    # Content-addressed names carry the digest already (see courts.storage)
+    digest_of = getattr(photo.image.storage, 'digest_of', None)
+    digest = digest_of(photo.image.name) if digest_of else None
+    if digest:
+        return digest
+    try:
+        with photo.image.open('rb') as image:
+            return content_digest(image)
+    except (FileNotFoundError, ValueError):
+        # Missing file: never matches, so the row is replaced
+        return None
+
+
+@transaction.atomic
+def sync_photos(court, photos):
+    """Make the court's photos match the uploaded files, keeping rows whose bytes are unchanged
+
+    Returns (added, removed) counts.
+    """
+    stored = defaultdict(list)
+    for photo in court.photos.all():
+        stored[_stored_digest(photo)].append(photo)
+
+    reflagged = []  # Matched rows whose primary flag changes
+    new_photos = []
+    for index, upload in enumerate(photos):
+        matches = stored.get(upload_digest(upload))
+        if matches:
+            photo = matches.pop()
+            if photo.is_primary != (index == 0):
+                photo.is_primary = index == 0
+                reflagged.append(photo)
+        else:
+            new_photos.append(CourtPhoto(court=court, image=upload, is_primary=index == 0))
+
+    if reflagged:
+        CourtPhoto.objects.bulk_update(reflagged, ['is_primary'])
+    removed_ids = [photo.id for leftovers in stored.values() for photo in leftovers]
+    removed = CourtPhoto.objects.filter(id__in=removed_ids).delete()[0] if removed_ids else 0
+    # bulk_create still runs ImageField.pre_save, which writes each new file to storage
+    added = CourtPhoto.objects.bulk_create(new_photos)
+    # bulk_create sends no post_save, so queue the derivatives here
+    images.schedule(added)
+    return len(added), removed
@@ -0,0 +1,91 @@
+"""
+Geospatial helpers for "venues near me".
+
+Facilities carry a precomputed ``effective_latitude``/``effective_longitude``
+(their own coordinates, or those of their first court that has some). Nearby
+search prefilters on an indexed bounding box over those columns and then
+applies an exact haversine check in Python.
+"""
+import math
+
+from .models import Court, Facility
+
+EARTH_RADIUS_KM = 6371.0088
+
+DEFAULT_RADIUS_KM = 10.0
+MAX_RADIUS_KM = 200.0
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in kilometres"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lng, radius_km):
+    """Lat/lng ranges enclosing the circle; lng range is None when it spans the antimeridian or a pole"""
+    d_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat = max(-90.0, lat - d_lat)
+    max_lat = min(90.0, lat + d_lat)
+
+    cos_lat = math.cos(math.radians(lat))
+    if max_lat >= 90.0 or min_lat <= -90.0 or cos_lat <= 0:
+        return (min_lat, max_lat), None
+    d_lng = math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat))
+    min_lng = lng - d_lng
+    max_lng = lng + d_lng
+    if min_lng < -180.0 or max_lng > 180.0:
+        return (min_lat, max_lat), None
+    return (min_lat, max_lat), (min_lng, max_lng)
+
+
+def nearby(queryset, lat, lng, radius_km):
+    """Return [(facility_id, distance_km)] within radius, nearest first"""
+    lat_range, lng_range = bounding_box(lat, lng, radius_km)
+    candidates = queryset.filter(effective_latitude__range=lat_range)
+    if lng_range:
+        candidates = candidates.filter(effective_longitude__range=lng_range)
+
+    results = []
+    for facility_id, venue_lat, venue_lng in candidates.values_list(
+        'id', 'effective_latitude', 'effective_longitude'
+    ):
+        distance = haversine_km(lat, lng, venue_lat, venue_lng)
+        if distance <= radius_km:
+            results.append((facility_id, distance))
+    results.sort(key=lambda item: item[1])
+    return results
+
+
+def refresh_facility_locations(facility_ids):
+    """Recompute the effective coordinates of the given facilities"""
+    facility_ids = {facility_id for facility_id in facility_ids if facility_id is not None}
+    if not facility_ids:
+        return
+
+    court_coords = {}
+    for facility_id, latitude, longitude in (
+        Court.objects.filter(
+            facility_id__in=facility_ids, latitude__isnull=False, longitude__isnull=False
+        ).order_by('facility_id', 'name').values_list('facility_id', 'latitude', 'longitude')
+    ):
+        court_coords.setdefault(facility_id, (latitude, longitude))
+
+    for facility_id, latitude, longitude, current_lat, current_lng in (
+        Facility.objects.filter(id__in=facility_ids).values_list(
+            'id', 'latitude', 'longitude', 'effective_latitude', 'effective_longitude'
+        )
+    ):
+        if latitude and longitude:
+            coords = (latitude, longitude)
+        else:
+            coords = court_coords.get(facility_id, (None, None))
+        coords = tuple(float(value) if value is not None else None for value in coords)
+        if coords != (current_lat, current_lng):
+            Facility.objects.filter(id=facility_id).update(
+                effective_latitude=coords[0], effective_longitude=coords[1]
+            )
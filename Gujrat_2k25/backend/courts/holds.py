@@ -0,0 +1,103 @@
+"""
+Temporary slot holds during checkout.
+
+``create_order`` places a SlotHold on the requested (court, date, time range)
+before a Razorpay order exists, so a second player cannot pay for the same
+slot while the first one is in checkout. A hold lives for SLOT_HOLD_SECONDS;
+the player's own booking consumes it, and other players' bookings and holds
+are refused while it is live.
+
+Expired holds are simply ignored by every check (``expires_at > now``), are
+deleted lazily whenever a new hold is placed on the same court and day, and
+are swept in bulk by ``sweep_slot_holds``. Live-hold lookups hit the
+(court, booking_date, expires_at) index, so the availability index can load
+them alongside bookings on every render.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Booking, SlotHold
+
+HOLD_SECONDS = getattr(settings, 'SLOT_HOLD_SECONDS', 600)
+
+CONFLICT_MESSAGE = "Time slot is already booked or being booked by another player"
+
+
+class HoldConflict(Exception):
+    pass
+
+
+def live_holds(**filters):
+    """Unexpired holds matching the filters"""
+    return SlotHold.objects.filter(expires_at__gt=timezone.now(), **filters)
+
+
+def overlapping(court, booking_date, start_time, end_time):
+    return live_holds(
+        court=court,
+        booking_date=booking_date,
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    )
+
+
+def is_held_by_other(court, booking_date, start_time, end_time, user):
+    """Whether another player holds any part of the range"""
+    holds = overlapping(court, booking_date, start_time, end_time)
+    if user is not None and user.is_authenticated:
+        holds = holds.exclude(user=user)
+    return holds.exists()
+
+
+def place(user, court, booking_date, start_time, end_time, payment_order=None):
+    """Hold the range for ``user``; raises HoldConflict when it is booked or held by someone else"""
+    # Imported here: booking_engine depends on this module
+    from .booking_engine import commit
+
+    def write():
+        # Lazy expiry for this court and day
+        SlotHold.objects.filter(
+            court=court, booking_date=booking_date, expires_at__lte=timezone.now()
+        ).delete()
+
+        booked = Booking.objects.filter(
+            court=court,
+            booking_date=booking_date,
+            status__in=['pending', 'confirmed'],
+            start_time__lt=end_time,
+            end_time__gt=start_time
+        ).exists()
+        if booked or is_held_by_other(court, booking_date, start_time, end_time, user):
+            raise HoldConflict(CONFLICT_MESSAGE)
+
+        # A restarted checkout replaces the player's earlier hold on the same range
+        overlapping(court, booking_date, start_time, end_time).filter(user=user).delete()
+        return SlotHold.objects.create(
+            court=court,
+            user=user,
+            payment_order=payment_order,
+            booking_date=booking_date,
+            start_time=start_time,
+            end_time=end_time,
+            expires_at=timezone.now() + timedelta(seconds=HOLD_SECONDS),
+        )
+
+    return commit(court.pk, booking_date, write)
+
+
+def release(user, court, booking_date, start_time, end_time):
+    """Drop the player's holds on the range, e.g. once the booking exists"""
+    return SlotHold.objects.filter(
+        user=user,
+        court=court,
+        booking_date=booking_date,
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    ).delete()[0]
+
+
+def sweep():
+    """Delete every expired hold; returns the number removed"""
+    return SlotHold.objects.filter(expires_at__lte=timezone.now()).delete()[0]
@@ -0,0 +1,222 @@
+"""
+Resized derivatives of uploaded facility and court photos.
+
+Every photo gets three derivatives, each written as WebP plus a JPEG
+fallback next to the original under ``derivatives/``:
+
+* ``thumb`` and ``card`` are cropped to a fixed size for list and card views;
+* ``full`` is the whole image scaled down to fit, never up.
+
+Building them takes a few hundred milliseconds per photo, so it happens off
+the request thread: once the transaction that created the photo commits,
+``schedule()`` hands its id to a small thread pool, one job per stored file.
+The worker stores the derivative paths in the photo's ``derivatives`` field
+with an UPDATE, which sends no signals. Until then serializers fall back to
+the original URL. Derivative files are renamed into place, so their names
+stay fixed even when two builds for one file overlap.
+``build_image_derivatives`` backfills photos uploaded before this existed.
+"""
+import os
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import OperationalError, connection, transaction
+from PIL import Image, ImageOps
+
+SIZES = getattr(settings, 'IMAGE_DERIVATIVE_SIZES', {
+    'thumb': (320, 240),
+    'card': (800, 600),
+    'full': (1920, 1440),
+})
+# Sizes cropped to exactly their box; the others keep their aspect ratio
+CROPPED_SIZES = ('thumb', 'card')
+WEBP_QUALITY = getattr(settings, 'IMAGE_DERIVATIVE_WEBP_QUALITY', 80)
+JPEG_QUALITY = getattr(settings, 'IMAGE_DERIVATIVE_JPEG_QUALITY', 82)
+WORKERS = getattr(settings, 'IMAGE_DERIVATIVE_WORKERS', 2)
+# Off in tests and scripts that need the derivatives before carrying on
+ASYNC = getattr(settings, 'IMAGE_DERIVATIVES_ASYNC', True)
+RECORD_RETRIES = 5
+RECORD_BACKOFF_SECONDS = 0.1
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix='image-derivatives')
+    return _executor
+
+
+def derivative_name(photo, size, extension):
+    # Keyed on the full original name, so x.png and x.jpg do not share derivatives
+    return f"derivatives/{photo.image.name}/{size}.{extension}"
+
+
+def _resize(image, size):
+    box = SIZES[size]
+    if size in CROPPED_SIZES:
+        return ImageOps.fit(image, box, Image.LANCZOS)
+    resized = image.copy()
+    resized.thumbnail(box, Image.LANCZOS)
+    return resized
+
+
+def _encode(image, extension):
+    buffer = BytesIO()
+    if extension == 'webp':
+        image.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+    else:
+        if image.mode != 'RGB':
+            # JPEG has no alpha: flatten onto white
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+            image = background
+        image.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def _write(storage, name, content):
+    # Stable names: write beside the target and rename over it, so an earlier build
+    # or a concurrent one for the same blob is replaced instead of getting a suffixed copy
+    temp_name = storage.save(f"{name}.{uuid.uuid4().hex}.part", ContentFile(content))
+    os.replace(storage.path(temp_name), storage.path(name))
+    return name
+
+
+def _shared_derivatives(photo):
+    """Derivatives already built for another row with the same stored file"""
+    return (
+        type(photo).objects.filter(image=photo.image.name).exclude(pk=photo.pk).exclude(derivatives={})
+        .values_list('derivatives', flat=True).first()
+    )
+
+
+def build(photo, reuse=True):
+    """Write every derivative of the photo and record them on it; returns the derivatives map
+
+    With ``reuse``, a photo sharing its file with an already processed row
+    (see courts.storage) takes that row's derivatives without decoding anything.
+    """
+    derivatives = _shared_derivatives(photo) if reuse else None
+    if derivatives:
+        _record(photo, derivatives)
+        return derivatives
+
+    # Derivatives use plain storage: their names are already derived from the original's
+    storage = default_storage
+    with photo.image.open('rb') as source:
+        image = Image.open(source)
+        # JPEGs can decode straight at a reduced scale that still covers the largest derivative
+        longest = max(max(box) for box in SIZES.values())
+        image.draft('RGB', (longest, longest))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    derivatives = {}
+    for size in SIZES:
+        resized = _resize(image, size)
+        derivatives[size] = {
+            'width': resized.width,
+            'height': resized.height,
+            'webp': _write(storage, derivative_name(photo, size, 'webp'), _encode(resized, 'webp')),
+            'jpeg': _write(storage, derivative_name(photo, size, 'jpg'), _encode(resized, 'jpeg')),
+        }
+
+    _record(photo, derivatives)
+    return derivatives
+
+
+def _record(photo, derivatives):
+    # Workers write while uploads insert rows; on SQLite wait out a locked table instead of losing the build
+    for attempt in range(RECORD_RETRIES + 1):
+        try:
+            type(photo).objects.filter(pk=photo.pk).update(derivatives=derivatives)
+            break
+        except OperationalError as e:
+            if attempt == RECORD_RETRIES or 'locked' not in str(e):
+                raise
+            time.sleep(RECORD_BACKOFF_SECONDS * (2 ** attempt))
+    photo.derivatives = derivatives
+
+
+def _build_by_ids(model, pks):
+    # In order: the first photo decodes the shared file, the others reuse its build
+    for pk in pks:
+        photo = model.objects.filter(pk=pk).first()
+        if photo is not None and photo.image:
+            build(photo)
+
+
+def _build_in_worker(model, pks):
+    try:
+        _build_by_ids(model, pks)
+    except Exception as e:
+        print(f"Image derivative build failed for {model.__name__} {pks}: {e}")
+    finally:
+        # Worker threads open their own connection; do not leave it dangling
+        connection.close()
+
+
+def schedule(photos):
+    """Build derivatives for the photos once the current transaction commits
+
+    Photos sharing a stored file are built by one job, so the file is decoded once.
+    """
+    jobs = defaultdict(list)
+    for photo in photos:
+        if photo.pk:
+            jobs[(type(photo), photo.image.name)].append(photo.pk)
+    if not jobs:
+        return
+
+    def submit():
+        for (model, _), pks in jobs.items():
+            if ASYNC:
+                _get_executor().submit(_build_in_worker, model, pks)
+            else:
+                _build_by_ids(model, pks)
+
+    transaction.on_commit(submit)
+
+
+def delete_derivatives(photo):
+    """Remove a photo's derivative files"""
+    storage = default_storage
+    for formats in (photo.derivatives or {}).values():
+        for extension in ('webp', 'jpeg'):
+            name = formats.get(extension)
+            if name and storage.exists(name):
+                storage.delete(name)
+
+
+def _absolute(url, request):
+    return request.build_absolute_uri(url) if request else url
+
+
+def srcset(photo, request=None):
+    """Map of size to {'webp', 'jpeg', 'width', 'height'} URLs; empty until derivatives are built"""
+    storage = default_storage
+    return {
+        size: {
+            'webp': _absolute(storage.url(formats['webp']), request),
+            'jpeg': _absolute(storage.url(formats['jpeg']), request),
+            'width': formats['width'],
+            'height': formats['height'],
+        }
+        for size, formats in (photo.derivatives or {}).items()
+    }
+
+
+def url(photo, size, request=None):
+    """JPEG URL of one derivative, or the original's URL until it is built"""
+    formats = (photo.derivatives or {}).get(size)
+    if formats:
+        return _absolute(default_storage.url(formats['jpeg']), request)
+    return _absolute(photo.image.url, request)
@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from courts.rollups import rebuild_all
+
+class Command(BaseCommand):
+    help = "Rebuild the BookingDailyRollup table from raw bookings, optionally for a date range only."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start_date', help='First booking date to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='end_date', help='Last booking date to rebuild (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        try:
+            start_date, end_date = (
+                datetime.strptime(options[key], '%Y-%m-%d').date() if options[key] else None
+                for key in ('start_date', 'end_date')
+            )
+        except ValueError:
+            raise CommandError('Dates must use the YYYY-MM-DD format')
+
+        rows = rebuild_all(start_date, end_date)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} daily booking rollups."))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from courts import images
+from courts.models import CourtPhoto, FacilityPhoto
+
+class Command(BaseCommand):
+    help = "Build thumb/card/full derivatives for facility and court photos that do not have them yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild derivatives for every photo')
+
+    def handle(self, *args, **options):
+        built = failed = 0
+        for model in (FacilityPhoto, CourtPhoto):
+            photos = model.objects.exclude(image='')
+            if not options['force']:
+                photos = photos.filter(derivatives={})
+            rebuilt = set()
+            for photo in photos.iterator():
+                name = photo.image.name
+                if name in rebuilt:
+                    continue
+                try:
+                    if options['force']:
+                        # Decode each stored file once, then give its build to every row sharing it
+                        derivatives = images.build(photo, reuse=False)
+                        built += model.objects.filter(image=name).update(derivatives=derivatives)
+                        rebuilt.add(name)
+                    else:
+                        images.build(photo)
+                        built += 1
+                except Exception as e:
+                    print(f"Could not build derivatives for {model.__name__} {photo.pk}: {e}")
+                    failed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Built derivatives for {built} photos ({failed} failed)."))
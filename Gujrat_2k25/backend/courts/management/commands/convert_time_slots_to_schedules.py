@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from courts.availability import minute_of_day
+from courts.models import Court, CourtSchedule
+from courts.schedules import grid, time_of_minute
+
+class Command(BaseCommand):
+    help = "Replace stored TimeSlot rows with a CourtSchedule on courts whose slots form a regular grid."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--court', type=int, action='append', help='Only convert this court id (repeatable)')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be converted without writing')
+
+    def handle(self, *args, **options):
+        courts = Court.objects.filter(schedule__isnull=True).prefetch_related('time_slots')
+        if options['court']:
+            courts = courts.filter(pk__in=options['court'])
+
+        converted = skipped = 0
+        for court in courts:
+            rule = self.rule_for(court)
+            if rule is None:
+                skipped += 1
+                continue
+            if not options['dry_run']:
+                with transaction.atomic():
+                    CourtSchedule.objects.create(court=court, **rule)
+                    # Blocked rows stay: they block generated slots too
+                    court.time_slots.filter(is_blocked=False).delete()
+            converted += 1
+            self.stdout.write(
+                f"{court.name} (#{court.pk}): {rule['slot_minutes']} min slots, "
+                f"{rule['buffer_minutes']} min buffer, {rule['opening_time']}-{rule['closing_time']}"
+            )
+
+        verb = 'Would convert' if options['dry_run'] else 'Converted'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {converted} courts; {skipped} kept their stored slots."))
+
+    def rule_for(self, court):
+        """The schedule that regenerates exactly the court's available slots, or None"""
+        slots = sorted(
+            (minute_of_day(slot.start_time), minute_of_day(slot.end_time))
+            for slot in court.time_slots.all()
+            if slot.is_available and not slot.is_blocked
+        )
+        if not slots:
+            return None
+
+        slot_minutes = slots[0][1] - slots[0][0]
+        buffer_minutes = slots[1][0] - slots[0][1] if len(slots) > 1 else 0
+        if not 15 <= slot_minutes <= 1440 or not 0 <= buffer_minutes <= 240:
+            return None
+        opening_minute, closing_minute = slots[0][0], slots[-1][1]
+        if list(grid(opening_minute, closing_minute, slot_minutes, buffer_minutes)) != slots:
+            return None
+        return {
+            'opening_time': time_of_minute(opening_minute),
+            'closing_time': time_of_minute(closing_minute),
+            'slot_minutes': slot_minutes,
+            'buffer_minutes': buffer_minutes,
+        }
@@ -0,0 +1,114 @@
+from collections import Counter, defaultdict
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from courts import images
+from courts.models import CourtPhoto, FacilityPhoto, StoredBlob
+from courts.storage import content_digest, photo_storage
+
+PHOTO_MODELS = (FacilityPhoto, CourtPhoto)
+
+class Command(BaseCommand):
+    help = "Move photo files to content-addressed names, merge identical copies and recount StoredBlob references."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing')
+        parser.add_argument('--delete-orphans', action='store_true', help='Also delete photo files no row refers to')
+
+    def handle(self, *args, **options):
+        storage = photo_storage()
+        dry_run = options['dry_run']
+
+        # 1. Content name for every photo row
+        digests = {}
+        moves = defaultdict(list)  # (model, new name) -> photos currently under another name
+        missing = 0
+        for model in PHOTO_MODELS:
+            for photo in model.objects.exclude(image='').iterator():
+                name = photo.image.name
+                if name not in digests:
+                    if not storage.exists(name):
+                        print(f"Missing file for {model.__name__} {photo.pk}: {name}")
+                        missing += 1
+                        continue
+                    digest = storage.digest_of(name)
+                    if digest is None:
+                        with storage.open(name, 'rb') as content:
+                            digest = content_digest(content)
+                    digests[name] = digest
+                new_name = storage.content_name(name, digests[name])
+                if new_name != name:
+                    moves[(model, new_name)].append(photo)
+
+        old_names = {photo.image.name for photos in moves.values() for photo in photos}
+        rows = sum(len(photos) for photos in moves.values())
+        blobs = len({new_name for _, new_name in moves})
+        if dry_run:
+            self.stdout.write(
+                f"Would move {rows} rows from {len(old_names)} files into {blobs} content-addressed files "
+                f"({missing} rows have no file)."
+            )
+            return
+
+        # 2. Write each blob once, then point rows at it
+        for (model, new_name), photos in moves.items():
+            if not storage.exists(new_name):
+                with storage.open(photos[0].image.name, 'rb') as content:
+                    storage._write_blob(new_name, File(content))
+            for photo in photos:
+                # Derivatives are keyed on the old name; they are rebuilt below
+                images.delete_derivatives(photo)
+            model.objects.filter(pk__in=[photo.pk for photo in photos]).update(image=new_name, derivatives={})
+
+        # 3. Recount references from the rows themselves
+        counts = Counter()
+        for model in PHOTO_MODELS:
+            counts.update(model.objects.exclude(image='').values_list('image', flat=True))
+        referenced = {name for name in counts if storage.digest_of(name) and storage.exists(name)}
+        with transaction.atomic():
+            for name in referenced:
+                StoredBlob.objects.update_or_create(name=name, defaults={
+                    'sha256': storage.digest_of(name),
+                    'size': storage.size(name),
+                    'refcount': counts[name],
+                })
+            unused = list(StoredBlob.objects.exclude(name__in=referenced).values_list('name', flat=True))
+            StoredBlob.objects.filter(name__in=unused).delete()
+
+        # 4. Remove files nothing points at any more
+        freed = 0
+        for name in old_names.union(unused):
+            if name not in counts and storage.exists(name):
+                freed += storage.size(name)
+                storage.delete(name)
+        if options['delete_orphans']:
+            freed += self.delete_orphans(storage, set(counts))
+
+        # 5. Derivatives for the moved rows; rows sharing a blob share one build
+        for (model, new_name), photos in moves.items():
+            for photo in model.objects.filter(pk__in=[photo.pk for photo in photos]):
+                try:
+                    images.build(photo)
+                except Exception as e:
+                    print(f"Could not build derivatives for {model.__name__} {photo.pk}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Moved {rows} rows from {len(old_names)} files into {blobs} content-addressed files, "
+            f"freed {freed / 1024 / 1024:.1f} MB ({missing} rows have no file)."
+        ))
+
+    def delete_orphans(self, storage, referenced):
+        """Delete files in the photo upload directories that no row refers to; returns bytes freed"""
+        freed = 0
+        directories = {model._meta.get_field('image').upload_to.rstrip('/') for model in PHOTO_MODELS}
+        for directory in directories:
+            if not storage.exists(directory):
+                continue
+            for filename in storage.listdir(directory)[1]:
+                name = f"{directory}/{filename}"
+                if name not in referenced:
+                    freed += storage.size(name)
+                    storage.delete(name)
+        return freed
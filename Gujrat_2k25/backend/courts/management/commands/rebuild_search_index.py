@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from courts import search
+
+class Command(BaseCommand):
+    help = "Recreate the full-text venue search index from facilities, courts and sports."
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            self.stdout.write(self.style.WARNING('Full-text search index is only available on SQLite; nothing to do.'))
+            return
+        indexed = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} facilities."))
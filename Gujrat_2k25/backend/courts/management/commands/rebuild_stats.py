@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from courts.stats import rebuild_all
+
+class Command(BaseCommand):
+    help = "Rebuild the FacilityStats and CourtStats summary tables from bookings, ratings and courts."
+
+    def handle(self, *args, **options):
+        facilities, courts = rebuild_all()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt stats for {facilities} facilities and {courts} courts."
+        ))
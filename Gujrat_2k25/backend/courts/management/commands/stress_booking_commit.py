@@ -0,0 +1,110 @@
+import random
+import threading
+import time
+from datetime import datetime, time as dt_time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from courts.booking_engine import SlotUnavailable, book
+from courts.models import Booking, Court
+
+class Command(BaseCommand):
+    help = "Race many threads booking overlapping slots on one court and day, then check for double bookings."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--court', type=int, required=True, help='Court id to book')
+        parser.add_argument('--user', help='Email of the booking user (default: the first player, or the first user)')
+        parser.add_argument('--date', help='Booking date, YYYY-MM-DD (default: one year from today)')
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent booking threads')
+        parser.add_argument('--attempts', type=int, default=50, help='Booking attempts per thread')
+        parser.add_argument('--keep', action='store_true', help='Keep the bookings created by the run')
+
+    def handle(self, *args, **options):
+        try:
+            court = Court.objects.select_related('facility').get(pk=options['court'])
+        except Court.DoesNotExist:
+            raise CommandError(f"Court {options['court']} does not exist")
+
+        User = get_user_model()
+        if options['user']:
+            user = User.objects.filter(email=options['user']).first()
+        else:
+            user = User.objects.filter(user_type='player').order_by('id').first() or User.objects.order_by('id').first()
+        if user is None:
+            raise CommandError('No user to book as')
+
+        try:
+            booking_date = (
+                datetime.strptime(options['date'], '%Y-%m-%d').date() if options['date']
+                else timezone.now().date() + timedelta(days=365)
+            )
+        except ValueError:
+            raise CommandError('Dates must use the YYYY-MM-DD format')
+
+        existing_ids = set(Booking.objects.filter(court=court, booking_date=booking_date).values_list('id', flat=True))
+        counts = {'booked': 0, 'conflicts': 0, 'errors': 0}
+        # Worker threads only collect failures; they are written out after the join
+        failures = []
+        counts_lock = threading.Lock()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            try:
+                for _ in range(options['attempts']):
+                    # One or two hour ranges at random starts, so most attempts overlap something
+                    start_hour = rng.randrange(0, 22)
+                    hours = rng.choice([1, 2])
+                    try:
+                        book(
+                            user, court, booking_date, dt_time(start_hour), dt_time(start_hour + hours),
+                            duration_hours=Decimal(hours), price_per_hour=court.price_per_hour,
+                            special_requests='stress_booking_commit',
+                        )
+                        outcome = 'booked'
+                    except SlotUnavailable:
+                        outcome = 'conflicts'
+                    except Exception as e:
+                        outcome = 'errors'
+                        with counts_lock:
+                            failures.append(str(e))
+                    with counts_lock:
+                        counts[outcome] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        for failure in failures:
+            self.stderr.write(f"Booking attempt failed: {failure}")
+
+        bookings = list(
+            Booking.objects.filter(court=court, booking_date=booking_date, status__in=['pending', 'confirmed'])
+            .order_by('start_time')
+            .values_list('id', 'start_time', 'end_time')
+        )
+        double_bookings = sum(
+            1 for previous, current in zip(bookings, bookings[1:])
+            if current[1] < previous[2]
+        )
+
+        total = options['threads'] * options['attempts']
+        self.stdout.write(
+            f"{total} attempts in {elapsed:.2f}s ({total / elapsed:.0f}/s): "
+            f"{counts['booked']} booked, {counts['conflicts']} conflicts, {counts['errors']} errors"
+        )
+
+        if not options['keep']:
+            Booking.objects.filter(court=court, booking_date=booking_date).exclude(id__in=existing_ids).delete()
+
+        if double_bookings:
+            raise CommandError(f"{double_bookings} overlapping bookings found")
+        self.stdout.write(self.style.SUCCESS("No double bookings."))
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from courts import holds
+
+class Command(BaseCommand):
+    help = "Delete expired checkout slot holds."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep running, sweeping every --interval seconds')
+        parser.add_argument('--interval', type=float, default=60.0, help='Seconds between runs with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = holds.sweep()
+            self.stdout.write(self.style.SUCCESS(f"Swept {deleted} expired slot holds."))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,85 @@
+# Generated by Django 4.2.21 on 2026-10-16 22:36
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Q, Sum
+import django.db.models.deletion
+
+
+def populate_stats(apps, schema_editor):
+    """Build summary rows for existing facilities and courts"""
+    Facility = apps.get_model('courts', 'Facility')
+    Court = apps.get_model('courts', 'Court')
+    Booking = apps.get_model('courts', 'Booking')
+    CourtRating = apps.get_model('courts', 'CourtRating')
+    FacilityStats = apps.get_model('courts', 'FacilityStats')
+    CourtStats = apps.get_model('courts', 'CourtStats')
+
+    court_rows = {pk: CourtStats(court_id=pk) for pk in Court.objects.values_list('id', flat=True)}
+    facility_rows = {pk: FacilityStats(facility_id=pk) for pk in Facility.objects.values_list('id', flat=True)}
+
+    for group, rows in (('court_id', court_rows), ('facility_id', facility_rows)):
+        for row in Booking.objects.values(group).annotate(
+            total=Count('id'), earnings=Sum('total_amount', filter=Q(payment_status='paid'))
+        ).order_by():
+            if row[group] in rows:
+                rows[row[group]].total_bookings = row['total']
+                rows[row[group]].total_earnings = row['earnings'] or 0
+
+    for row in CourtRating.objects.values('court_id', 'court__facility_id').annotate(
+        total=Sum('rating'), count=Count('id')
+    ).order_by():
+        for stats in (court_rows.get(row['court_id']), facility_rows.get(row['court__facility_id'])):
+            if stats:
+                stats.rating_sum += row['total']
+                stats.review_count += row['count']
+
+    for row in Court.objects.values('facility_id').annotate(
+        total=Count('id'), min_price=Min('price_per_hour')
+    ).order_by():
+        if row['facility_id'] in facility_rows:
+            facility_rows[row['facility_id']].total_courts = row['total']
+            facility_rows[row['facility_id']].starting_price = row['min_price']
+
+    CourtStats.objects.bulk_create(court_rows.values())
+    FacilityStats.objects.bulk_create(facility_rows.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courts', '0003_court_address_court_city_court_latitude_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourtStats',
+            fields=[
+                ('court', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='courts.court')),
+                ('total_bookings', models.IntegerField(default=0)),
+                ('total_earnings', models.DecimalField(decimal_places=2, default=0, help_text='Sum of paid bookings', max_digits=12)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('review_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Court stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='FacilityStats',
+            fields=[
+                ('facility', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='courts.facility')),
+                ('total_courts', models.IntegerField(default=0)),
+                ('total_bookings', models.IntegerField(default=0)),
+                ('total_earnings', models.DecimalField(decimal_places=2, default=0, help_text='Sum of paid bookings', max_digits=12)),
+                ('starting_price', models.DecimalField(blank=True, decimal_places=2, help_text='Minimum court price per hour', max_digits=8, null=True)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('review_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Facility stats',
+            },
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
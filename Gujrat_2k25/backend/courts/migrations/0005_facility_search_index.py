@@ -0,0 +1,40 @@
+from django.db import migrations
+
+CREATE_TABLE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS courts_facility_search USING fts5("
+    "name, description, city, address, sports, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+DROP_TABLE_SQL = "DROP TABLE IF EXISTS courts_facility_search"
+POPULATE_SQL = (
+    "INSERT INTO courts_facility_search (rowid, name, description, city, address, sports) "
+    "SELECT f.id, f.name, f.description, f.city, f.address, "
+    "COALESCE((SELECT group_concat(DISTINCT s.name) FROM courts_court c "
+    "JOIN courts_sport s ON s.id = c.sport_id WHERE c.facility_id = f.id), '') "
+    "FROM courts_facility f"
+)
+
+
+def create_search_index(apps, schema_editor):
+    """Create and fill the FTS5 venue search table (SQLite only)"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_TABLE_SQL)
+    schema_editor.execute(POPULATE_SQL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(DROP_TABLE_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courts', '0004_facilitystats_courtstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
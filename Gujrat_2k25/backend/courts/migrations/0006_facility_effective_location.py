@@ -0,0 +1,45 @@
+# Generated by Django 4.2.21 on 2026-10-16 22:39
+
+from django.db import migrations, models
+
+
+def populate_effective_location(apps, schema_editor):
+    """Use the facility's own coordinates, or those of its first court that has some"""
+    Facility = apps.get_model('courts', 'Facility')
+    Court = apps.get_model('courts', 'Court')
+    for facility in Facility.objects.all():
+        latitude, longitude = facility.latitude, facility.longitude
+        if not (latitude and longitude):
+            court = Court.objects.filter(
+                facility=facility, latitude__isnull=False, longitude__isnull=False
+            ).order_by('name').first()
+            latitude, longitude = (court.latitude, court.longitude) if court else (None, None)
+        if latitude is not None and longitude is not None:
+            Facility.objects.filter(pk=facility.pk).update(
+                effective_latitude=float(latitude), effective_longitude=float(longitude)
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courts', '0005_facility_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='facility',
+            name='effective_latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='facility',
+            name='effective_longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='facility',
+            index=models.Index(fields=['effective_latitude', 'effective_longitude'], name='facility_location_idx'),
+        ),
+        migrations.RunPython(populate_effective_location, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.21 on 2026-10-16 22:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_rollups(apps, schema_editor):
+    """Build daily rollup rows from existing bookings"""
+    Booking = apps.get_model('courts', 'Booking')
+    BookingDailyRollup = apps.get_model('courts', 'BookingDailyRollup')
+
+    rows = {}
+    for court_id, facility_id, booking_date, status, total_amount, start_time in Booking.objects.values_list(
+        'court_id', 'facility_id', 'booking_date', 'status', 'total_amount', 'start_time'
+    ).order_by():
+        rollup = rows.get((court_id, booking_date))
+        if rollup is None:
+            rollup = rows[(court_id, booking_date)] = BookingDailyRollup(
+                court_id=court_id, facility_id=facility_id, date=booking_date, hour_counts=[0] * 24
+            )
+        column = f'{status}_count'
+        if hasattr(rollup, column):
+            setattr(rollup, column, getattr(rollup, column) + 1)
+        if status in ('confirmed', 'completed'):
+            rollup.earnings += total_amount or 0
+        rollup.hour_counts[start_time.hour] += 1
+
+    BookingDailyRollup.objects.bulk_create(rows.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courts', '0007_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('pending_count', models.IntegerField(default=0)),
+                ('confirmed_count', models.IntegerField(default=0)),
+                ('cancelled_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('no_show_count', models.IntegerField(default=0)),
+                ('earnings', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('hour_counts', models.JSONField(blank=True, default=list)),
+                ('court', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_rollups', to='courts.court')),
+                ('facility', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_rollups', to='courts.facility')),
+            ],
+            options={
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['facility', 'date'], name='rollup_facility_date_idx')],
+                'unique_together': {('court', 'date')},
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.21 on 2026-10-16 22:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('courts', '0008_bookingdailyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentOrder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('razorpay_order_id', models.CharField(max_length=64, unique=True)),
+                ('razorpay_payment_id', models.CharField(blank=True, max_length=64, null=True, unique=True)),
+                ('razorpay_signature', models.CharField(blank=True, max_length=128)),
+                ('amount', models.PositiveIntegerField(help_text='Amount in paise')),
+                ('currency', models.CharField(default='INR', max_length=3)),
+                ('receipt', models.CharField(blank=True, max_length=64)),
+                ('status', models.CharField(choices=[('created', 'Created'), ('booked', 'Booked'), ('failed', 'Failed')], default='created', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('booking', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payment_order', to='courts.booking')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payment_orders', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
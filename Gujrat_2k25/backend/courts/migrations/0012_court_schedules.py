@@ -0,0 +1,44 @@
+# Generated by Django 4.2.21 on 2026-10-16 23:01
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courts', '0011_bookingseries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourtSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('opening_time', models.TimeField(blank=True, null=True)),
+                ('closing_time', models.TimeField(blank=True, null=True)),
+                ('slot_minutes', models.PositiveSmallIntegerField(default=60, validators=[django.core.validators.MinValueValidator(15), django.core.validators.MaxValueValidator(1440)])),
+                ('buffer_minutes', models.PositiveSmallIntegerField(default=0, validators=[django.core.validators.MaxValueValidator(240)])),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('court', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='schedule', to='courts.court')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ScheduleException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('is_closed', models.BooleanField(default=False)),
+                ('opening_time', models.TimeField(blank=True, null=True)),
+                ('closing_time', models.TimeField(blank=True, null=True)),
+                ('reason', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('court', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule_exceptions', to='courts.court')),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('court', 'date')},
+            },
+        ),
+    ]
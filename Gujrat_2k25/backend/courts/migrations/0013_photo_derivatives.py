@@ -0,0 +1,23 @@
+# Generated by Django 4.2.21 on 2026-10-16 23:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courts', '0012_court_schedules'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='courtphoto',
+            name='derivatives',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='facilityphoto',
+            name='derivatives',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
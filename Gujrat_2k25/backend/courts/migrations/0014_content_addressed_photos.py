@@ -0,0 +1,35 @@
+# Generated by Django 4.2.21 on 2026-10-16 23:09
+
+import courts.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courts', '0013_photo_derivatives'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('sha256', models.CharField(db_index=True, max_length=64)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='courtphoto',
+            name='image',
+            field=models.ImageField(storage=courts.storage.photo_storage, upload_to='court_photos/'),
+        ),
+        migrations.AlterField(
+            model_name='facilityphoto',
+            name='image',
+            field=models.ImageField(storage=courts.storage.photo_storage, upload_to='facility_photos/'),
+        ),
+    ]
@@ -1,12 +1,43 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 import uuid
 
+from .storage import photo_storage
+
 User = get_user_model()
 
-class Facility(models.Model):
+class FacilityQuerySet(models.QuerySet):
+    """QuerySet helpers for facilities"""
+    
+    def with_listing_stats(self):
+        """Join the FacilityStats row and prefetch the relations FacilitySerializer reads.
+        
+        Lets list endpoints serialize a page of facilities in a fixed number of
+        queries instead of several aggregates per facility.
+        """
+        return self.select_related('owner', 'stats').prefetch_related(
+            'photos', 'facility_sports__sport', 'facility_amenities__amenity'
+        )
+
+class AtomicWriteMixin:
+    """Run save()/delete() and their signal handlers in a single transaction.
+    
+    Summary tables (see courts.stats) and the search index (courts.search) are
+    updated from post_save/post_delete handlers; wrapping the write keeps them
+    consistent with the row itself.
+    """
+    
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            return super().delete(*args, **kwargs)
+
+class Facility(AtomicWriteMixin, models.Model):
     """Model for sports facilities"""
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='facilities')
     name = models.CharField(max_length=200)
@@ -18,6 +49,10 @@ class Facility(models.Model):
     latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     
+    # Search location: own coordinates, or the first court's (maintained by courts.geo)
+    effective_latitude = models.FloatField(null=True, blank=True, editable=False)
+    effective_longitude = models.FloatField(null=True, blank=True, editable=False)
+    
     # Contact Information
     phone = models.CharField(max_length=15)
     email = models.EmailField()
@@ -45,9 +80,15 @@ class Facility(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = FacilityQuerySet.as_manager()
+    
     class Meta:
         verbose_name_plural = "Facilities"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['effective_latitude', 'effective_longitude'], name='facility_location_idx'),
+            models.Index(fields=['-created_at', '-id'], name='facility_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.owner.get_full_name()}"
@@ -55,9 +96,11 @@ class Facility(models.Model):
 class FacilityPhoto(models.Model):
     """Model for facility photos"""
     facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name='photos')
-    image = models.ImageField(upload_to='facility_photos/')
+    image = models.ImageField(upload_to='facility_photos/', storage=photo_storage)
     caption = models.CharField(max_length=200, blank=True)
     is_primary = models.BooleanField(default=False)
+    # Resized copies by size and format, filled in by courts.images after upload
+    derivatives = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -69,9 +112,11 @@ class FacilityPhoto(models.Model):
 class CourtPhoto(models.Model):
     """Model for court photos"""
     court = models.ForeignKey('Court', on_delete=models.CASCADE, related_name='photos')
-    image = models.ImageField(upload_to='court_photos/')
+    image = models.ImageField(upload_to='court_photos/', storage=photo_storage)
     caption = models.CharField(max_length=200, blank=True)
     is_primary = models.BooleanField(default=False)
+    # Resized copies by size and format, filled in by courts.images after upload
+    derivatives = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -130,7 +175,7 @@ class FacilityAmenity(models.Model):
     def __str__(self):
         return f"{self.facility.name} - {self.amenity.name}"
 
-class Court(models.Model):
+class Court(AtomicWriteMixin, models.Model):
     """Model for individual courts"""
     COURT_STATUS_CHOICES = [
         ('active', 'Active'),
@@ -186,8 +231,51 @@ class Court(models.Model):
     def get_closing_time(self):
         return self.closing_time or self.facility.closing_time
 
+class CourtSchedule(models.Model):
+    """Rule the court's daily slots are generated from, instead of one TimeSlot row per slot"""
+    court = models.OneToOneField(Court, on_delete=models.CASCADE, related_name='schedule')
+    # Empty hours fall back to the court's, then the facility's hours
+    opening_time = models.TimeField(null=True, blank=True)
+    closing_time = models.TimeField(null=True, blank=True)
+    slot_minutes = models.PositiveSmallIntegerField(
+        default=60, validators=[MinValueValidator(15), MaxValueValidator(24 * 60)]
+    )
+    buffer_minutes = models.PositiveSmallIntegerField(default=0, validators=[MaxValueValidator(240)])
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.court.name} - every {self.slot_minutes} min"
+    
+    @property
+    def get_opening_time(self):
+        return self.opening_time or self.court.get_opening_time
+    
+    @property
+    def get_closing_time(self):
+        return self.closing_time or self.court.get_closing_time
+
+class ScheduleException(models.Model):
+    """One-off change to a court's hours on a given date"""
+    court = models.ForeignKey(Court, on_delete=models.CASCADE, related_name='schedule_exceptions')
+    date = models.DateField()
+    is_closed = models.BooleanField(default=False)
+    # Hours for this date only; empty fields keep the regular hours
+    opening_time = models.TimeField(null=True, blank=True)
+    closing_time = models.TimeField(null=True, blank=True)
+    reason = models.CharField(max_length=200, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['court', 'date']
+        ordering = ['date']
+    
+    def __str__(self):
+        return f"{self.court.name} - {self.date} ({'closed' if self.is_closed else 'special hours'})"
+
 class TimeSlot(models.Model):
-    """Model for court time slots"""
+    """Model for court time slots; on courts with a CourtSchedule only blocked rows matter"""
     court = models.ForeignKey(Court, on_delete=models.CASCADE, related_name='time_slots')
     start_time = models.TimeField()
     end_time = models.TimeField()
@@ -212,7 +300,43 @@ class TimeSlot(models.Model):
         duration = end - start
         return duration.total_seconds() / 3600
 
-class Booking(models.Model):
+class BookingSeries(models.Model):
+    """Recurring booking of one court at the same time every day or week"""
+    FREQUENCY_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('cancelled', 'Cancelled'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='booking_series')
+    court = models.ForeignKey(Court, on_delete=models.CASCADE, related_name='booking_series')
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name='booking_series')
+    
+    # Recurrence rule: every day/week from start_date, until end_date or for `occurrences` times
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES, default='weekly')
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    occurrences = models.PositiveSmallIntegerField(null=True, blank=True)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    special_requests = models.TextField(blank=True)
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='active')
+    created_at = models.DateTimeField(auto_now_add=True)
+    cancelled_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = 'Booking series'
+    
+    def __str__(self):
+        return f"{self.get_frequency_display()} {self.court.name} {self.start_time}-{self.end_time} from {self.start_date}"
+
+class Booking(AtomicWriteMixin, models.Model):
     """Model for court bookings"""
     BOOKING_STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -233,6 +357,9 @@ class Booking(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='bookings')
     court = models.ForeignKey(Court, on_delete=models.CASCADE, related_name='bookings')
     facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name='bookings')
+    series = models.ForeignKey(
+        BookingSeries, on_delete=models.SET_NULL, null=True, blank=True, related_name='bookings'
+    )
     
     # Booking Details
     booking_date = models.DateField()
@@ -258,6 +385,10 @@ class Booking(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of a player's bookings (courts.pagination)
+            models.Index(fields=['user', '-created_at', '-id'], name='booking_user_created_idx'),
+        ]
     
     def __str__(self):
         return f"Booking {self.booking_id} - {self.user.get_full_name()} at {self.court.name}"
@@ -268,7 +399,7 @@ class Booking(models.Model):
             self.total_amount = self.price_per_hour * self.duration_hours
         super().save(*args, **kwargs)
 
-class CourtRating(models.Model):
+class CourtRating(AtomicWriteMixin, models.Model):
     """Model for court ratings and reviews"""
     booking = models.OneToOneField(Booking, on_delete=models.CASCADE, related_name='rating')
     court = models.ForeignKey(Court, on_delete=models.CASCADE, related_name='ratings')
@@ -288,6 +419,59 @@ class CourtRating(models.Model):
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.court.name} - {self.rating} stars"
 
+class PaymentOrder(models.Model):
+    """Razorpay order created for a booking, and the booking it paid for once verified"""
+    STATUS_CHOICES = [
+        ('created', 'Created'),
+        ('booked', 'Booked'),
+        ('failed', 'Failed'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='payment_orders')
+    razorpay_order_id = models.CharField(max_length=64, unique=True)
+    razorpay_payment_id = models.CharField(max_length=64, unique=True, null=True, blank=True)
+    razorpay_signature = models.CharField(max_length=128, blank=True)
+    amount = models.PositiveIntegerField(help_text='Amount in paise')
+    currency = models.CharField(max_length=3, default='INR')
+    receipt = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='created')
+    booking = models.OneToOneField(
+        Booking, on_delete=models.SET_NULL, null=True, blank=True, related_name='payment_order'
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.razorpay_order_id} ({self.status})"
+
+class SlotHold(models.Model):
+    """Short-lived reservation of a court time range while the player is paying"""
+    court = models.ForeignKey(Court, on_delete=models.CASCADE, related_name='slot_holds')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='slot_holds')
+    payment_order = models.ForeignKey(
+        PaymentOrder, on_delete=models.CASCADE, null=True, blank=True, related_name='slot_holds'
+    )
+    booking_date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['court', 'booking_date', 'expires_at'], name='slot_hold_lookup_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.court.name} - {self.booking_date} {self.start_time}-{self.end_time} (held)"
+    
+    def is_expired(self):
+        return timezone.now() >= self.expires_at
+
 class Notification(models.Model):
     """Model for notifications"""
     NOTIFICATION_TYPES = [
@@ -313,4 +497,91 @@ class Notification(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.user.get_full_name()} - {self.title}" 
\ No newline at end of file
+        return f"{self.user.get_full_name()} - {self.title}"
+
+class FacilityStats(models.Model):
+    """Denormalized per-facility aggregates, kept up to date by courts.stats"""
+    facility = models.OneToOneField(Facility, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    total_courts = models.IntegerField(default=0)
+    total_bookings = models.IntegerField(default=0)
+    total_earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Sum of paid bookings")
+    starting_price = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, help_text="Minimum court price per hour")
+    rating_sum = models.IntegerField(default=0)
+    review_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = "Facility stats"
+    
+    def __str__(self):
+        return f"Stats for {self.facility.name}"
+    
+    @property
+    def average_rating(self):
+        return self.rating_sum / self.review_count if self.review_count else None
+
+class CourtStats(models.Model):
+    """Denormalized per-court aggregates, kept up to date by courts.stats"""
+    court = models.OneToOneField(Court, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    total_bookings = models.IntegerField(default=0)
+    total_earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Sum of paid bookings")
+    rating_sum = models.IntegerField(default=0)
+    review_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = "Court stats"
+    
+    def __str__(self):
+        return f"Stats for {self.court.name}"
+    
+    @property
+    def average_rating(self):
+        return self.rating_sum / self.review_count if self.review_count else None
+
+class BookingDailyRollup(models.Model):
+    """Per-(court, date) booking counts and earnings for the owner dashboard, kept up to date by courts.rollups"""
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name='booking_rollups')
+    court = models.ForeignKey(Court, on_delete=models.CASCADE, related_name='booking_rollups')
+    date = models.DateField()
+    
+    # Booking counts by status
+    pending_count = models.IntegerField(default=0)
+    confirmed_count = models.IntegerField(default=0)
+    cancelled_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    no_show_count = models.IntegerField(default=0)
+    
+    # Total amount of confirmed and completed bookings
+    earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    # Bookings per start hour, 24 entries
+    hour_counts = models.JSONField(default=list, blank=True)
+    
+    class Meta:
+        unique_together = ['court', 'date']
+        indexes = [
+            models.Index(fields=['facility', 'date'], name='rollup_facility_date_idx'),
+        ]
+        ordering = ['date']
+    
+    def __str__(self):
+        return f"{self.court.name} - {self.date}"
+    
+    @property
+    def total_count(self):
+        return (
+            self.pending_count + self.confirmed_count + self.cancelled_count +
+            self.completed_count + self.no_show_count
+        )
+
+class StoredBlob(models.Model):
+    """One content-addressed photo file and the number of photo rows using it (see courts.storage)"""
+    name = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField(default=0)
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.name} ({self.refcount} refs)"
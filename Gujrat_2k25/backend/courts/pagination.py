@@ -0,0 +1,54 @@
+"""
+Keyset (cursor) pagination for newest-first player listings.
+
+Pages are ordered by (created_at, id) descending and continue strictly after
+the last row of the previous page, so no COUNT(*) or OFFSET scan is needed.
+Cursors are opaque URL-safe tokens encoding that last (created_at, id) pair.
+"""
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def wants_cursor(request):
+    """Cursor mode is opt-in via ?cursor= (empty for the first page) or ?pagination=cursor"""
+    return 'cursor' in request.query_params or request.query_params.get('pagination') == 'cursor'
+
+
+def encode_cursor(created_at, pk):
+    payload = json.dumps([created_at.isoformat(), pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (created_at, pk) for a cursor token; raises ValueError if malformed"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = parse_datetime(created_at)
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if created_at is None or not isinstance(pk, int):
+        raise ValueError('Invalid cursor')
+    return created_at, pk
+
+
+def paginate_by_cursor(queryset, cursor, page_size):
+    """Return (items, next_cursor) for the page after ``cursor`` (None for the first page)"""
+    queryset = queryset.order_by('-created_at', '-id')
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+
+    # Fetch one extra row to learn whether another page exists
+    items = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.pk)
+    return items, next_cursor
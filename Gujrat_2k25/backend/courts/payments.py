@@ -0,0 +1,90 @@
+"""
+Razorpay client reuse and payment idempotency.
+
+``get_client()`` returns one razorpay client per process whose requests
+session keeps a pool of HTTPS connections, so create_order/verify calls skip
+the TCP and TLS handshake. RAZORPAY_CLIENT_CLASS can point at a local stub
+with the same constructor for tests.
+
+Every order created through the API is recorded as a PaymentOrder.
+``find_completed()`` lets a repeated verify_and_book call for the same order,
+payment and signature return the booking created the first time, without
+calling Razorpay or re-running the overlap checks.
+"""
+import hmac
+import os
+import threading
+
+import requests
+from django.conf import settings
+from django.utils.module_loading import import_string
+from requests.adapters import HTTPAdapter
+
+from .models import PaymentOrder
+
+POOL_SIZE = getattr(settings, 'RAZORPAY_POOL_SIZE', 10)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _credentials():
+    key_id = os.environ.get('RAZORPAY_KEY_ID', getattr(settings, 'RAZORPAY_KEY_ID', ''))
+    key_secret = os.environ.get('RAZORPAY_KEY_SECRET', getattr(settings, 'RAZORPAY_KEY_SECRET', ''))
+    return key_id, key_secret
+
+
+def _pooled_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_client():
+    """The process-wide Razorpay client"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                client_class = import_string(getattr(settings, 'RAZORPAY_CLIENT_CLASS', 'razorpay.Client'))
+                _client = client_class(session=_pooled_session(), auth=_credentials())
+    return _client
+
+
+def reset_client():
+    """Drop the cached client, e.g. after changing credentials or in tests"""
+    global _client
+    with _client_lock:
+        _client = None
+
+
+def record_order(user, order):
+    """Persist an order returned by Razorpay's order.create"""
+    payment_order, _ = PaymentOrder.objects.get_or_create(
+        razorpay_order_id=order['id'],
+        defaults={
+            'user': user,
+            'amount': order.get('amount') or 0,
+            'currency': order.get('currency') or 'INR',
+            'receipt': order.get('receipt') or '',
+        },
+    )
+    return payment_order
+
+
+def find_completed(user, order_id, payment_id, signature):
+    """The PaymentOrder already booked for exactly this verification request, if any"""
+    payment_order = (
+        PaymentOrder.objects
+        .select_related('booking')
+        .filter(razorpay_order_id=order_id, user=user, status='booked', booking__isnull=False)
+        .first()
+    )
+    if payment_order is None:
+        return None
+    if payment_order.razorpay_payment_id != payment_id:
+        return None
+    if not hmac.compare_digest(payment_order.razorpay_signature, signature):
+        return None
+    return payment_order
@@ -0,0 +1,10 @@
+"""
+Cached sport and amenity lists (see authentication.reference_data).
+"""
+from authentication.reference_data import ReferenceDataset
+
+from .models import Amenity, Sport
+from .serializers import AmenitySerializer, SportSerializer
+
+sports = ReferenceDataset('sports', lambda: Sport.objects.filter(is_active=True), SportSerializer)
+amenities = ReferenceDataset('amenities', Amenity.objects.all, AmenitySerializer)
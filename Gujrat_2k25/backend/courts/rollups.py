@@ -0,0 +1,190 @@
+"""
+Maintenance and querying of the BookingDailyRollup table.
+
+Every booking contributes to exactly one (court, date) rollup row: one count
+in the column for its status, its amount to ``earnings`` when it is
+confirmed or completed, and one count in the bucket for its start hour.
+Booking writes subtract the previous contribution and add the new one, so
+the owner dashboard never has to scan raw bookings.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from .models import Booking, BookingDailyRollup
+
+ZERO = Decimal('0')
+
+STATUS_COLUMNS = {
+    'pending': 'pending_count',
+    'confirmed': 'confirmed_count',
+    'cancelled': 'cancelled_count',
+    'completed': 'completed_count',
+    'no_show': 'no_show_count',
+}
+
+# Statuses whose amount counts as owner earnings
+EARNING_STATUSES = ('confirmed', 'completed')
+
+PERIOD_DAYS = {
+    'week': 7,
+    'month': 30,
+    'quarter': 90,
+    'year': 365,
+}
+
+GRANULARITY_TRUNC = {
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def booking_contribution(court_id, facility_id, booking_date, status, total_amount, start_time):
+    """What a single booking adds to its rollup row"""
+    earnings = (total_amount or ZERO) if status in EARNING_STATUSES else ZERO
+    hour = start_time.hour if start_time is not None else None
+    return court_id, facility_id, booking_date, status, earnings, hour
+
+
+def apply_booking_delta(court_id, facility_id, booking_date, status, earnings, hour, sign):
+    """Add (sign=1) or remove (sign=-1) one booking from its rollup row"""
+    with transaction.atomic():
+        if sign > 0:
+            rollup, _ = BookingDailyRollup.objects.select_for_update().get_or_create(
+                court_id=court_id, date=booking_date, defaults={'facility_id': facility_id}
+            )
+        else:
+            rollup = BookingDailyRollup.objects.select_for_update().filter(
+                court_id=court_id, date=booking_date
+            ).first()
+            if rollup is None:
+                return
+
+        column = STATUS_COLUMNS.get(status)
+        if column:
+            setattr(rollup, column, getattr(rollup, column) + sign)
+        rollup.earnings += sign * earnings
+        if hour is not None:
+            hour_counts = list(rollup.hour_counts) or [0] * 24
+            hour_counts[hour] += sign
+            rollup.hour_counts = hour_counts
+        rollup.save(update_fields=list(STATUS_COLUMNS.values()) + ['earnings', 'hour_counts'])
+
+
+@transaction.atomic
+def rebuild_all(start_date=None, end_date=None, court_id=None):
+    """Recompute rollup rows from raw bookings, optionally limited to a date range or court; returns the row count"""
+    bookings = Booking.objects.all()
+    rollups = BookingDailyRollup.objects.all()
+    if court_id:
+        bookings = bookings.filter(court_id=court_id)
+        rollups = rollups.filter(court_id=court_id)
+    if start_date:
+        bookings = bookings.filter(booking_date__gte=start_date)
+        rollups = rollups.filter(date__gte=start_date)
+    if end_date:
+        bookings = bookings.filter(booking_date__lte=end_date)
+        rollups = rollups.filter(date__lte=end_date)
+
+    rows = {}
+    for court_id, facility_id, booking_date, status, total_amount, start_time in bookings.values_list(
+        'court_id', 'facility_id', 'booking_date', 'status', 'total_amount', 'start_time'
+    ).order_by().iterator():
+        rollup = rows.get((court_id, booking_date))
+        if rollup is None:
+            rollup = rows[(court_id, booking_date)] = BookingDailyRollup(
+                court_id=court_id, facility_id=facility_id, date=booking_date, hour_counts=[0] * 24
+            )
+        column = STATUS_COLUMNS.get(status)
+        if column:
+            setattr(rollup, column, getattr(rollup, column) + 1)
+        if status in EARNING_STATUSES:
+            rollup.earnings += total_amount or ZERO
+        rollup.hour_counts[start_time.hour] += 1
+
+    rollups.delete()
+    BookingDailyRollup.objects.bulk_create(rows.values(), batch_size=500)
+    return len(rows)
+
+
+def resolve_range(params, today, default_period='week'):
+    """Date range for ?period=week|month|quarter|year or explicit ?from=&to= (YYYY-MM-DD); raises ValueError
+
+    ``start``/``end`` are accepted as spellings of ``from``/``to``. Without any of them the
+    range covers ``default_period``, or is open on both ends when that is None.
+    """
+    from_param = params.get('from') or params.get('start')
+    to_param = params.get('to') or params.get('end')
+    if from_param or to_param:
+        start_date = datetime.strptime(from_param, '%Y-%m-%d').date() if from_param else None
+        end_date = datetime.strptime(to_param, '%Y-%m-%d').date() if to_param else None
+        if start_date and end_date and start_date > end_date:
+            raise ValueError("from is after to")
+        return start_date, end_date
+
+    period = params.get('period', default_period)
+    if period is None:
+        return None, None
+    days = PERIOD_DAYS.get(period, PERIOD_DAYS[default_period or 'week'])
+    return today - timedelta(days=days), None
+
+
+def totals(rollups):
+    """Booking count, pending count and earnings over a rollup queryset"""
+    sums = rollups.aggregate(
+        pending=Sum('pending_count'),
+        confirmed=Sum('confirmed_count'),
+        cancelled=Sum('cancelled_count'),
+        completed=Sum('completed_count'),
+        no_show=Sum('no_show_count'),
+        earnings=Sum('earnings'),
+    )
+    earnings = sums.pop('earnings') or ZERO
+    counts = {status: value or 0 for status, value in sums.items()}
+    return {
+        'bookings': sum(counts.values()),
+        'pending': counts['pending'],
+        'earnings': earnings,
+    }
+
+
+def trends(rollups, granularity='day'):
+    """Bookings and earnings per day, week or month (bucket start date), oldest first"""
+    trunc = GRANULARITY_TRUNC.get(granularity)
+    bucket = trunc('date') if trunc else F('date')
+    rows = (
+        rollups
+        .annotate(bucket=bucket)
+        .values('bucket')
+        .annotate(
+            pending=Sum('pending_count'),
+            confirmed=Sum('confirmed_count'),
+            cancelled=Sum('cancelled_count'),
+            completed=Sum('completed_count'),
+            no_show=Sum('no_show_count'),
+            earnings=Sum('earnings'),
+        )
+        .order_by('bucket')
+    )
+    return [
+        {
+            'date': row['bucket'],
+            'bookings': sum(row[key] or 0 for key in ('pending', 'confirmed', 'cancelled', 'completed', 'no_show')),
+            'earnings': row['earnings'] or ZERO,
+        }
+        for row in rows
+    ]
+
+
+def hour_totals(rollups):
+    """Sum the per-hour booking counts of a rollup queryset; returns {hour: count} for busy hours"""
+    counts = defaultdict(int)
+    for hour_counts in rollups.values_list('hour_counts', flat=True):
+        for hour, count in enumerate(hour_counts or []):
+            if count:
+                counts[hour] += count
+    return dict(sorted(counts.items()))
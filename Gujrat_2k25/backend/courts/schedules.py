@@ -0,0 +1,177 @@
+"""
+Rule-based court slots.
+
+A court with a CourtSchedule has no stored slot rows: its day is cut into
+``slot_minutes`` slots separated by ``buffer_minutes`` between the opening
+and closing time (the schedule's own, else the court's, else the
+facility's). The cut is pure arithmetic on minutes and is memoized per rule,
+so every court sharing a rule shares one grid. On top of the grid:
+
+* a ScheduleException closes the court or changes its hours for one date;
+* TimeSlot rows with ``is_blocked`` set block any slot they overlap, every day.
+
+Courts without a schedule keep their explicit TimeSlot rows as before.
+
+``SlotCalendar`` loads schedules, exceptions and slot rows for a set of
+courts with three queries and materializes each court-day's slots on first
+use, so availability views cost the same whatever the number of days.
+"""
+from datetime import time
+from functools import lru_cache
+
+from .availability import interval_mask, minute_of_day
+from .models import CourtSchedule, ScheduleException, TimeSlot
+
+
+def time_of_minute(minute):
+    return time(minute // 60, minute % 60)
+
+
+@lru_cache(maxsize=1024)
+def grid(open_minute, close_minute, slot_minutes, buffer_minutes):
+    """(start, end) minute pairs of one day's slots"""
+    slots = []
+    start = open_minute
+    while start + slot_minutes <= close_minute:
+        slots.append((start, start + slot_minutes))
+        start += slot_minutes + buffer_minutes
+    return tuple(slots)
+
+
+class Slot:
+    """A bookable time range, generated from a schedule or loaded from a TimeSlot row"""
+    __slots__ = ('id', 'court_id', 'start_time', 'end_time')
+
+    def __init__(self, court_id, start_time, end_time, id=None):
+        self.court_id = court_id
+        self.start_time = start_time
+        self.end_time = end_time
+        # Generated slots get a negative id from their start minute, unique within the court
+        self.id = id if id is not None else -(minute_of_day(start_time) + 1)
+
+    @property
+    def duration_hours(self):
+        return (minute_of_day(self.end_time) - minute_of_day(self.start_time)) / 60
+
+    def as_dict(self):
+        """Same shape as TimeSlotSerializer output"""
+        return {
+            'id': self.id,
+            'court': self.court_id,
+            'start_time': self.start_time.isoformat(),
+            'end_time': self.end_time.isoformat(),
+            'is_available': True,
+            'is_blocked': False,
+            'block_reason': '',
+            'is_recurring': True,
+            'duration_hours': self.duration_hours,
+        }
+
+
+def generate(court, schedule, opening_time=None, closing_time=None):
+    """Slots of one day under ``schedule``, optionally with other hours"""
+    opening_time = opening_time or schedule.get_opening_time
+    closing_time = closing_time or schedule.get_closing_time
+    if opening_time is None or closing_time is None:
+        return []
+    pairs = grid(minute_of_day(opening_time), minute_of_day(closing_time), schedule.slot_minutes, schedule.buffer_minutes)
+    return [Slot(court.pk, time_of_minute(start), time_of_minute(end)) for start, end in pairs]
+
+
+def _without_blocks(slots, blocked_mask):
+    if not blocked_mask:
+        return slots
+    return [slot for slot in slots if not (blocked_mask & interval_mask(slot.start_time, slot.end_time))]
+
+
+def _within_hours(slots, opening_time, closing_time):
+    return [
+        slot for slot in slots
+        if (opening_time is None or slot.start_time >= opening_time)
+        and (closing_time is None or slot.end_time <= closing_time)
+    ]
+
+
+class SlotCalendar:
+    """Slots per (court, day) for a set of courts, materialized on first use"""
+
+    def __init__(self, courts, schedules, exceptions, slot_rows):
+        self._courts = {court.pk: court for court in courts}
+        self._schedules = schedules
+        self._exceptions = exceptions
+        self._blocked = {}
+        self._stored = {}
+        for row in slot_rows:
+            if row.is_blocked:
+                self._blocked[row.court_id] = (
+                    self._blocked.get(row.court_id, 0) | interval_mask(row.start_time, row.end_time)
+                )
+            elif row.is_available:
+                self._stored.setdefault(row.court_id, []).append(
+                    Slot(row.court_id, row.start_time, row.end_time, id=row.id)
+                )
+        self._regular = {}
+        self._days = {}
+
+    @classmethod
+    def for_courts(cls, courts, start_date=None, end_date=None):
+        """Load everything needed for the courts, with exceptions between the dates (inclusive)"""
+        courts = list(courts)
+        court_ids = [court.pk for court in courts]
+        by_id = {court.pk: court for court in courts}
+        schedules = {}
+        for schedule in CourtSchedule.objects.filter(court_id__in=court_ids):
+            # Reuse the caller's court objects for the hours fallback
+            schedule.court = by_id[schedule.court_id]
+            schedules[schedule.court_id] = schedule
+
+        exceptions = {}
+        if start_date is not None:
+            for exception in ScheduleException.objects.filter(
+                court_id__in=court_ids, date__range=(start_date, end_date or start_date)
+            ):
+                exceptions[(exception.court_id, exception.date)] = exception
+
+        slot_rows = TimeSlot.objects.filter(court_id__in=court_ids).order_by('start_time')
+        return cls(courts, schedules, exceptions, slot_rows)
+
+    def schedule(self, court_id):
+        return self._schedules.get(court_id)
+
+    def regular_slots(self, court_id):
+        """The court's slots on a day without exceptions"""
+        slots = self._regular.get(court_id)
+        if slots is None:
+            schedule = self._schedules.get(court_id)
+            if schedule is None:
+                slots = self._stored.get(court_id, [])
+            else:
+                slots = _without_blocks(generate(self._courts[court_id], schedule), self._blocked.get(court_id, 0))
+            self._regular[court_id] = slots
+        return slots
+
+    def slots(self, court_id, day):
+        """The court's slots on ``day``"""
+        key = (court_id, day)
+        slots = self._days.get(key)
+        if slots is None:
+            exception = self._exceptions.get(key)
+            schedule = self._schedules.get(court_id)
+            if exception is None:
+                slots = self.regular_slots(court_id)
+            elif exception.is_closed:
+                slots = []
+            elif schedule is None:
+                slots = _within_hours(self.regular_slots(court_id), exception.opening_time, exception.closing_time)
+            else:
+                slots = _without_blocks(
+                    generate(self._courts[court_id], schedule, exception.opening_time, exception.closing_time),
+                    self._blocked.get(court_id, 0)
+                )
+            self._days[key] = slots
+        return slots
+
+
+def regular_slots(court):
+    """The court's everyday slots, for serializing a single court"""
+    return SlotCalendar.for_courts([court]).regular_slots(court.pk)
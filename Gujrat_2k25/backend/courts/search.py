@@ -0,0 +1,122 @@
+"""
+Full-text venue search backed by an SQLite FTS5 table.
+
+``courts_facility_search`` holds one document per facility (rowid = facility
+id) with its name, description, city, address and the names of the sports
+played on its courts. Signal handlers in ``courts.signals`` keep it in sync;
+``rebuild_search_index`` recreates it from scratch. On databases without FTS5
+``is_supported()`` is False and callers fall back to ``icontains`` filters.
+
+``rank_facilities()`` adds the match to a facility queryset as subqueries,
+so the listing's other filters run in the same statement and every matching
+venue that passes them is returned, ranked by bm25.
+"""
+import re
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .models import Court, Facility
+
+SEARCH_TABLE = 'courts_facility_search'
+
+# bm25 column weights, in table column order
+COLUMN_WEIGHTS = (10.0, 1.0, 3.0, 1.0, 5.0)
+
+CREATE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "name, description, city, address, sports, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+DROP_TABLE_SQL = f"DROP TABLE IF EXISTS {SEARCH_TABLE}"
+POPULATE_SQL = (
+    f"INSERT INTO {SEARCH_TABLE} (rowid, name, description, city, address, sports) "
+    "SELECT f.id, f.name, f.description, f.city, f.address, "
+    "COALESCE((SELECT group_concat(DISTINCT s.name) FROM courts_court c "
+    "JOIN courts_sport s ON s.id = c.sport_id WHERE c.facility_id = f.id), '') "
+    "FROM courts_facility f"
+)
+
+
+def is_supported():
+    """Whether the current database has the FTS5 search table"""
+    return connection.vendor == 'sqlite'
+
+
+def to_match_expression(query):
+    """Turn free text into an FTS5 query: every word must match as a prefix"""
+    words = re.findall(r'\w+', query.lower())
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def rank_facilities(queryset, query):
+    """Facilities of the queryset matching the query, best match first"""
+    expression = to_match_expression(query)
+    if not expression:
+        return queryset.none()
+    weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+    facility_table = queryset.model._meta.db_table
+    matches = RawSQL(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [expression])
+    # Correlated on rowid, so it is only evaluated for rows that survive the other filters
+    rank = RawSQL(
+        f"SELECT bm25({SEARCH_TABLE}, {weights}) FROM {SEARCH_TABLE} "
+        f"WHERE {SEARCH_TABLE} MATCH %s AND rowid = {facility_table}.id",
+        [expression]
+    )
+    return queryset.filter(id__in=matches).annotate(search_rank=rank).order_by('search_rank', '-created_at')
+
+
+def index_facilities(facility_ids):
+    """(Re)index the given facilities; facilities that no longer exist are dropped"""
+    facility_ids = [facility_id for facility_id in set(facility_ids) if facility_id is not None]
+    if not facility_ids or not is_supported():
+        return
+
+    sports = defaultdict(set)
+    for facility_id, sport_name in (
+        Court.objects.filter(facility_id__in=facility_ids)
+        .values_list('facility_id', 'sport__name')
+    ):
+        sports[facility_id].add(sport_name)
+
+    rows = [
+        (facility_id, name, description, city, address, ' '.join(sorted(sports[facility_id])))
+        for facility_id, name, description, city, address in (
+            Facility.objects.filter(id__in=facility_ids)
+            .values_list('id', 'name', 'description', 'city', 'address')
+        )
+    ]
+
+    with connection.cursor() as cursor:
+        _delete_rows(cursor, facility_ids)
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, name, description, city, address, sports) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            rows
+        )
+
+
+def remove_facilities(facility_ids):
+    """Drop facilities from the index"""
+    if not facility_ids or not is_supported():
+        return
+    with connection.cursor() as cursor:
+        _delete_rows(cursor, list(facility_ids))
+
+
+def rebuild_index():
+    """Recreate the search table and index every facility; returns the row count"""
+    if not is_supported():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(DROP_TABLE_SQL)
+        cursor.execute(CREATE_TABLE_SQL)
+        cursor.execute(POPULATE_SQL)
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def _delete_rows(cursor, facility_ids):
+    placeholders = ', '.join(['%s'] * len(facility_ids))
+    cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", facility_ids)
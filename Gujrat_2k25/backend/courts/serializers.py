@@ -3,11 +3,32 @@ from django.db.models import Avg, Count, Sum, Min
 from django.utils import timezone
 from datetime import datetime, timedelta
 from decimal import Decimal
+from django.conf import settings
 from django.db import transaction
+from django.core.exceptions import ObjectDoesNotExist
 from .models import (
     Facility, FacilityPhoto, Sport, FacilitySport, Amenity, FacilityAmenity,
-    Court, CourtPhoto, TimeSlot, Booking, CourtRating, Notification
+    Court, CourtPhoto, TimeSlot, Booking, CourtRating, Notification, SlotHold, BookingSeries,
+    CourtSchedule, ScheduleException
 )
+from . import booking_engine, court_edits, holds, images, schedules, series, uploads
+
+def _context_user(context):
+    """The booking user: the request's user, or an explicit 'user' in the serializer context"""
+    request = context.get('request')
+    return request.user if request else context.get('user')
+
+def _duration_hours(booking_date, start_time, end_time):
+    duration = datetime.combine(booking_date, end_time) - datetime.combine(booking_date, start_time)
+    # Store as Decimal to match model field and avoid Decimal*float errors
+    return Decimal(str(duration.total_seconds() / 3600)).quantize(Decimal('0.1'))
+
+def _summary_row(obj):
+    """FacilityStats/CourtStats row for obj, or None when it has not been built yet"""
+    try:
+        return obj.stats
+    except ObjectDoesNotExist:
+        return None
 
 class SportSerializer(serializers.ModelSerializer):
     """Serializer for sports"""
@@ -24,6 +45,8 @@ class AmenitySerializer(serializers.ModelSerializer):
 class FacilityPhotoSerializer(serializers.ModelSerializer):
     """Serializer for facility photos"""
     image = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
+    status = serializers.SerializerMethodField()
     
     def get_image(self, obj):
         try:
@@ -33,13 +56,24 @@ class FacilityPhotoSerializer(serializers.ModelSerializer):
         except Exception:
             return None
     
+    def get_srcset(self, obj):
+        """Resized copies by size (thumb, card, full), each as WebP and JPEG; empty while processing"""
+        request = self.context.get('request') if hasattr(self, 'context') else None
+        return images.srcset(obj, request)
+    
+    def get_status(self, obj):
+        """'processing' until the derivatives are built"""
+        return 'ready' if obj.derivatives else 'processing'
+    
     class Meta:
         model = FacilityPhoto
-        fields = ['id', 'image', 'caption', 'is_primary', 'created_at']
+        fields = ['id', 'image', 'srcset', 'status', 'caption', 'is_primary', 'created_at']
 
 class CourtPhotoSerializer(serializers.ModelSerializer):
     """Serializer for court photos"""
     image = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
+    status = serializers.SerializerMethodField()
     
     def get_image(self, obj):
         try:
@@ -49,9 +83,18 @@ class CourtPhotoSerializer(serializers.ModelSerializer):
         except Exception:
             return None
     
+    def get_srcset(self, obj):
+        """Resized copies by size (thumb, card, full), each as WebP and JPEG; empty while processing"""
+        request = self.context.get('request') if hasattr(self, 'context') else None
+        return images.srcset(obj, request)
+    
+    def get_status(self, obj):
+        """'processing' until the derivatives are built"""
+        return 'ready' if obj.derivatives else 'processing'
+    
     class Meta:
         model = CourtPhoto
-        fields = ['id', 'image', 'caption', 'is_primary', 'created_at']
+        fields = ['id', 'image', 'srcset', 'status', 'caption', 'is_primary', 'created_at']
 
 class FacilitySportSerializer(serializers.ModelSerializer):
     """Serializer for facility sports"""
@@ -105,44 +148,63 @@ class FacilitySerializer(serializers.ModelSerializer):
         return [amenity.amenity.name for amenity in obj.facility_amenities.all()]
     
     def get_images(self, obj):
-        """Get list of photo URLs (absolute)"""
+        """Get list of card-size photo URLs (absolute)"""
         request = self.context.get('request') if hasattr(self, 'context') else None
         urls = []
         for photo in obj.photos.all():
             try:
-                url = photo.image.url
-                urls.append(request.build_absolute_uri(url) if request else url)
+                urls.append(images.url(photo, 'card', request))
             except Exception:
                 continue
         return urls
     
     def get_total_courts(self, obj):
+        stats = _summary_row(obj)
+        if stats:
+            return stats.total_courts
         return obj.courts.count()
     
     def get_total_bookings(self, obj):
+        stats = _summary_row(obj)
+        if stats:
+            return stats.total_bookings
         return obj.bookings.count()
     
     def get_total_earnings(self, obj):
+        stats = _summary_row(obj)
+        if stats:
+            return stats.total_earnings
         return obj.bookings.filter(payment_status='paid').aggregate(
             total=Sum('total_amount')
         )['total'] or 0
     
     def get_starting_price(self, obj):
         """Get the minimum price per hour from all courts"""
-        min_price = obj.courts.aggregate(
-            min_price=Min('price_per_hour')
-        )['min_price']
+        stats = _summary_row(obj)
+        if stats:
+            min_price = stats.starting_price
+        else:
+            min_price = obj.courts.aggregate(
+                min_price=Min('price_per_hour')
+            )['min_price']
         return min_price or 0
     
     def get_rating(self, obj):
         """Get average rating from court ratings"""
-        avg_rating = obj.courts.aggregate(
-            avg_rating=Avg('ratings__rating')
-        )['avg_rating']
+        stats = _summary_row(obj)
+        if stats:
+            avg_rating = stats.average_rating
+        else:
+            avg_rating = obj.courts.aggregate(
+                avg_rating=Avg('ratings__rating')
+            )['avg_rating']
         return round(avg_rating, 1) if avg_rating else 0
     
     def get_review_count(self, obj):
         """Get total number of reviews"""
+        stats = _summary_row(obj)
+        if stats:
+            return stats.review_count
         return obj.courts.aggregate(
             review_count=Count('ratings')
         )['review_count'] or 0
@@ -151,7 +213,7 @@ class FacilityCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating facilities"""
     sports = serializers.ListField(child=serializers.IntegerField(), required=False)
     amenities = serializers.ListField(child=serializers.IntegerField(), required=False)
-    photos = serializers.ListField(child=serializers.ImageField(), required=False, write_only=True)
+    photos = serializers.ListField(child=serializers.FileField(), required=False, write_only=True)
     
     class Meta:
         model = Facility
@@ -162,6 +224,9 @@ class FacilityCreateSerializer(serializers.ModelSerializer):
             'sports', 'amenities', 'photos'
         ]
     
+    def validate_photos(self, value):
+        return _checked_photos(value)
+    
     def create(self, validated_data):
         try:
             sports = validated_data.pop('sports', [])
@@ -206,25 +271,82 @@ class FacilityCreateSerializer(serializers.ModelSerializer):
                 except Amenity.DoesNotExist:
                     pass
             
-            # Add photos
-            for i, photo in enumerate(photos):
-                FacilityPhoto.objects.create(
-                    facility=facility,
-                    image=photo,
-                    is_primary=(i == 0)  # First photo is primary
-                )
+            # Add photos (one bulk insert; first photo is primary)
+            if photos:
+                uploads.create_photos(FacilityPhoto, 'facility', facility, photos)
             
             return facility
         except Exception as e:
             print(f"Error creating facility: {e}")
             raise
 
+class CourtScheduleSerializer(serializers.ModelSerializer):
+    """Serializer for a court's slot rule"""
+    class Meta:
+        model = CourtSchedule
+        fields = ['opening_time', 'closing_time', 'slot_minutes', 'buffer_minutes', 'updated_at']
+        read_only_fields = ['updated_at']
+    
+    def validate(self, data):
+        opening_time = data.get('opening_time')
+        closing_time = data.get('closing_time')
+        if opening_time and closing_time and closing_time <= opening_time:
+            raise serializers.ValidationError("Closing time must be after opening time")
+        return data
+
+class ScheduleExceptionSerializer(serializers.ModelSerializer):
+    """Serializer for one-off schedule changes"""
+    class Meta:
+        model = ScheduleException
+        fields = ['id', 'court', 'date', 'is_closed', 'opening_time', 'closing_time', 'reason', 'created_at']
+        read_only_fields = ['created_at']
+    
+    def validate_court(self, court):
+        # Checked on create and on update: moving an exception to another owner's court is refused too
+        user = _context_user(self.context)
+        if user is None or court.facility.owner_id != user.id:
+            raise serializers.ValidationError("You can only change schedules of your own courts")
+        return court
+    
+    def validate(self, data):
+        opening_time = data.get('opening_time')
+        closing_time = data.get('closing_time')
+        if opening_time and closing_time and closing_time <= opening_time:
+            raise serializers.ValidationError("Closing time must be after opening time")
+        return data
+
+def _checked_photos(files):
+    """Validate uploaded photos in the upload thread pool; every file must be a usable image"""
+    valid, errors = uploads.check_all(files)
+    if errors:
+        raise serializers.ValidationError([f"{error['name']}: {error['error']}" for error in errors])
+    return valid
+
+def _parse_schedule(value):
+    """Validate a schedule given as a dict or JSON string (multipart forms)"""
+    if isinstance(value, str):
+        import json
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            raise serializers.ValidationError("Invalid JSON format for schedule")
+    if not isinstance(value, dict):
+        raise serializers.ValidationError("schedule must be an object")
+    serializer = CourtScheduleSerializer(data=value)
+    if not serializer.is_valid():
+        raise serializers.ValidationError(serializer.errors)
+    return serializer.validated_data
+
+def _slot_pairs(time_slots_data):
+    return {(str(slot.get('start_time', ''))[:5], str(slot.get('end_time', ''))[:5]) for slot in time_slots_data}
+
 class CourtSerializer(serializers.ModelSerializer):
     """Serializer for courts"""
     facility = serializers.ReadOnlyField(source='facility.name')
     sport = SportSerializer(read_only=True)
     photos = CourtPhotoSerializer(many=True, read_only=True)
     time_slots = serializers.SerializerMethodField()
+    schedule = serializers.SerializerMethodField()
     total_bookings = serializers.SerializerMethodField()
     average_rating = serializers.SerializerMethodField()
     total_earnings = serializers.SerializerMethodField()
@@ -236,31 +358,47 @@ class CourtSerializer(serializers.ModelSerializer):
             'currency', 'court_number', 'surface_type', 'court_size', 'status',
             'is_available', 'opening_time', 'closing_time', 'address', 'city', 
             'state', 'pincode', 'latitude', 'longitude', 'created_at', 'updated_at',
-            'photos', 'time_slots', 'total_bookings', 'average_rating', 'total_earnings'
+            'photos', 'time_slots', 'schedule', 'total_bookings', 'average_rating', 'total_earnings'
         ]
         read_only_fields = ['facility', 'created_at', 'updated_at']
     
     def get_time_slots(self, obj):
-        """Get available time slots for the court"""
-        slots = obj.time_slots.filter(is_available=True, is_blocked=False)
-        return TimeSlotSerializer(slots, many=True).data
+        """Get available time slots for the court (generated from its schedule, if it has one)"""
+        return [slot.as_dict() for slot in schedules.regular_slots(obj)]
+    
+    def get_schedule(self, obj):
+        try:
+            return CourtScheduleSerializer(obj.schedule).data
+        except CourtSchedule.DoesNotExist:
+            return None
     
     def get_total_bookings(self, obj):
+        stats = _summary_row(obj)
+        if stats:
+            return stats.total_bookings
         return obj.bookings.count()
     
     def get_average_rating(self, obj):
-        avg = obj.ratings.aggregate(Avg('rating'))['rating__avg']
+        stats = _summary_row(obj)
+        if stats:
+            avg = stats.average_rating
+        else:
+            avg = obj.ratings.aggregate(Avg('rating'))['rating__avg']
         return round(avg, 1) if avg else 0
     
     def get_total_earnings(self, obj):
+        stats = _summary_row(obj)
+        if stats:
+            return stats.total_earnings
         return obj.bookings.filter(payment_status='paid').aggregate(
             total=Sum('total_amount')
         )['total'] or 0
 
 class CourtCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating courts"""
-    photos = serializers.ListField(child=serializers.ImageField(), required=False, write_only=True)
+    photos = serializers.ListField(child=serializers.FileField(), required=False, write_only=True)
     time_slots = serializers.CharField(required=False, write_only=True)  # Changed to CharField to handle JSON string
+    schedule = serializers.JSONField(required=False, write_only=True)  # Slot rule, instead of time_slots
     
     class Meta:
         model = Court
@@ -268,9 +406,15 @@ class CourtCreateSerializer(serializers.ModelSerializer):
             'facility', 'name', 'sport', 'description', 'price_per_hour',
             'currency', 'court_number', 'surface_type', 'court_size',
             'opening_time', 'closing_time', 'address', 'city', 'state', 
-            'pincode', 'latitude', 'longitude', 'photos', 'time_slots'
+            'pincode', 'latitude', 'longitude', 'photos', 'time_slots', 'schedule'
         ]
     
+    def validate_schedule(self, value):
+        return _parse_schedule(value) if value else None
+    
+    def validate_photos(self, value):
+        return _checked_photos(value)
+    
     def validate_time_slots(self, value):
         """Validate and parse time_slots JSON string"""
         if not value:
@@ -289,6 +433,11 @@ class CourtCreateSerializer(serializers.ModelSerializer):
         
         return value
     
+    def validate(self, data):
+        if data.get('schedule') and data.get('time_slots'):
+            raise serializers.ValidationError("Provide either a schedule or time_slots, not both")
+        return data
+    
     def create(self, validated_data):
         user = self.context['request'].user
         facility = user.facilities.first()
@@ -296,36 +445,34 @@ class CourtCreateSerializer(serializers.ModelSerializer):
         if not facility:
             raise serializers.ValidationError("You need to create a facility first before adding courts. Please contact support to set up your facility.")
         
-        # Extract photos and time slots
+        # Extract photos, time slots and schedule
         photos = validated_data.pop('photos', [])
         time_slots_data = validated_data.pop('time_slots', [])
+        schedule_data = validated_data.pop('schedule', None)
         
         validated_data['facility'] = facility
         court = super().create(validated_data)
         
-        # Create court photos
-        for i, photo in enumerate(photos):
-            CourtPhoto.objects.create(
-                court=court,
-                image=photo,
-                is_primary=(i == 0)  # First photo is primary
-            )
+        # Create court photos (one bulk insert; first photo is primary)
+        if photos:
+            uploads.create_photos(CourtPhoto, 'court', court, photos)
+        
+        # A schedule replaces stored slots: one row however many slots it yields
+        if schedule_data:
+            CourtSchedule.objects.create(court=court, **schedule_data)
+            return court
         
-        # Create time slots
-        for slot_data in time_slots_data:
-            TimeSlot.objects.create(
-                court=court,
-                start_time=slot_data['start_time'],
-                end_time=slot_data['end_time'],
-                is_available=slot_data.get('is_available', True)
-            )
+        # Create time slots (one bulk insert)
+        if time_slots_data:
+            court_edits.sync_time_slots(court, time_slots_data)
         
         return court
 
 class CourtUpdateSerializer(serializers.ModelSerializer):
     """Serializer for updating courts"""
-    photos = serializers.ListField(child=serializers.ImageField(), required=False, write_only=True)
+    photos = serializers.ListField(child=serializers.FileField(), required=False, write_only=True)
     time_slots = serializers.CharField(required=False, write_only=True)  # Changed to CharField to handle JSON string
+    schedule = serializers.JSONField(required=False, write_only=True)  # Slot rule, instead of time_slots
     
     class Meta:
         model = Court
@@ -333,9 +480,15 @@ class CourtUpdateSerializer(serializers.ModelSerializer):
             'name', 'sport', 'description', 'price_per_hour', 'currency',
             'court_number', 'surface_type', 'court_size', 'opening_time', 
             'closing_time', 'address', 'city', 'state', 'pincode', 
-            'latitude', 'longitude', 'status', 'photos', 'time_slots'
+            'latitude', 'longitude', 'status', 'photos', 'time_slots', 'schedule'
         ]
     
+    def validate_schedule(self, value):
+        return _parse_schedule(value) if value else None
+    
+    def validate_photos(self, value):
+        return _checked_photos(value)
+    
     def validate_time_slots(self, value):
         """Validate and parse time_slots JSON string"""
         if not value:
@@ -354,36 +507,41 @@ class CourtUpdateSerializer(serializers.ModelSerializer):
         
         return value
     
+    def validate(self, data):
+        if data.get('schedule') and data.get('time_slots'):
+            raise serializers.ValidationError("Provide either a schedule or time_slots, not both")
+        return data
+    
     def update(self, instance, validated_data):
-        # Extract photos and time slots
+        # Extract photos, time slots and schedule
         photos = validated_data.pop('photos', [])
         time_slots_data = validated_data.pop('time_slots', [])
+        schedule_data = validated_data.pop('schedule', None)
         
         # Update court instance
         court = super().update(instance, validated_data)
         
-        # Handle photos if provided
+        # Handle photos if provided: unchanged images keep their rows and files
         if photos:
-            # Clear existing photos and add new ones
-            court.photos.all().delete()
-            for i, photo in enumerate(photos):
-                CourtPhoto.objects.create(
-                    court=court,
-                    image=photo,
-                    is_primary=(i == 0)  # First photo is primary
-                )
+            court_edits.sync_photos(court, photos)
         
-        # Handle time slots if provided
+        # Handle schedule if provided: one upsert, and stored slots other than blocks are dropped
+        if schedule_data:
+            CourtSchedule.objects.update_or_create(court=court, defaults=schedule_data)
+            court.time_slots.filter(is_blocked=False).delete()
+            return court
+        
+        # Forms send back the slots they were given; on a scheduled court that is not an edit
+        if time_slots_data and hasattr(court, 'schedule'):
+            current = {(slot.start_time.strftime('%H:%M'), slot.end_time.strftime('%H:%M')) for slot in schedules.regular_slots(court)}
+            if _slot_pairs(time_slots_data) == current:
+                return court
+            # Explicit slots replace the schedule
+            court.schedule.delete()
+        
+        # Handle time slots if provided: unchanged slots keep their ids
         if time_slots_data:
-            # Clear existing time slots and add new ones
-            court.time_slots.all().delete()
-            for slot_data in time_slots_data:
-                TimeSlot.objects.create(
-                    court=court,
-                    start_time=slot_data['start_time'],
-                    end_time=slot_data['end_time'],
-                    is_available=slot_data.get('is_available', True)
-                )
+            court_edits.sync_time_slots(court, time_slots_data)
         
         return court
 
@@ -418,9 +576,8 @@ class BookingSerializer(serializers.ModelSerializer):
             photo = obj.court.photos.order_by('-is_primary', '-created_at').first()
             if not photo:
                 return None
-            url = photo.image.url
             request = self.context.get('request') if hasattr(self, 'context') else None
-            return request.build_absolute_uri(url) if request else url
+            return images.url(photo, 'thumb', request)
         except Exception:
             return None
 
@@ -429,9 +586,8 @@ class BookingSerializer(serializers.ModelSerializer):
             photo = obj.facility.photos.order_by('-is_primary', '-created_at').first()
             if not photo:
                 return None
-            url = photo.image.url
             request = self.context.get('request') if hasattr(self, 'context') else None
-            return request.build_absolute_uri(url) if request else url
+            return images.url(photo, 'thumb', request)
         except Exception:
             return None
 
@@ -467,12 +623,12 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         if overlapping_bookings.exists():
             raise serializers.ValidationError("Time slot is already booked")
         
+        # Another player may be paying for this slot right now
+        if holds.is_held_by_other(court, booking_date, start_time, end_time, _context_user(self.context)):
+            raise serializers.ValidationError(holds.CONFLICT_MESSAGE)
+        
         # Calculate duration
-        start_dt = datetime.combine(booking_date, start_time)
-        end_dt = datetime.combine(booking_date, end_time)
-        duration = end_dt - start_dt
-        # Store as Decimal to match model field and avoid Decimal*float errors
-        data['duration_hours'] = Decimal(str(duration.total_seconds() / 3600)).quantize(Decimal('0.1'))
+        data['duration_hours'] = _duration_hours(booking_date, start_time, end_time)
         
         # Set price per hour
         data['price_per_hour'] = court.price_per_hour
@@ -480,32 +636,113 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         return data
     
     def create(self, validated_data):
-        # Transaction-safe creation to avoid race conditions
-        with transaction.atomic():
-            court = validated_data['court']
-            booking_date = validated_data['booking_date']
-            start_time = validated_data['start_time']
-            end_time = validated_data['end_time']
-
-            # Lock existing bookings for this court and day, then re-check overlap
-            (Booking.objects
-             .select_for_update()
-             .filter(court=court, booking_date=booking_date))
-
-            conflict = Booking.objects.filter(
-                court=court,
-                booking_date=booking_date,
-                status__in=['pending', 'confirmed'],
-                start_time__lt=end_time,
-                end_time__gt=start_time
-            ).exists()
+        # Overlap check and insert run as one serialized step per court and day
+        try:
+            user = validated_data.pop('user', None) or _context_user(self.context)
+            return booking_engine.book(user, **validated_data)
+        except booking_engine.SlotUnavailable as e:
+            raise serializers.ValidationError(str(e))
+
+class BookingBatchItemSerializer(serializers.Serializer):
+    """One requested slot of a batch booking"""
+    court = serializers.IntegerField()
+    booking_date = serializers.DateField()
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    special_requests = serializers.CharField(required=False, allow_blank=True, default='')
+    
+    def validate(self, data):
+        if data['end_time'] <= data['start_time']:
+            raise serializers.ValidationError("End time must be after start time")
+        return data
+
+class BookingBatchSerializer(serializers.Serializer):
+    """Serializer for booking several slots, all or nothing"""
+    bookings = BookingBatchItemSerializer(many=True, allow_empty=False)
+    
+    def validate_bookings(self, items):
+        max_items = getattr(settings, 'BOOKING_BATCH_MAX_ITEMS', 20)
+        if len(items) > max_items:
+            raise serializers.ValidationError(f"At most {max_items} slots can be booked at once")
+        
+        # Every court in the batch from one query
+        courts = Court.objects.select_related('facility').in_bulk({item['court'] for item in items})
+        errors = []
+        for item in items:
+            court = courts.get(item['court'])
+            if court is None:
+                errors.append({'court': ["Court not found"]})
+                continue
+            if not court.is_available or court.status != 'active':
+                errors.append({'court': ["Court is not available for booking"]})
+                continue
+            errors.append({})
+            item['court'] = court
+            item['duration_hours'] = _duration_hours(item['booking_date'], item['start_time'], item['end_time'])
+            item['price_per_hour'] = court.price_per_hour
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+    
+    def create(self, validated_data):
+        # Raises booking_engine.BatchUnavailable when any slot is taken
+        return booking_engine.book_many(_context_user(self.context), validated_data['bookings'])
 
-            if conflict:
-                raise serializers.ValidationError("Time slot is already booked")
+class BookingSeriesSerializer(serializers.ModelSerializer):
+    """Serializer for recurring booking series"""
+    court_name = serializers.ReadOnlyField(source='court.name')
+    facility_name = serializers.ReadOnlyField(source='facility.name')
+    
+    class Meta:
+        model = BookingSeries
+        fields = [
+            'id', 'court', 'court_name', 'facility_name', 'frequency', 'start_date', 'end_date',
+            'occurrences', 'start_time', 'end_time', 'special_requests', 'status',
+            'created_at', 'cancelled_at'
+        ]
+        read_only_fields = ['status', 'created_at', 'cancelled_at']
+    
+    def validate(self, data):
+        court = data['court']
+        if not court.is_available or court.status != 'active':
+            raise serializers.ValidationError("Court is not available for booking")
+        if data['end_time'] <= data['start_time']:
+            raise serializers.ValidationError("End time must be after start time")
+        if data['start_date'] < timezone.now().date():
+            raise serializers.ValidationError("Series cannot start in the past")
+        if not data.get('end_date') and not data.get('occurrences'):
+            raise serializers.ValidationError("Provide an end date or a number of occurrences")
+        if data.get('end_date') and data['end_date'] < data['start_date']:
+            raise serializers.ValidationError("End date must not be before start date")
+        return data
+    
+    def create(self, validated_data):
+        """Save the series and book its free dates, kept on ``bookings`` and ``skipped_dates``"""
+        booking_series = BookingSeries(
+            user=_context_user(self.context),
+            facility=validated_data['court'].facility,
+            **validated_data
+        )
+        duration_hours = _duration_hours(
+            validated_data['start_date'], validated_data['start_time'], validated_data['end_time']
+        )
+        # Raises booking_engine.SlotUnavailable when no date is free
+        bookings, skipped = series.book_series(booking_series, duration_hours)
+        self.bookings = bookings
+        self.skipped_dates = skipped
+        return booking_series
 
-            validated_data['user'] = self.context['request'].user
-            validated_data['facility'] = court.facility
-            return super().create(validated_data)
+class SlotHoldSerializer(serializers.ModelSerializer):
+    """Serializer for the slot a player is checking out"""
+    class Meta:
+        model = SlotHold
+        fields = ['court', 'booking_date', 'start_time', 'end_time', 'expires_at']
+        read_only_fields = ['expires_at']
+    
+    def validate(self, data):
+        if data['end_time'] <= data['start_time']:
+            raise serializers.ValidationError("End time must be after start time")
+        return data
 
 class BookingUpdateSerializer(serializers.ModelSerializer):
     """Serializer for updating bookings"""
@@ -0,0 +1,105 @@
+"""
+Recurring booking series.
+
+A BookingSeries stores a daily or weekly rule. ``book_series()`` expands it
+into dates and checks all of them at once: one range query loads the
+court's bookings (and other players' holds) between the first and last
+date into the availability index, and every occurrence is tested against
+its day's bitmap in memory. Free occurrences are bulk-created in a single
+serialized commit, and taken ones come back as skipped dates.
+
+Every booking keeps a ``series`` link, so ``cancel_series()`` cancels all
+upcoming occurrences with one UPDATE and then rebuilds the court's rollup
+rows for the affected dates.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from . import booking_engine, rollups
+from .availability import AvailabilityIndex
+from .models import Booking
+
+FREQUENCY_DAYS = {
+    'daily': 1,
+    'weekly': 7,
+}
+
+MAX_OCCURRENCES = getattr(settings, 'BOOKING_SERIES_MAX_OCCURRENCES', 52)
+
+
+def occurrence_dates(start_date, frequency, end_date=None, occurrences=None):
+    """Dates of a rule, stopping at end_date, after `occurrences` dates, or at MAX_OCCURRENCES"""
+    step = timedelta(days=FREQUENCY_DAYS[frequency])
+    limit = min(occurrences or MAX_OCCURRENCES, MAX_OCCURRENCES)
+    dates = []
+    day = start_date
+    while len(dates) < limit and (end_date is None or day <= end_date):
+        dates.append(day)
+        day += step
+    return dates
+
+
+def book_series(series, duration_hours):
+    """Save the series and book every free occurrence; returns (bookings, skipped dates)
+
+    Raises booking_engine.SlotUnavailable, without saving anything, when no
+    occurrence is free.
+    """
+    court = series.court
+    dates = occurrence_dates(series.start_date, series.frequency, series.end_date, series.occurrences)
+
+    def write():
+        taken = AvailabilityIndex.for_date_range([court.pk], dates[0], dates[-1], viewer=series.user)
+        free = [day for day in dates if taken.is_free(court.pk, day, series.start_time, series.end_time)]
+        skipped = sorted(set(dates) - set(free))
+        if not free:
+            raise booking_engine.SlotUnavailable("Every date of this series is already booked")
+
+        series.save()
+        bookings = booking_engine.insert_bookings(series.user, [
+            Booking(
+                user=series.user,
+                court=court,
+                facility=series.facility,
+                series=series,
+                booking_date=day,
+                start_time=series.start_time,
+                end_time=series.end_time,
+                duration_hours=duration_hours,
+                price_per_hour=court.price_per_hour,
+                total_amount=court.price_per_hour * duration_hours,
+                special_requests=series.special_requests,
+            )
+            for day in free
+        ])
+        return bookings, skipped
+
+    return booking_engine.commit_many([(court.pk, day) for day in dates], write)
+
+
+@transaction.atomic
+def cancel_series(series, reason=''):
+    """Cancel the series and all its upcoming active bookings; returns the number cancelled"""
+    upcoming = series.bookings.filter(
+        booking_date__gte=timezone.now().date(),
+        status__in=['pending', 'confirmed'],
+    )
+    span = upcoming.aggregate(first=Min('booking_date'), last=Max('booking_date'))
+
+    # update() sends no signals; booking stats do not depend on status, rollups are rebuilt below
+    cancelled = upcoming.update(
+        status='cancelled',
+        cancellation_reason=reason or 'Series cancelled',
+        updated_at=timezone.now(),
+    )
+    series.status = 'cancelled'
+    series.cancelled_at = timezone.now()
+    series.save(update_fields=['status', 'cancelled_at'])
+
+    if cancelled:
+        rollups.rebuild_all(span['first'], span['last'], court_id=series.court_id)
+    return cancelled
@@ -0,0 +1,217 @@
+"""
+Signal handlers keeping derived data in sync with the core court models.
+
+Court, Booking and CourtRating wrap save()/delete() in a transaction (see
+AtomicWriteMixin), so these handlers run atomically with the write itself.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import geo, images, reference_data, rollups, search, stats
+from .models import (
+    Amenity, Booking, Court, CourtPhoto, CourtRating, CourtStats, Facility, FacilityPhoto, FacilityStats, Sport
+)
+
+
+def _previous_values(sender, instance, *fields):
+    """Load the stored values of a row that is about to be updated"""
+    if instance._state.adding or instance.pk is None:
+        return None
+    return sender.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+# Facility / Court
+
+@receiver(post_save, sender=Facility)
+def create_facility_stats(sender, instance, created, **kwargs):
+    if created:
+        FacilityStats.objects.get_or_create(facility=instance)
+
+
+@receiver(post_save, sender=Facility)
+def index_facility_on_save(sender, instance, **kwargs):
+    search.index_facilities([instance.id])
+
+
+@receiver(post_save, sender=Facility)
+def locate_facility_on_save(sender, instance, **kwargs):
+    geo.refresh_facility_locations([instance.id])
+
+
+@receiver(post_delete, sender=Facility)
+def unindex_facility_on_delete(sender, instance, **kwargs):
+    search.remove_facilities([instance.id])
+
+
+@receiver(pre_save, sender=Court)
+def remember_court_facility(sender, instance, **kwargs):
+    instance._stats_previous = _previous_values(sender, instance, 'facility_id')
+
+
+@receiver(post_save, sender=Court)
+def update_court_stats_on_save(sender, instance, created, **kwargs):
+    if created:
+        CourtStats.objects.get_or_create(court=instance)
+    stats.refresh_facility_courts(instance.facility_id, create_missing=True)
+    previous = getattr(instance, '_stats_previous', None)
+    if previous and previous['facility_id'] != instance.facility_id:
+        stats.refresh_facility_courts(previous['facility_id'])
+
+
+@receiver(post_save, sender=Court)
+def sync_court_facility_on_save(sender, instance, **kwargs):
+    # The facility document lists the sports of its courts
+    facility_ids = [instance.facility_id]
+    previous = getattr(instance, '_stats_previous', None)
+    if previous:
+        facility_ids.append(previous['facility_id'])
+    search.index_facilities(facility_ids)
+    # Facilities without coordinates of their own fall back to a court's
+    geo.refresh_facility_locations(facility_ids)
+
+
+@receiver(post_delete, sender=Court)
+def sync_court_facility_on_delete(sender, instance, **kwargs):
+    stats.refresh_facility_courts(instance.facility_id)
+    search.index_facilities([instance.facility_id])
+    geo.refresh_facility_locations([instance.facility_id])
+
+
+@receiver(post_save, sender=Sport)
+def index_sport_facilities_on_save(sender, instance, created, **kwargs):
+    if not created:
+        search.index_facilities(
+            Court.objects.filter(sport=instance).values_list('facility_id', flat=True)
+        )
+
+
+# Photos
+
+@receiver(post_save, sender=FacilityPhoto)
+@receiver(post_save, sender=CourtPhoto)
+def build_photo_derivatives_on_save(sender, instance, created, **kwargs):
+    if created:
+        images.schedule([instance])
+
+
+@receiver(post_delete, sender=FacilityPhoto)
+@receiver(post_delete, sender=CourtPhoto)
+def release_photo_file_on_delete(sender, instance, **kwargs):
+    if not instance.image:
+        return
+    # Identical uploads share one file and its derivatives; only the last reference removes them,
+    # together with the file, so an upload counting the file again keeps both
+    release = getattr(instance.image.storage, 'release', None)
+    if release is None:
+        transaction.on_commit(lambda: images.delete_derivatives(instance))
+    else:
+        release(instance.image.name, on_delete=lambda: images.delete_derivatives(instance))
+
+
+# Reference data
+
+@receiver(post_save, sender=Sport)
+@receiver(post_delete, sender=Sport)
+def sports_changed(sender, **kwargs):
+    reference_data.sports.changed()
+
+
+@receiver(post_save, sender=Amenity)
+@receiver(post_delete, sender=Amenity)
+def amenities_changed(sender, **kwargs):
+    reference_data.amenities.changed()
+
+
+# Booking
+
+@receiver(pre_save, sender=Booking)
+def remember_booking_state(sender, instance, **kwargs):
+    instance._stats_previous = _previous_values(
+        sender, instance, 'court_id', 'facility_id', 'payment_status', 'total_amount',
+        'booking_date', 'status', 'start_time'
+    )
+
+
+@receiver(post_save, sender=Booking)
+def update_booking_stats_on_save(sender, instance, created, **kwargs):
+    current = stats.booking_contribution(
+        instance.court_id, instance.facility_id, instance.payment_status, instance.total_amount
+    )
+    previous = getattr(instance, '_stats_previous', None)
+    if previous:
+        previous = stats.booking_contribution(
+            previous['court_id'], previous['facility_id'],
+            previous['payment_status'], previous['total_amount']
+        )
+        if previous == current:
+            return
+        stats.apply_booking_delta(*previous, sign=-1)
+    stats.apply_booking_delta(*current, sign=1)
+
+
+@receiver(post_delete, sender=Booking)
+def update_booking_stats_on_delete(sender, instance, **kwargs):
+    stats.apply_booking_delta(*stats.booking_contribution(
+        instance.court_id, instance.facility_id, instance.payment_status, instance.total_amount
+    ), sign=-1)
+
+
+_ROLLUP_FIELDS = ('court_id', 'facility_id', 'booking_date', 'status', 'total_amount', 'start_time')
+
+
+def _booking_rollup_contribution(values):
+    return rollups.booking_contribution(*(values[field] for field in _ROLLUP_FIELDS))
+
+
+def _booking_values(instance):
+    return {field: getattr(instance, field) for field in _ROLLUP_FIELDS}
+
+
+@receiver(post_save, sender=Booking)
+def update_booking_rollup_on_save(sender, instance, created, **kwargs):
+    current = _booking_rollup_contribution(_booking_values(instance))
+    previous = getattr(instance, '_stats_previous', None)
+    if previous:
+        previous = _booking_rollup_contribution(previous)
+        if previous == current:
+            return
+        rollups.apply_booking_delta(*previous, sign=-1)
+    rollups.apply_booking_delta(*current, sign=1)
+
+
+@receiver(post_delete, sender=Booking)
+def update_booking_rollup_on_delete(sender, instance, **kwargs):
+    rollups.apply_booking_delta(*_booking_rollup_contribution(_booking_values(instance)), sign=-1)
+
+
+# CourtRating
+
+def _rating_facility_id(court_id):
+    return Court.objects.filter(id=court_id).values_list('facility_id', flat=True).first()
+
+
+@receiver(pre_save, sender=CourtRating)
+def remember_rating_state(sender, instance, **kwargs):
+    instance._stats_previous = _previous_values(sender, instance, 'court_id', 'rating')
+
+
+@receiver(post_save, sender=CourtRating)
+def update_rating_stats_on_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_stats_previous', None)
+    if previous:
+        if previous['court_id'] == instance.court_id and previous['rating'] == instance.rating:
+            return
+        stats.apply_rating_delta(
+            previous['court_id'], _rating_facility_id(previous['court_id']), previous['rating'], sign=-1
+        )
+    stats.apply_rating_delta(
+        instance.court_id, _rating_facility_id(instance.court_id), instance.rating, sign=1
+    )
+
+
+@receiver(post_delete, sender=CourtRating)
+def update_rating_stats_on_delete(sender, instance, **kwargs):
+    stats.apply_rating_delta(
+        instance.court_id, _rating_facility_id(instance.court_id), instance.rating, sign=-1
+    )
@@ -0,0 +1,159 @@
+"""
+Maintenance of the FacilityStats / CourtStats summary tables.
+
+Bookings and ratings are applied as deltas (the previous state of a row is
+subtracted and the new one added), so a write touches exactly one CourtStats
+and one FacilityStats row. Court price/count changes are rare and simply
+refresh the facility row from a single aggregate. ``rebuild_all`` recomputes
+everything from scratch and backs the ``rebuild_stats`` command.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Min, Q, Sum
+
+from .models import Booking, Court, CourtRating, CourtStats, Facility, FacilityStats
+
+ZERO = Decimal('0')
+
+
+def booking_contribution(court_id, facility_id, payment_status, total_amount):
+    """What a single booking adds to the summary rows"""
+    earnings = (total_amount or ZERO) if payment_status == 'paid' else ZERO
+    return court_id, facility_id, earnings
+
+
+def apply_booking_delta(court_id, facility_id, earnings, sign):
+    """Add (sign=1) or remove (sign=-1) one booking from the summary rows"""
+    updated = CourtStats.objects.filter(court_id=court_id).update(
+        total_bookings=F('total_bookings') + sign,
+        total_earnings=F('total_earnings') + sign * earnings,
+    )
+    if not updated and sign > 0:
+        refresh_court_stats(court_id)
+
+    updated = FacilityStats.objects.filter(facility_id=facility_id).update(
+        total_bookings=F('total_bookings') + sign,
+        total_earnings=F('total_earnings') + sign * earnings,
+    )
+    if not updated and sign > 0:
+        refresh_facility_stats(facility_id)
+
+
+def apply_rating_delta(court_id, facility_id, rating, sign):
+    """Add (sign=1) or remove (sign=-1) one rating from the summary rows"""
+    updated = CourtStats.objects.filter(court_id=court_id).update(
+        rating_sum=F('rating_sum') + sign * rating,
+        review_count=F('review_count') + sign,
+    )
+    if not updated and sign > 0:
+        refresh_court_stats(court_id)
+
+    updated = FacilityStats.objects.filter(facility_id=facility_id).update(
+        rating_sum=F('rating_sum') + sign * rating,
+        review_count=F('review_count') + sign,
+    )
+    if not updated and sign > 0:
+        refresh_facility_stats(facility_id)
+
+
+def refresh_facility_courts(facility_id, create_missing=False):
+    """Recompute court count and starting price for a facility (after court writes)"""
+    courts = Court.objects.filter(facility_id=facility_id).aggregate(
+        total=Count('id'), min_price=Min('price_per_hour')
+    )
+    updated = FacilityStats.objects.filter(facility_id=facility_id).update(
+        total_courts=courts['total'], starting_price=courts['min_price']
+    )
+    if not updated and create_missing:
+        refresh_facility_stats(facility_id)
+
+
+def refresh_court_stats(court_id):
+    """Recompute one CourtStats row from the source tables"""
+    bookings = _booking_totals(court_id=court_id)
+    ratings = CourtRating.objects.filter(court_id=court_id).aggregate(
+        total=Sum('rating'), count=Count('id')
+    )
+    CourtStats.objects.update_or_create(court_id=court_id, defaults={
+        'total_bookings': bookings['total'],
+        'total_earnings': bookings['earnings'],
+        'rating_sum': ratings['total'] or 0,
+        'review_count': ratings['count'],
+    })
+
+
+def refresh_facility_stats(facility_id):
+    """Recompute one FacilityStats row from the source tables"""
+    bookings = _booking_totals(facility_id=facility_id)
+    courts = Court.objects.filter(facility_id=facility_id).aggregate(
+        total=Count('id'), min_price=Min('price_per_hour')
+    )
+    ratings = CourtRating.objects.filter(court__facility_id=facility_id).aggregate(
+        total=Sum('rating'), count=Count('id')
+    )
+    FacilityStats.objects.update_or_create(facility_id=facility_id, defaults={
+        'total_courts': courts['total'],
+        'starting_price': courts['min_price'],
+        'total_bookings': bookings['total'],
+        'total_earnings': bookings['earnings'],
+        'rating_sum': ratings['total'] or 0,
+        'review_count': ratings['count'],
+    })
+
+
+@transaction.atomic
+def rebuild_all():
+    """Recompute every summary row from grouped aggregates; returns (facility_rows, court_rows)"""
+    court_rows = {
+        court_id: CourtStats(court_id=court_id)
+        for court_id in Court.objects.values_list('id', flat=True)
+    }
+    facility_rows = {
+        facility_id: FacilityStats(facility_id=facility_id)
+        for facility_id in Facility.objects.values_list('id', flat=True)
+    }
+
+    for group, rows in (('court_id', court_rows), ('facility_id', facility_rows)):
+        bookings = Booking.objects.values(group).annotate(
+            total=Count('id'), earnings=Sum('total_amount', filter=Q(payment_status='paid'))
+        ).order_by()
+        for row in bookings:
+            stats = rows.get(row[group])
+            if stats:
+                stats.total_bookings = row['total']
+                stats.total_earnings = row['earnings'] or ZERO
+
+    ratings = CourtRating.objects.values('court_id', 'court__facility_id').annotate(
+        total=Sum('rating'), count=Count('id')
+    ).order_by()
+    for row in ratings:
+        for stats in (court_rows.get(row['court_id']), facility_rows.get(row['court__facility_id'])):
+            if stats:
+                stats.rating_sum += row['total']
+                stats.review_count += row['count']
+
+    courts = Court.objects.values('facility_id').annotate(
+        total=Count('id'), min_price=Min('price_per_hour')
+    ).order_by()
+    for row in courts:
+        stats = facility_rows.get(row['facility_id'])
+        if stats:
+            stats.total_courts = row['total']
+            stats.starting_price = row['min_price']
+
+    CourtStats.objects.all().delete()
+    FacilityStats.objects.all().delete()
+    CourtStats.objects.bulk_create(court_rows.values(), batch_size=500)
+    FacilityStats.objects.bulk_create(facility_rows.values(), batch_size=500)
+    return len(facility_rows), len(court_rows)
+
+
+def _booking_totals(**filters):
+    bookings = Booking.objects.filter(**filters)
+    return {
+        'total': bookings.count(),
+        'earnings': bookings.filter(payment_status='paid').aggregate(
+            total=Sum('total_amount')
+        )['total'] or ZERO,
+    }
@@ -0,0 +1,174 @@
+"""
+Content-addressed storage for uploaded photos.
+
+Facility and court photos are saved under the SHA-256 of their bytes
+(``court_photos/<sha256>.jpg``) instead of the uploaded file name, so the
+same image uploaded twice is stored once and both rows point at the same
+file. Blobs are deduplicated within an upload directory.
+
+Each blob has a StoredBlob row counting the photo rows that use it. Saving
+increments the count; ``release()``, called when a photo row is deleted,
+decrements it and deletes the file once nothing refers to it any more.
+Counts change inside the caller's transaction, files are only removed after
+it commits. The removal runs in its own transaction serialized against
+writers (BEGIN IMMEDIATE on SQLite, an advisory lock on PostgreSQL) and
+skips the file, and the derivatives passed along with it, if a new upload
+has recounted the blob meanwhile; an upload that has to recreate the count
+always rewrites the file. ``dedupe_media`` moves existing files into this
+layout and recomputes every count.
+"""
+import hashlib
+import os
+import re
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import F
+
+CHUNK_SIZE = 64 * 1024
+
+# Same bytes, same name: normalize spellings of one extension
+EXTENSION_ALIASES = {
+    '.jpeg': '.jpg',
+    '.jpe': '.jpg',
+    '.tif': '.tiff',
+}
+
+_DIGEST_NAME = re.compile(r'^[0-9a-f]{64}$')
+
+
+def content_digest(content):
+    """SHA-256 of a file's content, read in chunks; the file is rewound afterwards"""
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks(CHUNK_SIZE):
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+def upload_digest(content):
+    """SHA-256 of an upload, reusing the one courts.uploads cached on it while checking"""
+    return getattr(content, 'sha256', None) or content_digest(content)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names files by content hash and refcounts them"""
+
+    def content_name(self, name, digest):
+        """Storage name for content with ``digest`` uploaded as ``name``"""
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        extension = EXTENSION_ALIASES.get(extension, extension)
+        return os.path.join(directory, digest + extension).replace('\\', '/')
+
+    def digest_of(self, name):
+        """The content hash encoded in a stored name, or None for names from before this storage"""
+        stem = os.path.splitext(os.path.basename(name))[0]
+        return stem if _DIGEST_NAME.match(stem) else None
+
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content in _save(); an existing file is the same blob
+        return name
+
+    def _save(self, name, content):
+        digest = upload_digest(content)
+        name = self.content_name(name, digest)
+        with transaction.atomic():
+            _lock_blob(name)
+            created = self.retain(name, digest, content.size)
+            # A recreated count may race a pending delete of the old file: write it regardless
+            if created or not self.exists(name):
+                self._write_blob(name, content)
+        return name
+
+    def _write_blob(self, name, content):
+        # Write under a unique name and rename into place: two uploads of the same
+        # bytes may race, and either one winning leaves the same file behind
+        temp_name = super()._save(f"{name}.{uuid.uuid4().hex}.part", content)
+        os.replace(self.path(temp_name), self.path(name))
+
+    def retain(self, name, digest=None, size=None, count=1):
+        """Count ``count`` more references to the blob; returns whether its StoredBlob row was created"""
+        from .models import StoredBlob
+
+        blob, created = StoredBlob.objects.get_or_create(
+            name=name,
+            defaults={'sha256': digest or self.digest_of(name) or '', 'size': size or 0, 'refcount': count},
+        )
+        if not created:
+            StoredBlob.objects.filter(pk=blob.pk).update(refcount=F('refcount') + count)
+        return created
+
+    def release(self, name, on_delete=None):
+        """Drop one reference to the blob; returns the references left
+
+        The file is deleted after the transaction commits once none are left,
+        and ``on_delete()`` is called with it to remove files derived from it.
+        Names this storage never counted (files from before it) return 0 and
+        are left on disk for ``dedupe_media``; ``on_delete()`` still runs after commit.
+        """
+        from .models import StoredBlob
+
+        with transaction.atomic():
+            updated = StoredBlob.objects.filter(name=name, refcount__gt=0).update(refcount=F('refcount') - 1)
+            remaining = StoredBlob.objects.filter(name=name).values_list('refcount', flat=True).first()
+            if not updated or remaining is None:
+                if on_delete is not None:
+                    transaction.on_commit(on_delete)
+                return 0
+            if remaining == 0:
+                StoredBlob.objects.filter(name=name, refcount=0).delete()
+                transaction.on_commit(lambda: self._delete_unreferenced(name, on_delete))
+        return remaining
+
+    def _delete_unreferenced(self, name, on_delete=None):
+        """Delete the file unless an upload counted it again since it was released"""
+        from .models import StoredBlob
+
+        with _exclusive_atomic():
+            _lock_blob(name)
+            if StoredBlob.objects.filter(name=name).exists():
+                return
+            if self.exists(name):
+                self.delete(name)
+            if on_delete is not None:
+                on_delete()
+
+
+def _lock_blob(name, using=DEFAULT_DB_ALIAS):
+    """Serialize work on one blob inside the current transaction
+
+    On PostgreSQL this takes a transaction-scoped advisory lock on the name. SQLite needs
+    nothing here: the StoredBlob write already holds the database write lock until commit.
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        key = int(hashlib.sha256(name.encode()).hexdigest()[:15], 16)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [key])
+
+
+def _exclusive_atomic(using=DEFAULT_DB_ALIAS):
+    """A transaction that holds the SQLite write lock from its first statement"""
+    # Imported here: booking_engine imports modules that import this one
+    from .booking_engine import _immediate_atomic
+
+    connection = connections[using]
+    if connection.vendor == 'sqlite' and not connection.in_atomic_block:
+        return _immediate_atomic(connection)
+    return transaction.atomic(using=using)
+
+
+_photo_storage = None
+
+
+def photo_storage():
+    """Storage for FacilityPhoto and CourtPhoto images"""
+    global _photo_storage
+    if _photo_storage is None:
+        _photo_storage = ContentAddressedStorage()
+    return _photo_storage
@@ -0,0 +1,106 @@
+import random
+import threading
+from contextlib import contextmanager
+from datetime import date, time
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test import TransactionTestCase
+
+from authentication.models import User
+
+from courts.booking_engine import SlotUnavailable, book
+from courts.models import Booking, Court, Facility, Sport
+
+
+@contextmanager
+def _no_striped_locks(keys):
+    yield
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    """Threads racing booking_engine.book() on one court and day must never double-book it"""
+
+    THREADS = 6
+    ATTEMPTS = 15
+
+    def setUp(self):
+        owner = User.objects.create_user(
+            username='owner', email='owner@example.com', password='pw', user_type='owner'
+        )
+        self.player = User.objects.create_user(
+            username='player', email='player@example.com', password='pw', user_type='player'
+        )
+        sport = Sport.objects.create(name='Badminton')
+        facility = Facility.objects.create(
+            owner=owner, name='Race Arena', description='', address='1 Road', city='Ahmedabad',
+            state='Gujarat', pincode='380001', phone='9999999999', email='arena@example.com',
+            opening_time=time(0), closing_time=time(23, 59),
+        )
+        self.court = Court.objects.create(facility=facility, name='Court 1', sport=sport, price_per_hour=Decimal('100'))
+        self.booking_date = date(2030, 1, 7)
+
+    def race(self):
+        """Run the booking threads; returns (outcome counts, unexpected errors)"""
+        counts = {'booked': 0, 'conflicts': 0}
+        errors = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(self.THREADS)
+
+        def worker(seed):
+            rng = random.Random(seed)
+            try:
+                barrier.wait()
+                for _ in range(self.ATTEMPTS):
+                    # Short random ranges in a small window, so most attempts overlap another
+                    start_hour = rng.randrange(8, 14)
+                    hours = rng.choice([1, 2])
+                    try:
+                        book(
+                            self.player, self.court, self.booking_date, time(start_hour), time(start_hour + hours),
+                            duration_hours=Decimal(hours), price_per_hour=self.court.price_per_hour,
+                        )
+                        outcome = 'booked'
+                    except SlotUnavailable:
+                        outcome = 'conflicts'
+                    with lock:
+                        counts[outcome] += 1
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counts, errors
+
+    def assertNoOverlaps(self):
+        bookings = list(
+            Booking.objects.filter(court=self.court, booking_date=self.booking_date, status__in=['pending', 'confirmed'])
+            .order_by('start_time')
+            .values_list('start_time', 'end_time')
+        )
+        self.assertTrue(bookings)
+        for (_, previous_end), (current_start, _) in zip(bookings, bookings[1:]):
+            self.assertGreaterEqual(current_start, previous_end, f"Overlapping bookings: {bookings}")
+
+    def test_threads_never_double_book(self):
+        counts, errors = self.race()
+        self.assertEqual(errors, [])
+        self.assertEqual(counts['booked'] + counts['conflicts'], self.THREADS * self.ATTEMPTS)
+        self.assertEqual(Booking.objects.count(), counts['booked'])
+        self.assertNoOverlaps()
+
+    def test_database_lock_alone_prevents_double_booking(self):
+        # Without the in-process stripe locks the threads behave like separate
+        # processes, and only the BEGIN IMMEDIATE transaction serializes them
+        with mock.patch('courts.booking_engine._striped_locks', _no_striped_locks):
+            counts, errors = self.race()
+        self.assertEqual(errors, [])
+        self.assertEqual(Booking.objects.count(), counts['booked'])
+        self.assertNoOverlaps()
@@ -0,0 +1,104 @@
+"""
+Photo uploads.
+
+Multipart bodies are spooled to temporary files (TemporaryFileUploadHandler
+in FILE_UPLOAD_HANDLERS) rather than held in memory, so a 20-photo upload
+costs file handles instead of RSS, and storing a photo is a rename of its
+temporary file.
+
+``check_all()`` validates the uploads in a bounded thread pool: size, format
+and pixel count from the header, then a decode at reduced scale to catch
+truncated or corrupt files, plus the SHA-256 that the content-addressed
+storage names the file by (cached on the upload, so it is read only once).
+Pillow and hashlib release the GIL for the heavy parts, so the checks
+overlap. ``create_photos()`` inserts the valid photos with one bulk_create
+and queues their derivatives (courts.images); callers answer straight away
+with the photos marked as processing.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from PIL import Image
+
+from . import images
+from .storage import content_digest
+
+MAX_BYTES = getattr(settings, 'PHOTO_UPLOAD_MAX_BYTES', 10 * 1024 * 1024)
+MAX_PIXELS = getattr(settings, 'PHOTO_UPLOAD_MAX_PIXELS', 40_000_000)
+ALLOWED_FORMATS = ('JPEG', 'PNG', 'WEBP', 'GIF')
+WORKERS = getattr(settings, 'PHOTO_UPLOAD_WORKERS', 4)
+# Longest side decoded when checking an image; JPEGs decode straight to this scale
+CHECK_DECODE_SIZE = 1024
+
+_executor = None
+
+
+class InvalidPhoto(Exception):
+    pass
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix='photo-uploads')
+    return _executor
+
+
+def check(upload):
+    """Raise InvalidPhoto unless the upload is an acceptable image; caches its SHA-256 on it"""
+    if upload.size > MAX_BYTES:
+        raise InvalidPhoto(f"File is larger than {MAX_BYTES // (1024 * 1024)} MB")
+
+    upload.seek(0)
+    try:
+        with Image.open(upload) as image:
+            if image.format not in ALLOWED_FORMATS:
+                raise InvalidPhoto(f"Unsupported image format: {image.format}")
+            # Checked before decoding, so an oversized image is never expanded in memory
+            if image.width * image.height > MAX_PIXELS:
+                raise InvalidPhoto("Image dimensions are too large")
+            image.draft('RGB', (CHECK_DECODE_SIZE, CHECK_DECODE_SIZE))
+            image.load()
+    except InvalidPhoto:
+        raise
+    except Exception:
+        raise InvalidPhoto("Upload a valid image. The file you uploaded was either not an image or a corrupted image.")
+
+    upload.sha256 = content_digest(upload)
+    return upload
+
+
+def _check_one(upload):
+    try:
+        check(upload)
+        return None
+    except InvalidPhoto as e:
+        return str(e)
+
+
+def check_all(uploads):
+    """Check uploads in the thread pool; returns (valid uploads in order, errors)"""
+    uploads = list(uploads)
+    if len(uploads) == 1:
+        results = [_check_one(uploads[0])]
+    else:
+        results = list(_get_executor().map(_check_one, uploads))
+
+    valid = [upload for upload, error in zip(uploads, results) if error is None]
+    errors = [{'name': upload.name, 'error': error} for upload, error in zip(uploads, results) if error]
+    return valid, errors
+
+
+def create_photos(model, parent_field, parent, uploads):
+    """bulk_create one photo row per checked upload and queue their derivatives
+
+    The first upload becomes the primary photo when the parent has none yet.
+    """
+    has_primary = model.objects.filter(**{parent_field: parent, 'is_primary': True}).exists()
+    # bulk_create still runs ImageField.pre_save, which stores each file; it sends no post_save
+    photos = model.objects.bulk_create([
+        model(**{parent_field: parent}, image=upload, is_primary=(index == 0 and not has_primary))
+        for index, upload in enumerate(uploads)
+    ])
+    images.schedule(photos)
+    return photos
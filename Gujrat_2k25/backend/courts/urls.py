@@ -4,8 +4,9 @@ from .views import (
     SportViewSet, AmenityViewSet, FacilityViewSet, CourtViewSet,
     TimeSlotViewSet, BookingViewSet, CourtRatingViewSet, NotificationViewSet,
     DashboardViewSet, PlayerDashboardView, PlayerBookingsView, 
-    PlayerBookingDetailView, PlayerVenuesView, PlayerVenueDetailView,
-    PaymentViewSet, PlayerVenueReviewsView, PlayerCreateReviewView
+    PlayerBookingDetailView, PlayerVenuesView, PlayerVenueDetailView, PlayerVenueAvailabilityView,
+    PaymentViewSet, PlayerVenueReviewsView, PlayerCreateReviewView, PlayerBatchBookingsView,
+    PlayerBookingSeriesView, PlayerBookingSeriesCancelView, ScheduleExceptionViewSet
 )
 
 router = DefaultRouter()
@@ -14,6 +15,7 @@ router.register(r'amenities', AmenityViewSet)
 router.register(r'facilities', FacilityViewSet, basename='facility')
 router.register(r'courts', CourtViewSet, basename='court')
 router.register(r'timeslots', TimeSlotViewSet, basename='timeslot')
+router.register(r'schedule-exceptions', ScheduleExceptionViewSet, basename='schedule-exception')
 router.register(r'bookings', BookingViewSet, basename='booking')
 router.register(r'ratings', CourtRatingViewSet, basename='rating')
 router.register(r'notifications', NotificationViewSet, basename='notification')
@@ -26,9 +28,13 @@ urlpatterns = [
     # Player Dashboard URLs
     path('player/dashboard/', PlayerDashboardView.as_view(), name='player-dashboard'),
     path('player/bookings/', PlayerBookingsView.as_view(), name='player-bookings'),
+    path('player/bookings/batch/', PlayerBatchBookingsView.as_view(), name='player-bookings-batch'),
     path('player/bookings/<int:booking_id>/', PlayerBookingDetailView.as_view(), name='player-booking-detail'),
+    path('player/booking-series/', PlayerBookingSeriesView.as_view(), name='player-booking-series'),
+    path('player/booking-series/<int:series_id>/cancel/', PlayerBookingSeriesCancelView.as_view(), name='player-booking-series-cancel'),
     path('player/venues/', PlayerVenuesView.as_view(), name='player-venues'),
     path('player/venues/<int:venue_id>/', PlayerVenueDetailView.as_view(), name='player-venue-detail'),
+    path('player/venues/<int:venue_id>/availability/', PlayerVenueAvailabilityView.as_view(), name='player-venue-availability'),
     path('player/venues/<int:venue_id>/reviews/', PlayerVenueReviewsView.as_view(), name='player-venue-reviews'),
     path('player/bookings/<int:booking_id>/review/', PlayerCreateReviewView.as_view(), name='player-create-review'),
 ] 
\ No newline at end of file
@@ -1,19 +1,24 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count, Sum, Avg, Q, Case, When, F, DecimalField
+from rest_framework.exceptions import ValidationError
+from django.db.models import Count, Sum, Avg, Q, Case, When, F, DecimalField, Prefetch, Exists, OuterRef
 from django.utils import timezone
 from datetime import datetime, timedelta
+from decimal import Decimal
 from django.shortcuts import get_object_or_404
 from .models import (
     Facility, FacilityPhoto, Sport, FacilitySport, Amenity, FacilityAmenity,
-    Court, CourtPhoto, TimeSlot, Booking, CourtRating, Notification
+    Court, CourtPhoto, TimeSlot, Booking, CourtRating, Notification, CourtStats,
+    BookingDailyRollup, PaymentOrder, BookingSeries, ScheduleException
 )
 from .serializers import (
     SportSerializer, AmenitySerializer, FacilitySerializer, FacilityCreateSerializer,
     CourtSerializer, CourtCreateSerializer, CourtUpdateSerializer, TimeSlotSerializer, BookingSerializer,
     BookingCreateSerializer, CourtRatingSerializer, NotificationSerializer,
-    DashboardKPISerializer, BookingTrendSerializer, PeakHourSerializer, RecentBookingSerializer
+    DashboardKPISerializer, BookingTrendSerializer, PeakHourSerializer, RecentBookingSerializer,
+    SlotHoldSerializer, BookingBatchSerializer, BookingSeriesSerializer, ScheduleExceptionSerializer,
+    FacilityPhotoSerializer, CourtPhotoSerializer
 )
 from rest_framework.views import APIView
 from django.core.paginator import Paginator
@@ -26,6 +31,10 @@ import hmac
 import hashlib
 import os
 from authentication.email_service import EmailService
+from .availability import AvailabilityIndex
+from .schedules import SlotCalendar
+from . import booking_engine, geo, holds, images, payments, reference_data, rollups, search, series, uploads
+from .pagination import paginate_by_cursor, wants_cursor
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
     """Custom permission to only allow owners to edit their facilities and courts"""
@@ -55,12 +64,41 @@ class SportViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Sport.objects.filter(is_active=True)
     serializer_class = SportSerializer
     permission_classes = [permissions.AllowAny]
+    
+    def list(self, request, *args, **kwargs):
+        """Serve the cached sport list"""
+        return reference_data.sports.response(request)
 
 class AmenityViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for amenities"""
     queryset = Amenity.objects.all()
     serializer_class = AmenitySerializer
     permission_classes = [permissions.AllowAny]
+    
+    def list(self, request, *args, **kwargs):
+        """Serve the cached amenity list"""
+        return reference_data.amenities.response(request)
+
+def _photo_upload_response(request, model, parent_field, parent, serializer_class):
+    """Check the uploaded photos in parallel, insert the valid ones and answer before their derivatives exist"""
+    valid, errors = uploads.check_all(request.FILES.getlist('photos'))
+    if not valid:
+        return Response({
+            'success': False,
+            'message': 'No valid photos were uploaded',
+            'errors': errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    photos = uploads.create_photos(model, parent_field, parent, valid)
+    return Response({
+        'success': True,
+        'message': f'{len(photos)} photos uploaded successfully',
+        'data': {
+            'status': 'processing',
+            'photos': serializer_class(photos, many=True, context={'request': request}).data,
+            'errors': errors
+        }
+    }, status=status.HTTP_202_ACCEPTED)
 
 class FacilityViewSet(viewsets.ModelViewSet):
     """ViewSet for facilities"""
@@ -70,7 +108,10 @@ class FacilityViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.user_type == 'owner':
-            return Facility.objects.filter(owner=user)
+            facilities = Facility.objects.filter(owner=user)
+            if self.action == 'list':
+                facilities = facilities.with_listing_stats()
+            return facilities
         return Facility.objects.none()
     
     def get_serializer_class(self):
@@ -97,12 +138,7 @@ class FacilityViewSet(viewsets.ModelViewSet):
     def upload_photos(self, request, pk=None):
         """Upload photos for a facility"""
         facility = self.get_object()
-        photos = request.FILES.getlist('photos')
-        
-        for photo in photos:
-            FacilityPhoto.objects.create(facility=facility, image=photo)
-        
-        return Response({'message': f'{len(photos)} photos uploaded successfully'})
+        return _photo_upload_response(request, FacilityPhoto, 'facility', facility, FacilityPhotoSerializer)
 
 class CourtViewSet(viewsets.ModelViewSet):
     """ViewSet for courts"""
@@ -112,7 +148,9 @@ class CourtViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.user_type == 'owner':
-            return Court.objects.filter(facility__owner=user)
+            return Court.objects.filter(facility__owner=user).select_related(
+                'facility', 'sport', 'stats'
+            ).prefetch_related('photos')
         return Court.objects.none()
     
     def get_serializer_class(self):
@@ -126,12 +164,7 @@ class CourtViewSet(viewsets.ModelViewSet):
     def upload_photos(self, request, pk=None):
         """Upload photos for a court"""
         court = self.get_object()
-        photos = request.FILES.getlist('photos')
-        
-        for photo in photos:
-            CourtPhoto.objects.create(court=court, image=photo)
-        
-        return Response({'message': f'{len(photos)} photos uploaded successfully'})
+        return _photo_upload_response(request, CourtPhoto, 'court', court, CourtPhotoSerializer)
     
     @action(detail=True, methods=['post'])
     def update_status(self, request, pk=None):
@@ -172,6 +205,25 @@ class TimeSlotViewSet(viewsets.ModelViewSet):
             return TimeSlot.objects.filter(court__facility__owner=user)
         return TimeSlot.objects.none()
 
+class ScheduleExceptionViewSet(viewsets.ModelViewSet):
+    """ViewSet for one-off closures and hour changes of scheduled courts"""
+    queryset = ScheduleException.objects.all()
+    serializer_class = ScheduleExceptionSerializer
+    permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
+    
+    def get_queryset(self):
+        user = self.request.user
+        if user.user_type == 'owner':
+            queryset = ScheduleException.objects.filter(court__facility__owner=user)
+            court_id = self.request.query_params.get('court')
+            if court_id:
+                try:
+                    queryset = queryset.filter(court_id=int(court_id))
+                except ValueError:
+                    raise ValidationError({'court': 'Court must be an integer id'})
+            return queryset
+        return ScheduleException.objects.none()
+
 class BookingViewSet(viewsets.ModelViewSet):
     """ViewSet for bookings"""
     serializer_class = BookingSerializer
@@ -262,6 +314,26 @@ class DashboardViewSet(viewsets.ViewSet):
     """ViewSet for dashboard data"""
     permission_classes = [permissions.IsAuthenticated]
     
+    def _owner_rollups(self, request, default_period):
+        """The owner's daily rollups inside the requested window, as (queryset, error response)"""
+        # Every dashboard endpoint takes the same ?period=week|month|quarter|year or ?from=&to= range
+        try:
+            start_date, end_date = rollups.resolve_range(
+                request.query_params, timezone.now().date(), default_period=default_period
+            )
+        except ValueError:
+            return None, Response(
+                {'error': 'Invalid date range. Use YYYY-MM-DD, with from not after to'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        daily = BookingDailyRollup.objects.filter(facility__owner=request.user)
+        if start_date:
+            daily = daily.filter(date__gte=start_date)
+        if end_date:
+            daily = daily.filter(date__lte=end_date)
+        return daily, None
+    
     def list(self, request):
         """Get dashboard overview data"""
         user = request.user
@@ -269,40 +341,19 @@ class DashboardViewSet(viewsets.ViewSet):
         if user.user_type != 'owner':
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        # Get user's facilities
-        facilities = Facility.objects.filter(owner=user)
-        
-        # If user has no facilities, return zeros (this is expected for new users)
-        if not facilities.exists():
-            kpi_data = {
-                'total_bookings': 0,
-                'active_courts': 0,
-                'total_earnings': 0,
-                'pending_bookings': 0
-            }
-            serializer = DashboardKPISerializer(kpi_data)
-            return Response(serializer.data)
-        
-        # Calculate KPIs
-        total_bookings = Booking.objects.filter(facility__in=facilities).count()
-        active_courts = Court.objects.filter(facility__in=facilities, status='active').count()
-        # Earnings: include ONLY owner-approved bookings (confirmed or completed)
-        total_earnings = (
-            Booking.objects
-            .filter(facility__in=facilities, status__in=['confirmed', 'completed'])
-            .aggregate(total=Sum('total_amount'))['total']
-            or 0
-        )
-        pending_bookings = Booking.objects.filter(
-            facility__in=facilities, 
-            status='pending'
-        ).count()
+        # Booking KPIs come from the daily rollups; earnings include ONLY
+        # owner-approved bookings (confirmed or completed). All time unless a window is given
+        daily, error = self._owner_rollups(request, default_period=None)
+        if error:
+            return error
+        totals = rollups.totals(daily)
+        active_courts = Court.objects.filter(facility__owner=user, status='active').count()
         
         kpi_data = {
-            'total_bookings': total_bookings,
+            'total_bookings': totals['bookings'],
             'active_courts': active_courts,
-            'total_earnings': total_earnings,
-            'pending_bookings': pending_bookings
+            'total_earnings': totals['earnings'],
+            'pending_bookings': totals['pending']
         }
         
         serializer = DashboardKPISerializer(kpi_data)
@@ -316,54 +367,16 @@ class DashboardViewSet(viewsets.ViewSet):
         if user.user_type != 'owner':
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        # Get user's facilities
-        facilities = Facility.objects.filter(owner=user)
-        
-        # If user has no facilities, return empty trends
-        if not facilities.exists():
-            serializer = BookingTrendSerializer([], many=True)
-            return Response(serializer.data)
-        
-        # Get date range from query params
-        period = request.query_params.get('period', 'week')
-        
-        if period == 'week':
-            start_date = timezone.now().date() - timedelta(days=7)
-        elif period == 'month':
-            start_date = timezone.now().date() - timedelta(days=30)
-        else:
-            start_date = timezone.now().date() - timedelta(days=7)
-        
-        # Get booking trends
-        bookings = (
-            Booking.objects
-            .filter(
-                facility__in=facilities,
-                booking_date__gte=start_date,
-            )
-            .values('booking_date')
-            .annotate(
-                bookings=Count('id'),
-                earnings=Sum(
-                    Case(
-                        When(status__in=['confirmed', 'completed'], then=F('total_amount')),
-                        default=0,
-                        output_field=DecimalField(max_digits=10, decimal_places=2)
-                    )
-                )
-            )
-            .order_by('booking_date')
-        )
+        daily, error = self._owner_rollups(request, default_period='week')
+        if error:
+            return error
         
-        trends_data = []
-        for booking in bookings:
-            trends_data.append({
-                'date': booking['booking_date'],
-                'bookings': booking['bookings'],
-                'earnings': booking['earnings'] or 0
-            })
+        # ?granularity=day|week|month; week and month buckets are keyed by their first day
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in ('day', 'week', 'month'):
+            return Response({'error': 'granularity must be day, week or month'}, status=status.HTTP_400_BAD_REQUEST)
         
-        serializer = BookingTrendSerializer(trends_data, many=True)
+        serializer = BookingTrendSerializer(rollups.trends(daily, granularity), many=True)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
@@ -374,34 +387,22 @@ class DashboardViewSet(viewsets.ViewSet):
         if user.user_type != 'owner':
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        # Get user's facilities
-        facilities = Facility.objects.filter(owner=user)
+        # Last 30 days unless a window is given
+        daily, error = self._owner_rollups(request, default_period='month')
+        if error:
+            return error
         
-        # If user has no facilities, return empty peak hours
-        if not facilities.exists():
-            serializer = PeakHourSerializer([], many=True)
-            return Response(serializer.data)
+        hour_counts = rollups.hour_totals(daily)
         
-        # Get bookings for the last 30 days
-        start_date = timezone.now().date() - timedelta(days=30)
-        
-        bookings = Booking.objects.filter(
-            facility__in=facilities,
-            booking_date__gte=start_date
-        ).values('start_time').annotate(
-            bookings=Count('id')
-        ).order_by('start_time')
-        
-        total_bookings = sum(booking['bookings'] for booking in bookings)
+        total_bookings = sum(hour_counts.values())
         
         peak_hours_data = []
-        for booking in bookings:
-            hour = booking['start_time'].strftime('%H-%H')
-            percentage = (booking['bookings'] / total_bookings * 100) if total_bookings > 0 else 0
+        for hour, bookings in hour_counts.items():
+            percentage = (bookings / total_bookings * 100) if total_bookings > 0 else 0
             
             peak_hours_data.append({
-                'hour': hour,
-                'bookings': booking['bookings'],
+                'hour': f"{hour:02d}-{(hour + 1) % 24:02d}",
+                'bookings': bookings,
                 'percentage': round(percentage, 1)
             })
         
@@ -416,10 +417,9 @@ class DashboardViewSet(viewsets.ViewSet):
         if user.user_type != 'owner':
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        facilities = Facility.objects.filter(owner=user)
         recent_bookings = Booking.objects.filter(
-            facility__in=facilities
-        ).order_by('-created_at')[:10]
+            facility__owner=user
+        ).select_related('user', 'court').order_by('-created_at')[:10]
         
         serializer = RecentBookingSerializer(recent_bookings, many=True)
         return Response(serializer.data)
@@ -432,16 +432,22 @@ class DashboardViewSet(viewsets.ViewSet):
         if user.user_type != 'owner':
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        facilities = Facility.objects.filter(owner=user)
-        courts = Court.objects.filter(facility__in=facilities)
+        courts = Court.objects.filter(facility__owner=user).select_related('sport', 'stats')
         
         court_stats = []
         for court in courts:
-            total_bookings = court.bookings.count()
-            avg_rating = court.ratings.aggregate(Avg('rating'))['rating__avg'] or 0
-            total_earnings = court.bookings.filter(payment_status='paid').aggregate(
-                Sum('total_amount')
-            )['total_amount__sum'] or 0
+            try:
+                stats = court.stats
+                total_bookings = stats.total_bookings
+                avg_rating = stats.average_rating or 0
+                total_earnings = stats.total_earnings
+            except CourtStats.DoesNotExist:
+                # Summary row not built yet; fall back to live aggregates
+                total_bookings = court.bookings.count()
+                avg_rating = court.ratings.aggregate(Avg('rating'))['rating__avg'] or 0
+                total_earnings = court.bookings.filter(payment_status='paid').aggregate(
+                    Sum('total_amount')
+                )['total_amount__sum'] or 0
             
             court_stats.append({
                 'id': court.id,
@@ -483,7 +489,7 @@ class PlayerDashboardView(APIView):
             courts__bookings__isnull=False
         ).annotate(
             booking_count=Count('courts__bookings')
-        ).order_by('-booking_count')[:3]
+        ).order_by('-booking_count').with_listing_stats()[:3]
         
         return Response({
             'success': True,
@@ -506,7 +512,7 @@ class PlayerBookingsView(APIView):
     def get(self, request):
         """Get all bookings for the current player"""
         user = request.user
-        bookings = Booking.objects.filter(user=user).order_by('-created_at')
+        bookings = Booking.objects.filter(user=user).select_related('user', 'court', 'facility').order_by('-created_at')
         
         # Apply filters if provided
         status_filter = request.query_params.get('status')
@@ -518,6 +524,26 @@ class PlayerBookingsView(APIView):
         if date_filter:
             bookings = bookings.filter(booking_date=date_filter)
         
+        # Cursor pagination (opt-in): no COUNT(*) and no OFFSET scan
+        if wants_cursor(request):
+            try:
+                page, next_cursor = paginate_by_cursor(bookings, request.query_params.get('cursor'), 10)
+            except ValueError:
+                return Response({
+                    'success': False,
+                    'message': 'Invalid cursor'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            return Response({
+                'success': True,
+                'data': {
+                    'bookings': BookingSerializer(page, many=True, context={'request': request}).data,
+                    'pagination': {
+                        'next': next_cursor,
+                        'has_next': next_cursor is not None
+                    }
+                }
+            }, status=status.HTTP_200_OK)
+        
         # Pagination
         paginator = Paginator(bookings, 10)
         page_number = request.query_params.get('page', 1)
@@ -556,6 +582,107 @@ class PlayerBookingsView(APIView):
             'errors': serializer.errors
         }, status=status.HTTP_400_BAD_REQUEST)
 
+class PlayerBatchBookingsView(APIView):
+    """API view for booking several slots in one request"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        """Create all requested bookings, or none of them"""
+        serializer = BookingBatchSerializer(data=request.data, context={'request': request})
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'message': 'Booking creation failed',
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            bookings = serializer.save()
+        except booking_engine.BatchUnavailable as e:
+            return Response({
+                'success': False,
+                'message': str(e),
+                'data': {
+                    'results': [dict(result, index=index) for index, result in enumerate(e.results)]
+                }
+            }, status=status.HTTP_409_CONFLICT)
+        
+        booking_data = BookingSerializer(bookings, many=True, context={'request': request}).data
+        return Response({
+            'success': True,
+            'message': 'Bookings created successfully',
+            'data': {
+                'results': [
+                    {'index': index, 'success': True, 'booking': data}
+                    for index, data in enumerate(booking_data)
+                ],
+                'count': len(bookings),
+                'total_amount': sum((booking.total_amount for booking in bookings), Decimal('0'))
+            }
+        }, status=status.HTTP_201_CREATED)
+
+class PlayerBookingSeriesView(APIView):
+    """API view for a player's recurring booking series"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        """List the player's series"""
+        queryset = BookingSeries.objects.filter(user=request.user).select_related('court', 'facility')
+        return Response({
+            'success': True,
+            'data': BookingSeriesSerializer(queryset, many=True).data
+        }, status=status.HTTP_200_OK)
+    
+    def post(self, request):
+        """Create a series and book every date that is still free"""
+        serializer = BookingSeriesSerializer(data=request.data, context={'request': request})
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'message': 'Booking series creation failed',
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            booking_series = serializer.save()
+        except booking_engine.SlotUnavailable as e:
+            return Response({
+                'success': False,
+                'message': str(e)
+            }, status=status.HTTP_409_CONFLICT)
+        
+        bookings = serializer.bookings
+        return Response({
+            'success': True,
+            'message': f'{len(bookings)} bookings created',
+            'data': {
+                'series': BookingSeriesSerializer(booking_series).data,
+                'bookings': BookingSerializer(bookings, many=True, context={'request': request}).data,
+                'booked_dates': [booking.booking_date for booking in bookings],
+                'skipped_dates': serializer.skipped_dates,
+                'total_amount': sum((booking.total_amount for booking in bookings), Decimal('0'))
+            }
+        }, status=status.HTTP_201_CREATED)
+
+class PlayerBookingSeriesCancelView(APIView):
+    """API view for cancelling a whole booking series"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request, series_id):
+        booking_series = get_object_or_404(BookingSeries, id=series_id, user=request.user)
+        if booking_series.status == 'cancelled':
+            return Response({
+                'success': False,
+                'message': 'Booking series is already cancelled'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        cancelled = series.cancel_series(booking_series, request.data.get('reason', ''))
+        return Response({
+            'success': True,
+            'message': f'Booking series cancelled ({cancelled} upcoming bookings)',
+            'data': {'cancelled_bookings': cancelled}
+        }, status=status.HTTP_200_OK)
+
 class PlayerBookingDetailView(APIView):
     """API view for individual booking details"""
     permission_classes = [permissions.IsAuthenticated]
@@ -636,9 +763,10 @@ class PlayerVenuesView(APIView):
     
     def get(self, request):
         """Get all available venues with filters"""
-        venues = Facility.objects.filter(is_active=True, courts__isnull=False).order_by('-created_at').distinct()
-        # Only show venues that have at least one active court
-        venues = venues.filter(courts__status='active').distinct()
+        # Only show venues that have at least one active court. Court conditions
+        # are expressed as EXISTS subqueries so no join fan-out needs distinct().
+        active_courts = Court.objects.filter(facility=OuterRef('pk'), status='active')
+        venues = Facility.objects.filter(is_active=True).filter(Exists(active_courts)).order_by('-created_at')
         
         # Exclude obvious test data by default; can be overridden with ?include_test=1
         include_test = request.query_params.get('include_test') in ['1', 'true', 'True']
@@ -651,27 +779,37 @@ class PlayerVenuesView(APIView):
         # Apply search filter
         search_query = request.query_params.get('search')
         if search_query:
-            venues = venues.filter(
-                Q(name__icontains=search_query) |
-                Q(description__icontains=search_query) |
-                Q(city__icontains=search_query) |
-                Q(address__icontains=search_query) |
-                Q(courts__sport__name__icontains=search_query)
-            ).distinct()
+            if search.is_supported():
+                # Ranked full-text match; best matches first, filtered in the same query
+                venues = search.rank_facilities(venues, search_query)
+            else:
+                venues = venues.filter(
+                    Q(name__icontains=search_query) |
+                    Q(description__icontains=search_query) |
+                    Q(city__icontains=search_query) |
+                    Q(address__icontains=search_query) |
+                    Exists(Court.objects.filter(facility=OuterRef('pk'), sport__name__icontains=search_query))
+                )
         
         # Apply sport filter
         sport_filter = request.query_params.get('sport')
         if sport_filter:
-            venues = venues.filter(courts__sport__name__icontains=sport_filter)
+            venues = venues.filter(Exists(
+                Court.objects.filter(facility=OuterRef('pk'), sport__name__icontains=sport_filter)
+            ))
         
         # Apply price filters
         price_min = request.query_params.get('price_min')
         if price_min:
-            venues = venues.filter(courts__price_per_hour__gte=price_min)
+            venues = venues.filter(Exists(
+                Court.objects.filter(facility=OuterRef('pk'), price_per_hour__gte=price_min)
+            ))
         
         price_max = request.query_params.get('price_max')
         if price_max:
-            venues = venues.filter(courts__price_per_hour__lte=price_max)
+            venues = venues.filter(Exists(
+                Court.objects.filter(facility=OuterRef('pk'), price_per_hour__lte=price_max)
+            ))
         
         # Apply location filter
         location_filter = request.query_params.get('location')
@@ -681,15 +819,70 @@ class PlayerVenuesView(APIView):
                 Q(address__icontains=location_filter)
             )
         
-        # Pagination
-        paginator = Paginator(venues, 12)
-        page_number = request.query_params.get('page', 1)
-        page_obj = paginator.get_page(page_number)
+        # Nearby search: ?lat=&lng=&radius_km= sorts by distance
+        lat_param = request.query_params.get('lat')
+        lng_param = request.query_params.get('lng')
+        if lat_param and lng_param:
+            try:
+                lat = float(lat_param)
+                lng = float(lng_param)
+                radius_km = float(request.query_params.get('radius_km', geo.DEFAULT_RADIUS_KM))
+            except ValueError:
+                return Response({
+                    'success': False,
+                    'message': 'lat, lng and radius_km must be numbers'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if not (-90 <= lat <= 90 and -180 <= lng <= 180) or not (0 < radius_km <= geo.MAX_RADIUS_KM):
+                return Response({
+                    'success': False,
+                    'message': f'Invalid coordinates or radius (radius_km must be between 0 and {geo.MAX_RADIUS_KM:g})'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            distances = geo.nearby(venues, lat, lng, radius_km)
+            paginator = Paginator(distances, 12)
+            page_obj = paginator.get_page(request.query_params.get('page', 1))
+            page_venues = Facility.objects.with_listing_stats().in_bulk([facility_id for facility_id, _ in page_obj])
+            
+            venues_data = []
+            for facility_id, distance in page_obj:
+                venue_data = FacilitySerializer(page_venues[facility_id], context={'request': request}).data
+                venue_data['distance_km'] = round(distance, 2)
+                venues_data.append(venue_data)
+        elif wants_cursor(request):
+            # Cursor pagination (opt-in): newest first, no COUNT(*) and no OFFSET scan
+            try:
+                page, next_cursor = paginate_by_cursor(
+                    venues.with_listing_stats(), request.query_params.get('cursor'), 12
+                )
+            except ValueError:
+                return Response({
+                    'success': False,
+                    'message': 'Invalid cursor'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            return Response({
+                'success': True,
+                'data': {
+                    'venues': FacilitySerializer(page, many=True, context={'request': request}).data,
+                    'pagination': {
+                        'next': next_cursor,
+                        'has_next': next_cursor is not None
+                    }
+                }
+            }, status=status.HTTP_200_OK)
+        else:
+            # Annotate listing aggregates and prefetch relations for the serializer
+            venues = venues.with_listing_stats()
+            
+            # Pagination
+            paginator = Paginator(venues, 12)
+            page_number = request.query_params.get('page', 1)
+            page_obj = paginator.get_page(page_number)
+            venues_data = FacilitySerializer(page_obj, many=True, context={'request': request}).data
         
         return Response({
             'success': True,
             'data': {
-                'venues': FacilitySerializer(page_obj, many=True, context={'request': request}).data,
+                'venues': venues_data,
                 'pagination': {
                     'count': paginator.count,
                     'pages': paginator.num_pages,
@@ -709,37 +902,26 @@ class PlayerVenueDetailView(APIView):
         try:
             venue = Facility.objects.get(id=venue_id, is_active=True)
             
-            # Get courts with availability
-            courts = venue.courts.all()
-            courts_data = []
+            # Get requested date or today
+            date_param = request.query_params.get('date')
+            if date_param:
+                try:
+                    ref_date = datetime.strptime(date_param, '%Y-%m-%d').date()
+                except Exception:
+                    ref_date = timezone.now().date()
+            else:
+                ref_date = timezone.now().date()
+            
+            # Load courts with their sport and photos up front, and their slots for the day
+            courts = list(venue.courts.select_related('sport').prefetch_related('photos'))
+            calendar = SlotCalendar.for_courts(courts, ref_date)
             
+            # One bookings query and one holds query for the whole venue, checked against every slot in memory
+            availability = AvailabilityIndex.for_courts([court.id for court in courts], [ref_date], viewer=request.user)
+            
+            courts_data = []
             for court in courts:
-                # Get requested date or today
-                date_param = request.query_params.get('date')
-                if date_param:
-                    try:
-                        ref_date = datetime.strptime(date_param, '%Y-%m-%d').date()
-                    except Exception:
-                        ref_date = timezone.now().date()
-                else:
-                    ref_date = timezone.now().date()
-                # Get all time slots for this court
-                all_slots = TimeSlot.objects.filter(court=court, is_available=True).order_by('start_time')
-                
-                # Filter out slots that are already booked
-                available_slots = []
-                for slot in all_slots:
-                    # Check if this time slot is booked for today
-                    is_booked = Booking.objects.filter(
-                        court=court,
-                        booking_date=ref_date,
-                        start_time__lt=slot.end_time,
-                        end_time__gt=slot.start_time,
-                        status__in=['confirmed', 'pending']
-                    ).exists()
-                    
-                    if not is_booked:
-                        available_slots.append(slot)
+                available_slots = availability.free_slots(court.id, ref_date, calendar.slots(court.id, ref_date))
                 
                 courts_data.append({
                     'id': court.id,
@@ -747,21 +929,20 @@ class PlayerVenueDetailView(APIView):
                     'sport': court.sport.name if court.sport else None,
                     'price_per_hour': court.price_per_hour,
                     'description': court.description,
-                    'images': [request.build_absolute_uri(photo.image.url) for photo in court.photos.all()],
+                    'images': [images.url(photo, 'card', request) for photo in court.photos.all()],
+                    'image_srcsets': [images.srcset(photo, request) for photo in court.photos.all()],
                     'latitude': court.latitude,
                     'longitude': court.longitude,
-                    'available_slots': TimeSlotSerializer(available_slots, many=True).data
+                    'available_slots': [slot.as_dict() for slot in available_slots]
                 })
             
             venue_data = FacilitySerializer(venue, context={'request': request}).data
             venue_data['courts'] = courts_data
-            # Fallback: if facility doesn't have coords, use first court with coords
+            # Fallback: if facility doesn't have coords, use the precomputed court location
             if not venue_data.get('latitude') or not venue_data.get('longitude'):
-                for c in courts_data:
-                    if c.get('latitude') and c.get('longitude'):
-                        venue_data['latitude'] = c['latitude']
-                        venue_data['longitude'] = c['longitude']
-                        break
+                if venue.effective_latitude is not None and venue.effective_longitude is not None:
+                    venue_data['latitude'] = venue.effective_latitude
+                    venue_data['longitude'] = venue.effective_longitude
             
             return Response({
                 'success': True,
@@ -773,6 +954,98 @@ class PlayerVenueDetailView(APIView):
                 'message': 'Venue not found'
             }, status=status.HTTP_404_NOT_FOUND) 
 
+class PlayerVenueAvailabilityView(APIView):
+    """Multi-day availability calendar for the courts of a venue"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    MAX_RANGE_DAYS = 30
+    
+    def get(self, request, venue_id):
+        """Get free-slot bitstrings per court per day for ?from=&to= (inclusive)"""
+        try:
+            venue = Facility.objects.get(id=venue_id, is_active=True)
+        except Facility.DoesNotExist:
+            return Response({
+                'success': False,
+                'message': 'Venue not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        today = timezone.now().date()
+        try:
+            from_param = request.query_params.get('from')
+            to_param = request.query_params.get('to')
+            start_date = datetime.strptime(from_param, '%Y-%m-%d').date() if from_param else today
+            end_date = datetime.strptime(to_param, '%Y-%m-%d').date() if to_param else start_date + timedelta(days=6)
+        except ValueError:
+            return Response({
+                'success': False,
+                'message': 'Dates must be in YYYY-MM-DD format'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if end_date < start_date:
+            return Response({
+                'success': False,
+                'message': "'to' must not be before 'from'"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        num_days = (end_date - start_date).days + 1
+        if num_days > self.MAX_RANGE_DAYS:
+            return Response({
+                'success': False,
+                'message': f'Date range cannot exceed {self.MAX_RANGE_DAYS} days'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        courts = venue.courts.select_related('sport')
+        court_filter = request.query_params.get('court')
+        if court_filter:
+            try:
+                courts = courts.filter(id=int(court_filter))
+            except ValueError:
+                return Response({
+                    'success': False,
+                    'message': 'court must be an integer id'
+                }, status=status.HTTP_400_BAD_REQUEST)
+        courts = list(courts)
+        
+        dates = [start_date + timedelta(days=offset) for offset in range(num_days)]
+        calendar = SlotCalendar.for_courts(courts, start_date, end_date)
+        # One bookings scan and one holds scan over the whole range, grouped per court and day in memory
+        availability = AvailabilityIndex.for_date_range(
+            [court.id for court in courts], start_date, end_date, viewer=request.user
+        )
+        
+        courts_data = []
+        for court in courts:
+            slots = calendar.regular_slots(court.id)
+            courts_data.append({
+                'id': court.id,
+                'name': court.name,
+                'sport': court.sport.name if court.sport else None,
+                'price_per_hour': court.price_per_hour,
+                'slots': [
+                    {'id': slot.id, 'start_time': slot.start_time, 'end_time': slot.end_time}
+                    for slot in slots
+                ],
+                # One character per slot: '1' free, '0' taken or not offered that day
+                'availability': {
+                    day.isoformat(): availability.slot_bitstring(
+                        court.id, day, slots, calendar.slots(court.id, day)
+                    )
+                    for day in dates
+                }
+            })
+        
+        return Response({
+            'success': True,
+            'data': {
+                'venue_id': venue.id,
+                'from': start_date,
+                'to': end_date,
+                'dates': dates,
+                'courts': courts_data
+            }
+        }, status=status.HTTP_200_OK)
+
 class PlayerVenueReviewsView(APIView):
     """List reviews for a venue (all courts under the facility)"""
     permission_classes = [permissions.IsAuthenticated]
@@ -820,9 +1093,7 @@ class PaymentViewSet(viewsets.ViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def _get_client(self):
-        key_id = os.environ.get('RAZORPAY_KEY_ID', getattr(settings, 'RAZORPAY_KEY_ID', ''))
-        key_secret = os.environ.get('RAZORPAY_KEY_SECRET', getattr(settings, 'RAZORPAY_KEY_SECRET', ''))
-        return razorpay.Client(auth=(key_id, key_secret))
+        return payments.get_client()
 
     @action(detail=False, methods=['post'])
     def create_order(self, request):
@@ -833,18 +1104,45 @@ class PaymentViewSet(viewsets.ViewSet):
             receipt = request.data.get('receipt', f'receipt_{request.user.id}_{timezone.now().timestamp()}')
             notes = request.data.get('notes', {})
 
+            # Hold the slot before taking payment so nobody else can pay for it meanwhile
+            hold = None
+            if request.data.get('court'):
+                hold_serializer = SlotHoldSerializer(data=request.data)
+                if not hold_serializer.is_valid():
+                    return Response({'success': False, 'errors': hold_serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+                try:
+                    hold = holds.place(request.user, **hold_serializer.validated_data)
+                except holds.HoldConflict as e:
+                    return Response({'success': False, 'message': str(e)}, status=status.HTTP_409_CONFLICT)
+
             client = self._get_client()
-            order = client.order.create({
-                'amount': amount,
-                'currency': currency,
-                'receipt': receipt,
-                'payment_capture': 1,
-                'notes': notes,
+            try:
+                order = client.order.create({
+                    'amount': amount,
+                    'currency': currency,
+                    'receipt': receipt,
+                    'payment_capture': 1,
+                    'notes': notes,
+                })
+            except Exception:
+                if hold:
+                    hold.delete()
+                raise
+            payment_order = payments.record_order(request.user, order)
+            if hold:
+                hold.payment_order = payment_order
+                hold.save(update_fields=['payment_order'])
+            return Response({
+                'success': True,
+                'order': order,
+                'hold': SlotHoldSerializer(hold).data if hold else None,
             })
-            return Response({'success': True, 'order': order})
         except Exception as e:
             return Response({'success': False, 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    def _booked_response(self, payment_order):
+        return Response({'success': True, 'message': 'Booking confirmed', 'data': BookingSerializer(payment_order.booking).data})
+
     @action(detail=False, methods=['post'])
     def verify_and_book(self, request):
         """Verify Razorpay payment signature, then create a booking."""
@@ -857,6 +1155,11 @@ class PaymentViewSet(viewsets.ViewSet):
             if not (order_id and payment_id and signature):
                 return Response({'success': False, 'message': 'Missing payment verification fields'}, status=status.HTTP_400_BAD_REQUEST)
 
+            # A retried verification of an already booked payment gets the same booking back
+            completed = payments.find_completed(request.user, order_id, payment_id, signature)
+            if completed:
+                return self._booked_response(completed)
+
             client = self._get_client()
             params_dict = {
                 'razorpay_order_id': order_id,
@@ -888,12 +1191,45 @@ class PaymentViewSet(viewsets.ViewSet):
                         end_time__gt=start_time
                     ).exists()
                     if overlap:
+                        # Possibly our own booking, created by a concurrent duplicate request
+                        completed = payments.find_completed(request.user, order_id, payment_id, signature)
+                        if completed:
+                            return self._booked_response(completed)
                         return Response({'success': False, 'message': 'Time slot is already booked'}, status=status.HTTP_400_BAD_REQUEST)
             except Exception:
                 pass
             serializer = BookingCreateSerializer(data=booking_payload, context={'request': request})
             if serializer.is_valid():
-                booking = serializer.save()
+                def write():
+                    payment_order = (
+                        PaymentOrder.objects.select_for_update()
+                        .filter(razorpay_order_id=order_id).first()
+                    )
+                    if payment_order and (payment_order.user_id != request.user.id or payment_order.booking_id):
+                        return payment_order, None
+
+                    booking = serializer.save()
+                    if payment_order is None:
+                        # Order created before orders were recorded
+                        payment_order = PaymentOrder(
+                            user=request.user,
+                            razorpay_order_id=order_id,
+                            amount=int(booking.total_amount * 100),
+                        )
+                    payment_order.razorpay_payment_id = payment_id
+                    payment_order.razorpay_signature = signature
+                    payment_order.status = 'booked'
+                    payment_order.booking = booking
+                    payment_order.save()
+                    return payment_order, booking
+
+                # Linking the order and creating the booking commit together, serialized per court and day
+                validated = serializer.validated_data
+                payment_order, booking = booking_engine.commit(validated['court'].id, validated['booking_date'], write)
+                if booking is None:
+                    if payment_order.user_id != request.user.id:
+                        return Response({'success': False, 'message': 'Payment order belongs to another user'}, status=status.HTTP_400_BAD_REQUEST)
+                    return self._booked_response(payment_order)
                 # Notify owner about new booking
                 try:
                     owner_user = booking.facility.owner
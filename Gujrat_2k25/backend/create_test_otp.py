@@ -13,6 +13,8 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 django.setup()
 
+from django.utils import timezone
+
 from authentication.models import User
 from authentication.email_service import EmailService
 
@@ -30,7 +32,8 @@ def create_test_otp():
         email_otp = EmailService.create_otp(test_user, test_user.email)
         print(f"✅ Created new OTP: {email_otp.otp}")
         print(f"⏰ Expires at: {email_otp.expires_at}")
-        print(f"✅ Is valid: {email_otp.is_valid()}")
+        # Issued codes are stored hashed; validity is just "not expired yet"
+        print(f"✅ Is valid: {email_otp.expires_at > timezone.now()}")
         
         # Send email
         success = EmailService.send_otp_email(test_user, email_otp.otp)
@@ -29,13 +29,12 @@ def test_verification_endpoint():
         print(f"✅ Found test user: {test_user.email}")
         print(f"📧 Email verified: {test_user.is_email_verified}")
         
-        # Get the latest OTP
-        latest_otp = EmailOTP.objects.filter(user=test_user, is_used=False).order_by('-created_at').first()
+        # Stored codes are hashed, so issue a fresh one to test with
+        latest_otp = EmailService.create_otp(test_user, test_user.email)
         
         if latest_otp:
             print(f"🔢 Found OTP: {latest_otp.otp}")
             print(f"⏰ Expires at: {latest_otp.expires_at}")
-            print(f"✅ Is valid: {latest_otp.is_valid()}")
             
             # Test the verification endpoint
             url = 'http://localhost:8000/api/auth/verify-email/'
@@ -72,8 +71,8 @@ def test_email_service_directly():
         test_user = User.objects.get(email='manansahni295@gmail.com')
         print(f"✅ Found test user: {test_user.email}")
         
-        # Get the latest OTP
-        latest_otp = EmailOTP.objects.filter(user=test_user, is_used=False).order_by('-created_at').first()
+        # Stored codes are hashed, so issue a fresh one to test with
+        latest_otp = EmailService.create_otp(test_user, test_user.email)
         
         if latest_otp:
             print(f"🔢 Found OTP: {latest_otp.otp}")
@@ -103,11 +102,11 @@ def check_user_otps():
     
     try:
         test_user = User.objects.get(email='manansahni295@gmail.com')
-        otps = EmailOTP.objects.filter(user=test_user).order_by('-created_at')
+        otps = EmailOTP.objects.filter(user=test_user)
         
-        print(f"Found {otps.count()} OTPs for user:")
+        print(f"Found {otps.count()} pending OTPs for user:")
         for otp in otps:
-            print(f"  - OTP: {otp.otp}, Used: {otp.is_used}, Valid: {otp.is_valid()}, Expires: {otp.expires_at}")
+            print(f"  - Attempts: {otp.attempts}, Expired: {otp.is_expired()}, Expires: {otp.expires_at}")
             
     except User.DoesNotExist:
         print("❌ Test user not found")
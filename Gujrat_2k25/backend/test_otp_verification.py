@@ -14,7 +14,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 django.setup()
 
 from authentication.email_service import EmailService
-from authentication.models import User, EmailOTP
+from authentication.models import User
 
 def test_otp_verification():
     """Test OTP verification functionality"""
@@ -27,13 +27,12 @@ def test_otp_verification():
         print(f"✅ Using test user: {test_user.email}")
         print(f"📧 Email verified: {test_user.is_email_verified}")
         
-        # Get the latest OTP for this user
-        latest_otp = EmailOTP.objects.filter(user=test_user, is_used=False).order_by('-created_at').first()
+        # Stored codes are hashed, so issue a fresh one to test with
+        latest_otp = EmailService.create_otp(test_user, test_user.email)
         
         if latest_otp:
             print(f"🔢 Found OTP: {latest_otp.otp}")
             print(f"⏰ Expires at: {latest_otp.expires_at}")
-            print(f"✅ Is valid: {latest_otp.is_valid()}")
             
             # Test verification
             print("\nTesting OTP verification...")
@@ -15,7 +15,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 django.setup()
 
-from authentication.models import User, EmailOTP
+from authentication.models import User
 from authentication.email_service import EmailService
 from rest_framework_simplejwt.tokens import RefreshToken
 
@@ -36,8 +36,8 @@ def test_complete_verification_flow():
         print(f"✅ Generated access token: {str(access_token)[:50]}...")
         print(f"✅ Generated refresh token: {str(refresh)[:50]}...")
         
-        # Get the latest OTP
-        latest_otp = EmailOTP.objects.filter(user=test_user, is_used=False).order_by('-created_at').first()
+        # Stored codes are hashed, so issue a fresh one to test with
+        latest_otp = EmailService.create_otp(test_user, test_user.email)
         
         if latest_otp:
             print(f"✅ Found OTP: {latest_otp.otp}")
@@ -197,9 +197,18 @@ export default function CourtBooking() {
       // 1) Create Razorpay order via backend
       const totalAmount = calculateTotalPrice();
       const amountPaise = Math.round(totalAmount * 100);
+      const selectedSlots = getSlots().filter((s: any) => selectedSlotIds.includes(s.id))
+        .sort((a: any, b: any) => a.start_time.localeCompare(b.start_time));
+      // The backend holds this range for us while checkout is open
+      const slot = {
+        court: bookingForm.court_id,
+        booking_date: format(bookingForm.date!, 'yyyy-MM-dd'),
+        start_time: selectedSlots[0].start_time,
+        end_time: selectedSlots[selectedSlots.length - 1].end_time,
+      };
       const orderRes = await paymentsAPI.createOrder(amountPaise, `receipt_${Date.now()}`, {
         court_id: bookingForm.court_id,
-      });
+      }, slot);
       if (!orderRes.success) {
         throw new Error(orderRes.message || 'Failed to create payment order');
       }
@@ -229,18 +238,7 @@ export default function CourtBooking() {
               razorpay_order_id: response.razorpay_order_id,
               razorpay_payment_id: response.razorpay_payment_id,
               razorpay_signature: response.razorpay_signature,
-              court: bookingForm.court_id,
-              booking_date: format(bookingForm.date!, 'yyyy-MM-dd'),
-              start_time: (() => {
-                const slots = getSlots().filter((s: any) => selectedSlotIds.includes(s.id))
-                  .sort((a: any, b: any) => a.start_time.localeCompare(b.start_time));
-                return slots[0].start_time;
-              })(),
-              end_time: (() => {
-                const slots = getSlots().filter((s: any) => selectedSlotIds.includes(s.id))
-                  .sort((a: any, b: any) => a.start_time.localeCompare(b.start_time));
-                return slots[slots.length - 1].end_time;
-              })(),
+              ...slot,
               special_requests: bookingForm.special_requests,
             };
             const verifyRes = await paymentsAPI.verifyAndBook(payload);
@@ -349,9 +349,9 @@ export const bookingsAPI = {
 
 // Payments API
 export const paymentsAPI = {
-  createOrder: (amountPaise: number, receipt?: string, notes?: any) => apiRequest('/courts/payments/create_order/', {
+  createOrder: (amountPaise: number, receipt?: string, notes?: any, slot?: any) => apiRequest('/courts/payments/create_order/', {
     method: 'POST',
-    body: JSON.stringify({ amount: amountPaise, currency: 'INR', receipt, notes }),
+    body: JSON.stringify({ amount: amountPaise, currency: 'INR', receipt, notes, ...slot }),
   }),
   verifyAndBook: (payload: any) => apiRequest('/courts/payments/verify_and_book/', {
     method: 'POST',